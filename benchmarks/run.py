@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Command throughput and latency benchmarks.
+
+Every workload is run against an emulated device (optionally behind a pty,
+to include the operating system's serial stack) for all combinations of the
+selected baudrates, reply latencies and communication modes. The results are
+written as JSON, one object per run::
+
+    python -m benchmarks.run --baudrates 115200 --latencies 0 0.001 -o results.json
+
+Reported values per run:
+
+- ``ops``: number of workload operations (e.g. one ``put_string`` call)
+- ``commands``, ``commands_per_s``: commands processed by the device
+- ``bytes``, ``bytes_per_s``: bytes written and read
+- ``commands_per_op``, ``bytes_per_op``: commands and bytes per operation
+- ``latency_p50``, ``latency_p99``: latency of a single operation in
+  seconds, from its start until the replies of all its commands arrived
+  (in pipelined and batch mode, this includes waiting for earlier
+  operations)
+
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import argparse
+import json
+import sys
+import time
+
+from picaso_lcd.constants import BAUD_RATES
+from picaso_lcd.display import Display
+from picaso_lcd.emulator import EmulatedDevice, PtyBridge
+from picaso_lcd.futures import CommandFuture
+from examples.test import demo_sine, demo_text
+
+
+### Workloads ###
+# Every workload is a function that performs a single operation.
+
+def gfx_line(disp, i):
+    disp.gfx_line(0, i % 200, 100, 200 - i % 200, 0xf800)
+
+
+def put_string(length):
+    string = ('The quick brown fox jumps over the lazy dog. ' * 12)[:length]
+    def workload(disp, i):
+        disp.text.put_string(string)
+    return workload
+
+
+def text_attributes(disp, i):
+    # Typical label rendering: mostly repeated values, with some changes
+    disp.text.set_fg_color(0xffff if i % 4 else 0xf800)
+    disp.text.set_bg_color(0x0000)
+    disp.text.set_font(3)
+    disp.text.set_attributes(bold=bool(i % 2))
+    disp.text.set_opacity(1)
+
+
+def touch_poll(disp, i):
+    # Like TouchPoller, always query all values, so that every mode sends
+    # the same commands (in pipelined and batch mode the status is a future
+    # that can't be tested before the reply arrived)
+    disp.touch.get_status(0)
+    disp.touch.get_status(1)
+    disp.touch.get_status(2)
+
+
+def sine(disp, i):
+    demo_sine(disp)
+
+
+def text(disp, i):
+    demo_text(disp)
+
+
+WORKLOADS = {
+    'gfx_line': gfx_line,
+    'put_string_10': put_string(10),
+    'put_string_100': put_string(100),
+    'put_string_511': put_string(511),
+    'text_attributes': text_attributes,
+    'touch_poll': touch_poll,
+    'demo_sine': sine,
+    'demo_text': text,
+}
+
+
+### Runner ###
+
+class _CompletionTracker(object):
+    """Collects the futures of the commands sent by a display, so that the
+    latency of an operation can be measured until all of its replies
+    arrived."""
+
+    def __init__(self, disp):
+        self.futures = []
+        self._send = disp._send
+        disp._send = self._track
+
+    def _track(self, payload, return_bytes, decode):
+        result = self._send(payload, return_bytes, decode)
+        if isinstance(result, CommandFuture):
+            self.futures.append(result)
+        return result
+
+    def measure(self, latencies, start):
+        """Append the latency of the operation started at ``start`` to
+        ``latencies`` once all of its commands are resolved."""
+        futures, self.futures = self.futures, []
+        index = len(latencies)
+        latencies.append(time.time() - start)
+
+        def done(future):
+            latencies[index] = max(latencies[index], time.time() - start)
+        for future in futures:
+            future.add_done_callback(done)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run(workload, baudrate, latency, mode, transport='emulator', duration=0.5,
+        max_ops=1000):
+    """
+    Run a single benchmark.
+
+    :param workload: Name of the workload (see :data:`WORKLOADS`).
+    :param baudrate: Simulated baudrate.
+    :param latency: Simulated reply latency in seconds.
+    :param mode: ``'blocking'``, ``'pipelined'`` or ``'batch'``.
+    :param transport: ``'emulator'`` or ``'pty'``.
+    :param duration: Minimum run time in seconds.
+    :param max_ops: Maximum number of operations.
+    :returns: Dictionary with the results.
+
+    """
+    device = EmulatedDevice(baudrate=baudrate, simulate_wire=True, latency=latency,
+            timeout=5)
+    bridge = None
+    if transport == 'pty':
+        bridge = PtyBridge(device)
+        disp = Display(bridge.port, baudrate=baudrate, read_timeout=5)
+    else:
+        disp = Display(device)
+    try:
+        op = WORKLOADS[workload]
+        if mode == 'pipelined':
+            disp.set_pipeline(16)
+
+        # Warm up caches (e.g. the display size)
+        op(disp, 0)
+        disp.flush()
+        commands = sum(device.command_counts.values())
+        nbytes = device.bytes_received + device.bytes_sent
+
+        tracker = _CompletionTracker(disp)
+        latencies = []
+        start = time.time()
+        while len(latencies) < max_ops and time.time() - start < duration:
+            t = time.time()
+            if mode == 'batch':
+                with disp.batch():
+                    op(disp, len(latencies))
+            else:
+                op(disp, len(latencies))
+            tracker.measure(latencies, t)
+        disp.flush()
+        elapsed = time.time() - start
+    finally:
+        if bridge is not None:
+            disp._ser.close()
+            bridge.close()
+
+    commands = sum(device.command_counts.values()) - commands
+    nbytes = device.bytes_received + device.bytes_sent - nbytes
+    return {
+        'workload': workload,
+        'transport': transport,
+        'mode': mode,
+        'baudrate': baudrate,
+        'latency': latency,
+        'ops': len(latencies),
+        'elapsed': elapsed,
+        'commands': commands,
+        'commands_per_s': commands / elapsed,
+        'bytes': nbytes,
+        'bytes_per_s': nbytes / elapsed,
+        'commands_per_op': commands / len(latencies),
+        'bytes_per_op': nbytes / len(latencies),
+        'latency_p50': _percentile(latencies, 0.5),
+        'latency_p99': _percentile(latencies, 0.99),
+    }
+
+
+def _key(result):
+    return tuple(result[key] for key in ('workload', 'transport', 'mode', 'baudrate', 'latency'))
+
+
+def compare(results, baseline, tolerance=0.5):
+    """
+    Compare results against the results of a previous (baseline) run.
+
+    :param tolerance: Allowed relative drop of the command throughput. The
+        throughput depends on the machine, so it should be generous. Sending
+        more commands or bytes per operation (beyond 10 %) always counts as
+        a regression.
+    :returns: List of regression descriptions (empty if there are none).
+
+    """
+    baseline = dict((_key(result), result) for result in baseline)
+    regressions = []
+    for result in results:
+        base = baseline.get(_key(result))
+        if base is None:
+            continue
+        name = '{workload} {mode} {baudrate} {latency}'.format(**result)
+        if result['commands_per_s'] < base['commands_per_s'] * (1 - tolerance):
+            regressions.append('{0}: {1:.1f} cmd/s, baseline {2:.1f} cmd/s'.format(
+                name, result['commands_per_s'], base['commands_per_s']))
+        for key in ('commands_per_op', 'bytes_per_op'):
+            if result[key] > base[key] * 1.1:
+                regressions.append('{0}: {1} {2:.1f}, baseline {3:.1f}'.format(
+                    name, key, result[key], base[key]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-w', '--workloads', nargs='+', choices=sorted(WORKLOADS),
+            default=sorted(WORKLOADS))
+    parser.add_argument('-b', '--baudrates', nargs='+', type=int, choices=BAUD_RATES,
+            default=[9600, 115200, 600000], metavar='BAUDRATE')
+    parser.add_argument('-l', '--latencies', nargs='+', type=float, default=[0, 0.001, 0.016],
+            help='simulated reply latencies (e.g. USB latency timer) in seconds')
+    parser.add_argument('-m', '--modes', nargs='+', default=['blocking', 'pipelined', 'batch'],
+            choices=['blocking', 'pipelined', 'batch'])
+    parser.add_argument('-t', '--transport', choices=['emulator', 'pty'], default='emulator')
+    parser.add_argument('-d', '--duration', type=float, default=0.5,
+            help='minimum duration of a single run in seconds')
+    parser.add_argument('-n', '--max-ops', type=int, default=1000)
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('-c', '--compare', metavar='BASELINE',
+            help='results of a previous run, exit with an error on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+            help='allowed relative throughput drop for --compare')
+    args = parser.parse_args(argv)
+
+    results = []
+    for workload in args.workloads:
+        for baudrate in args.baudrates:
+            for latency in args.latencies:
+                for mode in args.modes:
+                    result = run(workload, baudrate, latency, mode, args.transport,
+                            args.duration, args.max_ops)
+                    results.append(result)
+                    print('{workload:16} {mode:9} {baudrate:>7} {latency:>6} '
+                          '{commands_per_s:>10.1f} cmd/s {bytes_per_s:>10.1f} B/s '
+                          'p50 {latency_p50:.6f} s p99 {latency_p99:.6f} s'.format(**result),
+                          file=sys.stderr)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('Regression: ' + regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
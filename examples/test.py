@@ -9,9 +9,8 @@ import math
 def demo_sine(disp):
     max_x, max_y = disp.get_display_size()
 
-    f = lambda x: math.sin(x / 10.0) * max_y / 2 + max_y / 2
-    for i in range(1, max_x):
-        disp.gfx_line(i - 1, int(f(i - 1)), i, int(f(i)), 21 << 11)
+    f = lambda x: math.sin(x / 10.0) * (max_y - 1) / 2 + (max_y - 1) / 2
+    disp.gfx_polyline([(x, int(f(x))) for x in range(max_x)], 21 << 11)
 
 
 def demo_text(disp):
@@ -29,34 +28,39 @@ def demo_text(disp):
                          "But you give all you got, weighin' in at nineteen stone")
 
 
-port='/dev/ttyUSB0'
-baud=9600
-if len(sys.argv) > 1: port=sys.argv[1]
-if len(sys.argv) > 2: baud=int(sys.argv[2])
-print("Opening port: ", port, " with baud: ", baud )
-disp = display.Display( port, baud )
-time.sleep(3)
-disp.cls()
-disp.set_orientation(1)
-
-while True:
-    demo_text(disp)
+def main():
+    port='/dev/ttyUSB0'
+    baud=9600
+    if len(sys.argv) > 1: port=sys.argv[1]
+    if len(sys.argv) > 2: baud=int(sys.argv[2])
+    print("Opening port: ", port, " with baud: ", baud )
+    disp = display.Display( port, baud )
     time.sleep(3)
     disp.cls()
-    demo_sine(disp)
-
-    #disp.off()
-    #time.sleep(2)
-    #disp.on()
-
-    #blue = disp.to_16bit_color(0, 0, 255)
-    #red = disp.to_16bit_color(255, 0, 0)
-    #green = disp.to_16bit_color(0, 255, 0)
-    #disp.cls()
-    #
-    #disp.gfx_circle(100, 100, 10, Colors.ALICEBLUE, filled=True)
-    #disp.gfx_circle(200, 100, 10, Colors.ALICEBLUE, filled=True)
-    #disp.gfx_polyline([(120, 100), (130, 110), (140, 115), (150, 115), (160, 110), (170, 100)], Colors.BLUE)
-    #
-    #disp.gfx_rect(200, 120, 300, 200, Colors.DARKBLUE, filled=True)
-    disp.cls()
+    disp.set_orientation(1)
+
+    while True:
+        demo_text(disp)
+        time.sleep(3)
+        disp.cls()
+        demo_sine(disp)
+
+        #disp.off()
+        #time.sleep(2)
+        #disp.on()
+
+        #blue = disp.to_16bit_color(0, 0, 255)
+        #red = disp.to_16bit_color(255, 0, 0)
+        #green = disp.to_16bit_color(0, 255, 0)
+        #disp.cls()
+        #
+        #disp.gfx_circle(100, 100, 10, Colors.ALICEBLUE, filled=True)
+        #disp.gfx_circle(200, 100, 10, Colors.ALICEBLUE, filled=True)
+        #disp.gfx_polyline([(120, 100), (130, 110), (140, 115), (150, 115), (160, 110), (170, 100)], Colors.BLUE)
+        #
+        #disp.gfx_rect(200, 120, 300, 200, Colors.DARKBLUE, filled=True)
+        disp.cls()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+An asyncio based display (Python 3 only). All commands of an
+:class:`AsyncDisplay` return awaitables instead of blocking::
+
+    async def main():
+        disp = AsyncDisplay('/dev/ttyUSB0', 115200)
+        await disp.cls()
+        await disp.text.set_fg_color(colors.RED)
+        width, height = await disp.get_display_size()
+        await asyncio.gather(*(disp.gfx_line(0, 0, x, height - 1, colors.BLUE)
+                               for x in range(0, width, 10)))
+
+The serial port is used in non-blocking mode and driven by the event loop.
+Commands are written immediately and their replies are matched to them in
+FIFO order, so many coroutines can use the same display concurrently. Use
+:func:`asyncio.wait_for` to apply timeouts.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import asyncio
+import collections
+import os
+
+import serial
+
+from . import metrics
+from .constants import ACK
+from .display import Display, DisplayText, DisplayTouch, _METRIC_STATE, _to_int
+from .exceptions import PicasoError, CommunicationError
+from .touch import TouchPoller
+
+
+class AsyncDisplay(Display):
+    """A :class:`~picaso_lcd.display.Display` whose commands are coroutines.
+
+    Pipelined and batch mode as well as command hooks are not available, as
+    all commands are already sent without waiting for the previous reply.
+    """
+
+    def __init__(self, port, baudrate=9600):
+        """
+        :param port: serial port to which the display is connected, or an
+            already opened serial port object (which must provide a
+            ``fileno()`` method).
+        :type port: str or serial.Serial
+        :param baudrate: default 9600 in SPE2 rev 1.1
+        :type baudrate: int
+
+        """
+        if not hasattr(port, 'fileno'):
+            port = serial.Serial(port, baudrate=baudrate, stopbits=1, timeout=0)
+        super(AsyncDisplay, self).__init__(port)
+        self._fd = port.fileno()
+        os.set_blocking(self._fd, False)
+        self._loop = None
+        self._pending = collections.deque()  # (future, return_bytes, decode)
+        self._rx = bytearray()
+        self._tx = bytearray()
+
+        self.text = AsyncDisplayText(self)
+        self.touch = AsyncDisplayTouch(self)
+
+    ### Serial communication handling ###
+
+    def _send(self, payload, return_bytes, decode):
+        loop = self._get_loop()
+        future = loop.create_future()
+        self._pending.append((future, return_bytes, decode))
+        self._tx += payload
+        self._write()
+        return future
+
+    def _deferred(self):
+        return True
+
+    def _resolved(self, value):
+        future = self._get_loop().create_future()
+        future.set_result(value)
+        return future
+
+    def _get_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop.add_reader(self._fd, self._read)
+        return self._loop
+
+    def _write(self):
+        """Write as much of the transmit buffer as possible."""
+        try:
+            written = os.write(self._fd, self._tx)
+        except BlockingIOError:
+            written = 0
+        del self._tx[:written]
+        if self._tx:
+            self._loop.add_writer(self._fd, self._on_writable)
+
+    def _on_writable(self):
+        self._loop.remove_writer(self._fd)
+        self._write()
+
+    def _read(self):
+        """Read available reply bytes and resolve the matching futures."""
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._fail(CommunicationError(str(e)))
+            return
+        if not self._pending:
+            # Nobody waits for these bytes
+            return
+        rx = self._rx
+        rx += data
+        while self._pending and rx:
+            future, return_bytes, decode = self._pending[0]
+            if rx[0] != ACK:
+                # A NAK is not followed by any response values
+                size = 1
+            elif len(rx) < 1 + return_bytes:
+                break
+            else:
+                size = 1 + return_bytes
+            self._pending.popleft()
+            reply = bytes(rx[:size])
+            del rx[:size]
+            if future.cancelled():
+                continue
+            try:
+                values = self._parse_reply(reply, return_bytes)
+                result = values if decode is None else decode(values)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _fail(self, exception):
+        while self._pending:
+            future = self._pending.popleft()[0]
+            if not future.cancelled():
+                future.set_exception(exception)
+
+    def set_pipeline(self, window):
+        raise PicasoError('AsyncDisplay is always pipelined.')
+
+    def batch(self):
+        raise PicasoError('AsyncDisplay does not support batches, use asyncio.gather().')
+
+    def add_hook(self, hook):
+        raise PicasoError('AsyncDisplay does not support command hooks.')
+
+    def set_baudrate(self, baudrate):
+        raise PicasoError('Change the baudrate with a Display on the same port '
+                          'before creating the AsyncDisplay.')
+
+    def negotiate_baudrate(self, *args, **kwargs):
+        raise PicasoError('Negotiate the baudrate with a Display on the same port '
+                          'before creating the AsyncDisplay.')
+
+    def gfx_polyline(self, points, color, closed=False, filled=False, tolerance=None):
+        if tolerance is not None:
+            from .simplify import simplify
+            points = simplify(points, tolerance)
+        commands = self._polyline_commands(points, color, closed, filled)
+        return asyncio.gather(*(self._send(payload, 0, None) for payload in commands))
+    gfx_polyline.__doc__ = Display.gfx_polyline.__doc__
+
+    def gfx_blit(self, x, y, image, dither=None):
+        commands = self._blit_commands(x, y, image, dither)
+        return asyncio.gather(*(self._send(payload, 0, None) for payload in commands))
+    gfx_blit.__doc__ = Display.gfx_blit.__doc__
+
+    async def drain(self):
+        """Wait until the replies of all sent commands have been received."""
+        futures = [item[0] for item in self._pending]
+        if futures:
+            await asyncio.wait(futures)
+
+    def close(self):
+        """Stop watching the serial port and close it."""
+        if self._loop is not None:
+            self._loop.remove_reader(self._fd)
+            self._loop.remove_writer(self._fd)
+        self._fail(CommunicationError('Display was closed.'))
+        self._ser.close()
+
+    ### Display control ###
+
+    async def get_display_size(self):
+        """
+        Get the display size in pixels, for the current orientation. The size
+        is cached after the first call.
+
+        :returns: Tuple ``(width, height)``.
+        :rtype: tuple(int, int)
+
+        """
+        if self._size is None:
+            return await self.refresh_geometry()
+        return self._size
+
+    async def refresh_geometry(self):
+        """
+        Re-read the display size from the device and update the cache.
+
+        :returns: Tuple ``(width, height)``.
+        :rtype: tuple(int, int)
+
+        """
+        decode = lambda response: _to_int(response) + 1
+        self._size = tuple(await asyncio.gather(
+            self.write_cmd([0xffa6, 0], 2, decode),
+            self.write_cmd([0xffa6, 1], 2, decode)))
+        return self._size
+
+
+class AsyncDisplayText(DisplayText):
+    """Text/String related functions of an :class:`AsyncDisplay`. All
+    methods return awaitables."""
+
+    async def set_size(self, multiplier):
+        return tuple(await asyncio.gather(self.set_width(multiplier), self.set_height(multiplier)))
+    set_size.__doc__ = DisplayText.set_size.__doc__
+
+    async def set_gap(self, pixelcount):
+        return tuple(await asyncio.gather(self.set_x_gap(pixelcount), self.set_y_gap(pixelcount)))
+    set_gap.__doc__ = DisplayText.set_gap.__doc__
+
+    async def get_character_width(self, character):
+        await self._prepare_metrics(character)
+        return self._glyph_sizes(character)[0][0]
+    get_character_width.__doc__ = DisplayText.get_character_width.__doc__
+
+    async def get_character_height(self, character):
+        await self._prepare_metrics(character)
+        return self._glyph_sizes(character)[0][1]
+    get_character_height.__doc__ = DisplayText.get_character_height.__doc__
+
+    async def probe_metrics(self, chars=metrics.PRINTABLE):
+        await self._prepare_metrics(chars)
+        if self.metrics.path is not None:
+            self.metrics.save()
+    probe_metrics.__doc__ = DisplayText.probe_metrics.__doc__
+
+    async def measure_string(self, string):
+        await self._prepare_metrics(string.replace('\n', '') + ' ')
+        return DisplayText.measure_string(self, string)
+    measure_string.__doc__ = DisplayText.measure_string.__doc__
+
+    async def fit_string(self, string, max_px):
+        await self._prepare_metrics(string)
+        return DisplayText.fit_string(self, string, max_px)
+    fit_string.__doc__ = DisplayText.fit_string.__doc__
+
+    async def _prepare_metrics(self, chars):
+        """
+        Fetch the text state and glyph sizes required to measure the
+        specified characters, so the synchronous base implementation can
+        work from the caches only.
+        """
+        unknown = [key for key in _METRIC_STATE if key not in self._state]
+        if unknown:
+            previous = await asyncio.gather(*(
+                self._set_state(key, _METRIC_STATE[key][0], _METRIC_STATE[key][1])
+                for key in unknown))
+            await asyncio.gather(*(
+                self._set_state(key, _METRIC_STATE[key][0], value)
+                for key, value in zip(unknown, previous) if value != self._state[key]))
+
+        key = self._metrics_key()
+        font, width, height, x_gap, y_gap = key
+        base_key = (font, 1, 1, x_gap, y_gap)
+        probe = self.metrics.missing(base_key, self.metrics.missing(key, chars))
+        if probe:
+            setup = [self.set_width(1), self.set_height(1)]
+            sizes = [asyncio.gather(
+                self.d.write_raw_cmd([0x00, 0x1e, ord(char)], 2, _to_int),
+                self.d.write_raw_cmd([0x00, 0x1d, ord(char)], 2, _to_int),
+            ) for char in probe]
+            restore = [self.set_width(width), self.set_height(height)]
+            results = await asyncio.gather(*(setup + sizes + restore))
+            for char, (char_width, char_height) in zip(probe, results[len(setup):]):
+                self.metrics.set(base_key, char, char_width, char_height)
+
+
+class AsyncDisplayTouch(DisplayTouch):
+    """Touchscreen related functions of an :class:`AsyncDisplay`. All
+    methods return awaitables. Touch events are polled by a coroutine
+    instead of a background thread."""
+
+    async def events(self, fast_interval=0.01, idle_interval=0.2):
+        """
+        Asynchronous iterator over touch events
+        (:class:`~picaso_lcd.touch.TouchEvent`), with the adaptive poll
+        rate described in :mod:`picaso_lcd.touch`::
+
+            async for event in disp.touch.events():
+                print(event)
+
+        Errors of a poll are raised by the iterator.
+
+        :param fast_interval: Poll interval in seconds while the screen is
+            touched.
+        :type fast_interval: float
+        :param idle_interval: Maximum poll interval in seconds while the
+            screen is not touched.
+        :type idle_interval: float
+
+        """
+        tracker = TouchPoller(self, None, fast_interval, idle_interval)
+        interval = fast_interval
+        while True:
+            state, x, y = await asyncio.gather(
+                self.get_status(0), self.get_status(1), self.get_status(2))
+            event = tracker._track(state, (x, y))
+            if event is not None:
+                yield event
+            interval = tracker._next_interval(interval)
+            await asyncio.sleep(interval)
+
+    def on_event(self, callback, **kwargs):
+        """
+        Call ``callback(event)`` for every touch event, from a task of the
+        running event loop.
+
+        :param callback: The function to call.
+        :type callback: callable
+        :param kwargs: Poll intervals, see :meth:`events`.
+        :returns: The polling task. Cancel it to stop polling. If a poll
+            fails, the task finishes with the exception.
+        :rtype: asyncio.Task
+
+        """
+        async def run():
+            async for event in self.events(**kwargs):
+                callback(event)
+        return asyncio.ensure_future(run())
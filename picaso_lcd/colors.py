@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, division, absolute_import, unicode_literals
 
+from . import utils
+
 ALICEBLUE = 0xF7DF
 ANTIQUEWHITE = 0xFF5A
 AQUA = 0x07FF
@@ -141,3 +143,75 @@ WHITE = 0xFFFF
 WHITESMOKE = 0xF7BE
 YELLOW = 0xFFE0
 YELLOWGREEN = 0x9E66
+
+
+def palette():
+    """
+    Return the named colors of this module.
+
+    :returns: Dictionary ``name -> 16 bit color``.
+    :rtype: dict
+
+    """
+    return dict((name, value) for name, value in globals().items()
+                if name.isupper() and isinstance(value, int))
+
+
+# Nearest palette entry for every 16 bit color, built on first use
+_NEAREST = {}
+
+
+def _nearest_index():
+    """Return the palette names (sorted, without duplicate colors) and the
+    index of the nearest one for every 16 bit color."""
+    if not _NEAREST:
+        numpy = utils.numpy
+        names = []
+        seen = set()
+        for name, value in sorted(palette().items()):
+            if value not in seen:
+                seen.add(value)
+                names.append(name)
+        values = numpy.array([globals()[name] for name in names], dtype=numpy.uint16)
+        candidates = utils.rgb565_to_rgb888(values).astype(numpy.int32)
+        everything = utils.rgb565_to_rgb888(numpy.arange(1 << 16)).astype(numpy.int32)
+        index = numpy.empty(1 << 16, dtype=numpy.uint8)
+        for start in range(0, 1 << 16, 4096):
+            block = everything[start:start + 4096, None, :] - candidates[None, :, :]
+            index[start:start + 4096] = (block * block).sum(axis=2).argmin(axis=1)
+        _NEAREST['names'] = names
+        _NEAREST['values'] = values
+        _NEAREST['index'] = index
+    return _NEAREST
+
+
+def nearest_color(colors):
+    """
+    Map 16 bit colors to the nearest named colors of this module (by
+    euclidean distance in RGB space), using a precomputed lookup table.
+    Requires NumPy.
+
+    :param colors: The 16 bit colors.
+    :type colors: int or numpy.ndarray
+    :returns: The nearest named colors, with the same shape.
+    :rtype: int or numpy.ndarray
+
+    """
+    nearest = _nearest_index()
+    result = nearest['values'][nearest['index'][utils.numpy.asarray(colors, dtype=utils.numpy.uint16)]]
+    return int(result) if result.ndim == 0 else result
+
+
+def nearest_name(color):
+    """
+    Return the name of the nearest named color. Requires NumPy.
+
+    :param color: The 16 bit color.
+    :type color: int
+    :returns: The name, e.g. ``'RED'``. If several names share a color, the
+        alphabetically first one is returned.
+    :rtype: str
+
+    """
+    nearest = _nearest_index()
+    return nearest['names'][nearest['index'][color]]
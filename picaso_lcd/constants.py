@@ -1 +1,13 @@
 ACK = 0x06
+NAK = 0x15
+
+# Touch states, as returned by the touch status poll
+NOTOUCH = 0
+PRESS = 1
+RELEASE = 2
+MOVING = 3
+
+# Baudrates of the serial link, indexed by the SPE baudrate index
+BAUD_RATES = [110, 300, 600, 1200, 2400, 4800, 9600, 14400, 19200, 31250,
+              38400, 56000, 57600, 115200, 128000, 256000, 300000, 375000,
+              500000, 600000]
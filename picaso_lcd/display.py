@@ -6,22 +6,55 @@ instance at ``display.foo``.
 """
 from __future__ import print_function, division, absolute_import, unicode_literals
 
+import collections
+import contextlib
+import time
+
 import serial
-from . import utils
-from .constants import ACK
-from .exceptions import PicasoError, CommunicationError
+from . import utils, metrics
+from .constants import ACK, BAUD_RATES
+from .exceptions import PicasoError, CommunicationError, BatchError
+from .futures import CommandFuture
+from .instrumentation import Instrumentation
+from .touch import TouchPoller, TouchRegions, iter_events
+
+
+_clock = getattr(time, 'perf_counter', time.time)
 
 
+_ACK_BYTE = bytes(bytearray([ACK]))
+
 # TODO introduce logging
 
+
+def _to_int(response):
+    """Decode a two byte response into a single integer."""
+    return utils.dbyte_to_int(*response)
+
+
 class Display(object):
     """This class represents a 4D Systems serial LCD. It's the main class of
     this project."""
 
+    #: Maximum number of points per polyline command. Longer paths are split
+    #: into multiple commands by :meth:`gfx_polyline`.
+    max_polyline_vertices = 256
+
+    #: Approximate maximum size of a single blit command in bytes. Larger
+    #: images are split into multiple commands by :meth:`gfx_blit`.
+    max_blit_bytes = 4096
+
+    #: Whether text state setters skip values that are already active (see
+    #: :class:`DisplayText`).
+    skip_redundant_state = True
+
     def __init__(self, port, baudrate=9600, read_timeout=10, write_timeout=10):
         """
-        :param port: serial port to which the display is connected
-        :type port: str or unicode
+        :param port: serial port to which the display is connected, or an
+            already opened serial port object (e.g. an
+            :class:`~picaso_lcd.emulator.EmulatedDevice`). In the latter case,
+            the remaining arguments are ignored.
+        :type port: str or unicode or serial.Serial
         :param baudrate: default 9600 in SPE2 rev 1.1
         :type baudrate: int
         :param read_timeout: Serial read timeout. This may be ``None``
@@ -33,22 +66,44 @@ class Display(object):
         :rtype: Display instance
 
         """
-        self._ser = serial.Serial(port, baudrate=baudrate, stopbits=1,
-                timeout=read_timeout, writeTimeout=write_timeout)
+        if hasattr(port, 'read') and hasattr(port, 'write'):
+            self._ser = port
+        else:
+            self._ser = serial.Serial(port, baudrate=baudrate, stopbits=1,
+                    timeout=read_timeout, writeTimeout=write_timeout)
         self._contrast = 15
 
+        # Cached geometry: (width, height) and orientation, None if unknown
+        self._size = None
+        self._orientation = None
+
+        # Pipelined mode: Commands that have been sent but not acknowledged
+        # yet, as (future, return_bytes, decode, info) tuples in sending
+        # order. info is None unless hooks are installed, in which case it
+        # contains (payload, write_time, time_written).
+        self._window = 0
+        self._inflight = collections.deque()
+
+        # Batch mode: Queued (payload, return_bytes, decode, future) tuples,
+        # or None if no batch is active.
+        self._batch = None
+
+        # Command hooks, see add_hook()
+        self._hooks = []
+
         # Initialize subsystems
         self.text = DisplayText(self)
         self.touch = DisplayTouch(self)
 
     ### Serial communication handling ###
 
-    def write_cmd(self, cmd, return_bytes=0):
+    def write_cmd(self, cmd, return_bytes=0, decode=None):
         """
         Write list of words to the serial port.
 
         Values are always converted into a word (16bit value, consisting of two
         bytes: high byte, low byte) even if they would fit into a single byte.
+        The whole command is packed into a single buffer and written at once.
 
         The communication protocol is based on exchanging words. Only a few
         special commands use single byte values, in this case use write_raw_cmd
@@ -58,60 +113,376 @@ class Display(object):
         :type cmd: list of int
         :param return_bytes: Number of return bytes. Default 0.
         :type return_bytes: int
-        :returns: List of response bytes if there are any, else None.
+        :param decode: Optional function that is applied to the list of
+            response bytes. Its return value is returned instead.
+        :type decode: callable or None
+        :returns: List of response bytes if there are any, else None. In
+            pipelined mode, a :class:`~picaso_lcd.futures.CommandFuture` is
+            returned instead.
         :rtype: list or none
 
         """
-        for c in cmd:
-            high_byte, low_byte = utils.int_to_dbyte(c)
-            self._ser.write(chr(high_byte))
-            self._ser.write(chr(low_byte))
-        return self._get_ack(return_bytes)
+        return self._send(utils.pack_words(cmd), return_bytes, decode)
 
-    def write_raw_cmd(self, cmd, return_bytes=0):
+    def write_raw_cmd(self, cmd, return_bytes=0, decode=None):
         """
         Write list of bytes directly to the serial port.
 
-        :param cmd: List containing numeric bytes.
-        :type cmd: list of int
+        :param cmd: List containing numeric bytes (or a byte string).
+        :type cmd: list of int or bytes
         :param return_bytes: Number of return bytes. Default 0.
         :type return_bytes: int
-        :returns: List of response bytes if there are any, else None.
+        :param decode: Optional function that is applied to the list of
+            response bytes. Its return value is returned instead.
+        :type decode: callable or None
+        :returns: List of response bytes if there are any, else None. In
+            pipelined mode, a :class:`~picaso_lcd.futures.CommandFuture` is
+            returned instead.
         :rtype: list or none
 
         """
-        for c in cmd:
-            self._ser.write(chr(c))
-        return self._get_ack(return_bytes)
+        return self._send(bytes(bytearray(cmd)), return_bytes, decode)
+
+    def _send(self, payload, return_bytes, decode):
+        """
+        Send an encoded command and handle its reply according to the current
+        communication mode.
+        """
+        if self._batch is not None:
+            future = CommandFuture()
+            self._batch.append((payload, return_bytes, decode, future))
+            return future
+
+        if self._window:
+            future = CommandFuture(self._wait_for)
+            if self._hooks:
+                start = _clock()
+                self._ser.write(payload)
+                written = _clock()
+                info = (payload, written - start, written)
+            else:
+                self._ser.write(payload)
+                info = None
+            self._inflight.append((future, return_bytes, decode, info))
+            while len(self._inflight) > self._window:
+                self._receive_next()
+            return future
+
+        if self._hooks:
+            start = _clock()
+            self._ser.write(payload)
+            written = _clock()
+            values = self._get_ack_instrumented(payload, return_bytes, written - start, written)
+        else:
+            self._ser.write(payload)
+            values = self._get_ack(return_bytes)
+        return values if decode is None else decode(values)
 
     def _get_ack(self, return_bytes=0):
         """
         Wait for the ACK byte. If applicable, fetch and return the response
         values.
 
+        The response values are only requested after an ACK. A NAK is not
+        followed by any, so reading them as well would block until the read
+        timeout (or consume the reply of the next pipelined command).
+
         :param return_bytes: Number of return bytes. Default 0.
         :type return_bytes: int
         :returns: List of response bytes if there are any, else None.
         :rtype: list or none
 
+        """
+        data = self._ser.read(1)
+        if return_bytes and data == _ACK_BYTE:
+            data += self._ser.read(return_bytes)
+        return self._parse_reply(data, return_bytes)
+
+    def _get_ack_instrumented(self, payload, return_bytes, write_time, written):
+        """
+        Like :meth:`_get_ack`, but read the ACK byte and the response values
+        separately and report the command to the installed hooks.
+
+        :param payload: The encoded command.
+        :param write_time: The time spent writing the command.
+        :param written: The time at which the write finished.
+
+        """
+        ack = self._ser.read(1)
+        acked = _clock()
+        rest = self._ser.read(return_bytes) if return_bytes and ack == _ACK_BYTE else b''
+        replied = _clock()
+        data = ack + rest
+        for hook in self._hooks:
+            hook.command(payload, data, write_time, acked - written, replied - acked)
+        return self._parse_reply(data, return_bytes)
+
+    @staticmethod
+    def _parse_reply(data, return_bytes):
+        """
+        Verify and decode a raw reply, consisting of the ACK byte followed by
+        the response values.
+
+        :param data: The bytes read from the serial port.
+        :type data: bytes
+        :param return_bytes: Number of expected return bytes.
+        :type return_bytes: int
+        :returns: List of response bytes if there are any, else None.
+        :rtype: list or none
+        :raises: PicasoError, CommunicationError
+
         """
         # First return value must be an ACK byte (0x06).
-        ack = self._ser.read()
-        if not ack:
+        if not data:
             raise CommunicationError('Read timeout reached.')
-        if ord(ack) != ACK:
-            msg = 'Instead of an ACK byte, "{!r}" was returned.'.format(ord(ack))
-            print(msg)
+        reply = bytearray(data)
+        if reply[0] != ACK:
+            msg = 'Instead of an ACK byte, "{!r}" was returned.'.format(reply[0])
             raise PicasoError(msg)
+        if len(reply) < 1 + return_bytes:
+            raise CommunicationError('Read timeout reached.')
+
+        # If applicable, return response values
+        return list(reply[1:]) if return_bytes else None
+
+    ### Instrumentation ###
+
+    def add_hook(self, hook):
+        """
+        Install a command hook. After every command, the hook's method
+        ``command(payload, reply, write_time, ack_time, reply_time)`` is
+        called with the encoded command, the raw reply (including the ACK
+        byte) and the timings in seconds (``None`` if not measured). See
+        :class:`~picaso_lcd.instrumentation.Instrumentation` for details.
+
+        Without any hooks installed, no timing information is collected.
+
+        :param hook: The hook to install.
+
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Remove a previously installed command hook."""
+        self._hooks.remove(hook)
+
+    def instrument(self, callback=None):
+        """
+        Install and return a new
+        :class:`~picaso_lcd.instrumentation.Instrumentation` hook, which
+        records statistics per opcode. Use its ``stats()`` method to get a
+        snapshot.
 
-        # If applicable, fetch response values
-        values = [] if return_bytes else None
-        for i in xrange(return_bytes):
-            val = ord(self._ser.read())
-            print('Return byte: {0}'.format(val))
-            values.append(val)
+        :param callback: Optional function that is called with a
+            :class:`~picaso_lcd.instrumentation.CommandRecord` for every
+            command.
+        :type callback: callable or None
+        :rtype: Instrumentation
 
-        return values
+        """
+        instrumentation = Instrumentation(callback)
+        self.add_hook(instrumentation)
+        return instrumentation
+
+    ### Pipelined mode ###
+
+    def set_pipeline(self, window):
+        """
+        Enable or disable pipelined mode.
+
+        In pipelined mode, commands are sent without waiting for the reply of
+        the previous command. Up to ``window`` commands may be in flight at
+        the same time, their replies are matched to them in FIFO order. All
+        commands return a :class:`~picaso_lcd.futures.CommandFuture` that
+        resolves to the value the command would return in blocking mode, or
+        raises the error caused by that specific command.
+
+        :param window: Maximum number of unacknowledged commands. Use ``0`` to
+            switch back to blocking mode (pending replies are fetched first).
+        :type window: int
+
+        """
+        if window < 0:
+            raise ValueError('Window size must not be negative')
+        if not window:
+            self.flush()
+        self._window = window
+
+    def flush(self):
+        """
+        Fetch the replies of all commands that are still in flight and
+        resolve their futures. Does nothing in blocking mode.
+        """
+        while self._inflight:
+            self._receive_next()
+
+    def _wait_for(self, future):
+        """Fetch replies until the specified future is resolved."""
+        while not future.done() and self._inflight:
+            self._receive_next()
+
+    def _receive_next(self):
+        """Fetch the reply of the oldest in-flight command."""
+        future, return_bytes, decode, info = self._inflight.popleft()
+        try:
+            if info is None:
+                values = self._get_ack(return_bytes)
+            else:
+                values = self._get_ack_instrumented(info[0], return_bytes, info[1], info[2])
+            result = values if decode is None else decode(values)
+        except CommunicationError as e:
+            # The reply stream can't be matched to the commands anymore.
+            future.set_exception(e)
+            while self._inflight:
+                self._inflight.popleft()[0].set_exception(e)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    def _deferred(self):
+        """Return whether commands currently return futures (pipelined or
+        batch mode)."""
+        return self._batch is not None or bool(self._window)
+
+    def _resolved(self, value):
+        """
+        Return a value that is known without communicating with the device,
+        wrapped into a resolved future if commands are currently deferred
+        (pipelined or batch mode).
+        """
+        if not self._deferred():
+            return value
+        future = CommandFuture()
+        future.set_result(value)
+        return future
+
+    ### Batch mode ###
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Context manager that coalesces all commands issued inside the block
+        into a single burst.
+
+        Inside the block, commands are only queued and return a
+        :class:`~picaso_lcd.futures.CommandFuture`. When the block exits, all
+        commands are written at once and their replies are fetched with a
+        single read. The futures are resolved afterwards. If any command
+        failed, a :class:`~picaso_lcd.exceptions.BatchError` containing the
+        indices of the failed commands is raised.
+
+        If the block raises an exception, the queued commands are discarded.
+        Nested batches are merged into the outermost batch. The list of a
+        nested batch contains the futures of its own block, which are only
+        resolved when the outermost batch is sent.
+
+        **Example:**
+
+        .. sourcecode:: python
+
+            with disp.batch() as futures:
+                disp.gfx_line(0, 0, 100, 100, colors.RED)
+                prev_color = disp.text.set_fg_color(colors.WHITE)
+                disp.text.put_string('Hello')
+            print(prev_color.result())
+
+        :returns: The list of futures of all queued commands, in issue order.
+        :rtype: list of CommandFuture
+
+        """
+        if self._batch is not None:
+            start = len(self._batch)
+            futures = []
+            yield futures
+            futures.extend(item[3] for item in self._batch[start:])
+            return
+
+        self.flush()
+        self._batch = []
+        futures = []
+        try:
+            yield futures
+            items = self._batch
+        finally:
+            self._batch = None
+        futures.extend(item[3] for item in items)
+        self._flush_batch(items)
+
+    def _flush_batch(self, items):
+        """
+        Write the queued batch commands in one go, fetch all replies with a
+        single read and resolve the futures.
+        """
+        errors = self._exchange(items)
+        if errors:
+            raise BatchError(errors)
+
+    def _exchange(self, items):
+        """
+        Write a list of ``(payload, return_bytes, decode, future)`` commands
+        in one go, fetch the replies and resolve the futures.
+
+        A NAK is not followed by response values, so the size of a reply is
+        only known once its first byte was read. Reads therefore only
+        request bytes that are certain to arrive (the rest of the current
+        reply plus one byte per later command). Requesting the optimistic
+        total would block until the read timeout after a NAK.
+
+        :returns: List of ``(index, exception)`` tuples of failed commands.
+        :rtype: list
+
+        """
+        if not items:
+            return []
+        buf = b''.join(item[0] for item in items)
+        start = _clock()
+        self._ser.write(buf)
+        write_time = _clock() - start
+        data = bytearray()
+        complete = True  # No read timed out yet
+
+        errors = []
+        offset = 0
+        for index, (payload, return_bytes, decode, future) in enumerate(items):
+            later = len(items) - index - 1
+            complete = complete and self._read_into(data, offset + 1 + later)
+            if offset < len(data) and data[offset] != ACK:
+                # A NAK is not followed by any response values
+                size = 1
+            else:
+                size = 1 + return_bytes
+                complete = complete and self._read_into(data, offset + size + later)
+            reply, offset = data[offset:offset + size], offset + size
+            for hook in self._hooks:
+                hook.command(payload, bytes(reply), write_time * len(payload) / len(buf),
+                        None, None)
+            try:
+                values = self._parse_reply(bytes(reply), return_bytes)
+                result = values if decode is None else decode(values)
+            except Exception as e:
+                future.set_exception(e)
+                errors.append((index, e))
+            else:
+                future.set_result(result)
+        return errors
+
+    def _read_into(self, data, size):
+        """
+        Read from the serial port until the bytearray ``data`` holds
+        ``size`` bytes.
+
+        :returns: ``False`` if the read timed out.
+
+        """
+        missing = size - len(data)
+        if missing <= 0:
+            return True
+        chunk = self._ser.read(missing)
+        data.extend(chunk)
+        return len(chunk) == missing
+
+    ### Graphics ###
 
     def gfx_rect(self, x1, y1, x2, y2, color, filled=False):
         cmd = 0xffc5
@@ -119,63 +490,177 @@ class Display(object):
             cmd = 0xffc4
         return self.write_cmd([cmd, x1, y1, x2, y2, color])
 
-    def gfx_triangle(self, vertices, filled=False):
-        self.gfx_polyline(vertices, closed=True, filled=filled)
+    def gfx_triangle(self, vertices, color, filled=False):
+        return self.gfx_polyline(vertices, color, closed=True, filled=filled)
 
-    def gfx_polyline(self, lines, color, closed=False, filled=False):
+    def gfx_polyline(self, points, color, closed=False, filled=False, tolerance=None):
         """
-        A polyline could be closed or filled, where filled is always closed.
+        Draw a polyline through the specified points. A polyline could be
+        closed or filled, where filled is always closed.
+
+        The points may be a NumPy array of shape ``(n, 2)``, which is encoded
+        without iterating over it in Python. Open and closed paths with more
+        than :attr:`max_polyline_vertices` points are split into multiple
+        commands that share their endpoints. They are sent as a single
+        burst, using a batch unless one is already active.
+
+        :param points: The ``(x, y)`` points.
+        :type points: sequence of (int, int) or numpy.ndarray
+        :param color: The line color.
+        :type color: int
+        :param closed: Whether to connect the last point to the first one.
+        :type closed: bool
+        :param filled: Whether to draw a filled polygon.
+        :type filled: bool
+        :param tolerance: If specified, the path is simplified first (see
+            :func:`picaso_lcd.simplify.simplify`, requires NumPy), so that
+            it deviates at most this many pixels from the original one.
+        :type tolerance: float or None
+        :raises: ValueError if a filled polygon has too many points.
+
         """
+        if tolerance is not None:
+            from .simplify import simplify
+            points = simplify(points, tolerance)
+        commands = self._polyline_commands(points, color, closed, filled)
+        if len(commands) == 1 or self._batch is not None:
+            results = [self._send(payload, 0, None) for payload in commands]
+            return results[-1]
+        with self.batch():
+            for payload in commands:
+                self._send(payload, 0, None)
+        return self._resolved(None)
+
+    def _polyline_commands(self, points, color, closed, filled):
+        """Encode a polyline as list of commands with at most
+        :attr:`max_polyline_vertices` points each."""
         cmd = 0x0015
         if closed:
             cmd = 0x0013
         if filled:
             cmd = 0x0014
-        size = len(lines)
-        print(size)
-        cmd_list = [cmd, size]
-        for point in lines:
-            x, y = point
-            cmd_list.append(x)
-        for point in lines:
-            x, y = point
-            cmd_list.append(y)
-        cmd_list.append(color)
-        self.write_cmd(cmd_list)
+        xs, ys = utils.split_points(points)
+        count = len(xs)
+        limit = self.max_polyline_vertices
+        if count > limit:
+            if filled:
+                raise ValueError('A filled polygon may have at most {} points.'.format(limit))
+            if closed:
+                # Draw the outline as open path back to the first point
+                cmd = 0x0015
+                xs, ys = self._close_path(xs, ys)
+                count += 1
+        step = limit - 1
+        starts = range(0, max(count - 1, 1), step) if count > limit else [0]
+        suffix = utils.pack_words([color])
+        commands = []
+        for start in starts:
+            end = min(start + limit, count)
+            commands.append(b''.join([
+                utils.pack_words([cmd, end - start]),
+                utils.pack_word_array(xs[start:end]),
+                utils.pack_word_array(ys[start:end]),
+                suffix,
+            ]))
+        return commands
+
+    @staticmethod
+    def _close_path(xs, ys):
+        if isinstance(xs, list):
+            return xs + xs[:1], ys + ys[:1]
+        return utils.numpy.append(xs, xs[:1]), utils.numpy.append(ys, ys[:1])
 
     def gfx_circle(self, x, y, rad, color, filled=False):
-        self.gfx_ellipse(x, y, rad, rad, color, filled=filled)
+        return self.gfx_ellipse(x, y, rad, rad, color, filled=filled)
 
     def gfx_ellipse(self, x, y, xrad, yrad, color, filled=False):
         cmd = 0xffb2
         if filled:
             cmd = 0xffb1
-        self.write_cmd([cmd, x, y, xrad, yrad, color])
+        return self.write_cmd([cmd, x, y, xrad, yrad, color])
 
     def gfx_line(self, x1, y1, x2, y2, color):
-        self.write_cmd([0xffc8, x1, y1, x2, y2, color])
+        return self.write_cmd([0xffc8, x1, y1, x2, y2, color])
 
-    def cls(self):
-        self.write_cmd([0xffcd])
+    def gfx_blit(self, x, y, image, dither=None):
+        """
+        Draw an image, with its top left corner at ``(x, y)``. Requires NumPy.
+
+        The pixels are converted to RGB565 in a single vectorized step and
+        sent as raw pixel data. Images larger than :attr:`max_blit_bytes`
+        are split into bands of rows (or tiles, if a single row is too
+        large), each sent with its own command.
+
+        :param x: X coordinate of the top left corner.
+        :type x: int
+        :param y: Y coordinate of the top left corner.
+        :type y: int
+        :param image: The image. Either an array of RGB565 colors of shape
+            ``(height, width)``, an array of 8 bit RGB (or RGBA) colors of
+            shape ``(height, width, 3 or 4)``, or a PIL image.
+        :type image: numpy.ndarray or PIL.Image.Image
+        :param dither: Dithering method for 8 bit RGB images, see
+            :func:`~picaso_lcd.utils.rgb888_to_rgb565`.
+        :type dither: str or None
+        :returns: The result of the last command.
 
+        """
+        result = None
+        for payload in self._blit_commands(x, y, image, dither):
+            result = self._send(payload, 0, None)
+        return result
+
+    def _blit_commands(self, x, y, image, dither=None):
+        """Encode an image as list of blit commands of at most
+        :attr:`max_blit_bytes` bytes each."""
+        if utils.numpy is None:
+            raise PicasoError('gfx_blit requires NumPy.')
+        pixels = utils.image_to_rgb565(image, dither)
+        height, width = pixels.shape
+        data = pixels.astype('>u2')
+        band_width = min(width, max(self.max_blit_bytes // 2, 1))
+        band_height = max(self.max_blit_bytes // (2 * band_width), 1)
+        commands = []
+        for top in range(0, height, band_height):
+            for left in range(0, width, band_width):
+                band = data[top:top + band_height, left:left + band_width]
+                commands.append(utils.pack_words(
+                    [0x000a, x + left, y + top, band.shape[1], band.shape[0]]) + band.tobytes())
+        return commands
+
+    def gfx_move_origin(self, x, y):
+        """
+        Move the origin to a new pixel position. Text written afterwards
+        (:meth:`DisplayText.put_string`) starts at this position.
 
+        :param x: X coordinate of the new origin.
+        :type x: int
+        :param y: Y coordinate of the new origin.
+        :type y: int
+
+        """
+        return self.write_cmd([0xffcc, x, y])
+
+    def cls(self):
+        return self.write_cmd([0xffcd])
+
+    ### Display control ###
 
     def set_background_color(self, color):
-        self.write_cmd([0xffa4, color], 2)
+        return self.write_cmd([0xffa4, color], 2, _to_int)
 
     def set_contrast(self, contrast):
         """Set the contrast. Note that this has no effect on most LCDs."""
-        val = self.write_cmd([0xff9c, contrast], 2)
-        print('turning off, contrast was: {0}'.format(val))
-        dbyte = map(ord, val)
-        self._contrast = utils.dbyte_to_int(*dbyte)
+        def decode(response):
+            self._contrast = _to_int(response)
+            return self._contrast
+        return self.write_cmd([0xff9c, contrast], 2, decode)
 
     def off(self):
-        self.set_contrast(0)
+        return self.set_contrast(0)
 
     def on(self):
-        print('contrast is: {0}'.format(self._contrast))
-        self.set_contrast(self._contrast)
+        return self.set_contrast(self._contrast)
 
     def set_orientation(self, value):
         """Set display orientation
@@ -184,26 +669,225 @@ class Display(object):
         2 = portrait
         3 = portrait reverse
 
+        The cached display size is updated accordingly.
+
         :returns: previous orientation
         """
-        response = self.write_cmd([0xff9e, value], 2)
-        return response[0]
+        if self._deferred():
+            # Don't hand out a stale size while the command is pending
+            self._size = None
+
+        def decode(response):
+            previous = _to_int(response)
+            if self._size is not None and (previous >= 2) != (value >= 2):
+                self._size = self._size[::-1]
+            self._orientation = value
+            return previous
+        return self.write_cmd([0xff9e, value], 2, decode)
+
+    @property
+    def orientation(self):
+        """The current display orientation (see :meth:`set_orientation`), or
+        ``None`` if it has not been set through this instance yet."""
+        return self._orientation
 
     def get_display_size(self):
-        x_dbyte = self.write_cmd([0xffa6, 0], 2)
-        y_dbyte = self.write_cmd([0xffa6, 1], 2)
+        """
+        Get the display size in pixels, for the current orientation.
+
+        The size is only fetched from the device on the first call and cached
+        afterwards. Use :meth:`refresh_geometry` to re-read it.
 
-        width = utils.dbyte_to_int(*x_dbyte)+1
-        height = utils.dbyte_to_int(*y_dbyte)+1
-        return width, height
+        :returns: Tuple ``(width, height)``.
+        :rtype: tuple(int, int)
+
+        """
+        if self._size is None:
+            return self.refresh_geometry()
+        return self._size
 
-    def set_baudrate(self, index):
-        self.write_cmd([0x0026, index])
+    def refresh_geometry(self):
+        """
+        Re-read the display size from the device and update the cache.
+
+        :returns: Tuple ``(width, height)``.
+        :rtype: tuple(int, int)
+
+        """
+        if self._batch is not None:
+            raise PicasoError('The display size can not be fetched inside of a batch.')
+        decode = lambda response: _to_int(response) + 1
+        with self.batch():
+            width = self.write_cmd([0xffa6, 0], 2, decode)
+            height = self.write_cmd([0xffa6, 1], 2, decode)
+        self._size = width.result(), height.result()
+        return self._size
+
+    def invalidate(self):
+        """
+        Forget all cached device state (text state, display size and
+        orientation), e.g. after the device was reset or the commands were
+        sent by other means.
+        """
+        self.text.invalidate()
+        self._size = None
+        self._orientation = None
+
+    ### Baudrate ###
+
+    @property
+    def baudrate(self):
+        """The current baudrate of the host serial port."""
+        return self._ser.baudrate
+
+    def set_baudrate(self, baudrate):
+        """
+        Change the baudrate of the device and of the host serial port.
+
+        The device acknowledges the command at the new baudrate, so the host
+        port is switched right after the command was written. Pending
+        pipelined commands are fetched first.
+
+        :param baudrate: The new baudrate, one of
+            :data:`~picaso_lcd.constants.BAUD_RATES`.
+        :type baudrate: int
+        :raises: ValueError if the baudrate is not supported by the device,
+            CommunicationError if no ACK was received at the new baudrate.
+
+        """
+        if baudrate not in BAUD_RATES:
+            raise ValueError('Unsupported baudrate: {}'.format(baudrate))
+        if self._batch is not None:
+            raise PicasoError('The baudrate can not be changed inside of a batch.')
+        self.flush()
+        self._switch_baudrate(utils.pack_words([0x0026, BAUD_RATES.index(baudrate)]), baudrate)
+
+    def _switch_baudrate(self, payload, baudrate):
+        """Write the encoded baudrate command, reconfigure the host port and
+        wait for the ACK at the new baudrate."""
+        self._ser.write(payload)
+        self._ser.flush()
+        self._ser.baudrate = baudrate
+        reply = bytearray(self._ser.read(1))
+        if not reply or reply[0] != ACK:
+            self._discard_input()
+            raise CommunicationError('No ACK received at {} baud.'.format(baudrate))
+
+    def _discard_input(self):
+        """Drop unread bytes (e.g. garbage received at a wrong baudrate)."""
+        reset = getattr(self._ser, 'reset_input_buffer', None)
+        if reset is None:  # pyserial < 3
+            reset = self._ser.flushInput
+        reset()
+
+    def verify_link(self, checks=8):
+        """
+        Check whether the link works reliably, by querying the display width
+        ``checks`` times in a single burst.
+
+        :param checks: Number of queries.
+        :type checks: int
+        :returns: Whether all replies were received and consistent.
+        :rtype: bool
+
+        """
+        if self._batch is not None:
+            raise PicasoError('The link can not be verified inside of a batch.')
+        try:
+            with self.batch():
+                futures = [self.write_cmd([0xffa6, 0], 2, _to_int) for _ in range(checks)]
+        except (PicasoError, CommunicationError):
+            self._discard_input()
+            return False
+        return len(set(future.result() for future in futures)) == 1
+
+    def negotiate_baudrate(self, max_baudrate=BAUD_RATES[-1], checks=8, timeout=0.5):
+        """
+        Switch to the highest baudrate up to ``max_baudrate`` at which the
+        link works reliably.
+
+        Starting at the highest candidate, the device and the host port are
+        switched to each baudrate and the link is verified with
+        :meth:`verify_link`. If that fails, the link is restored to the last
+        working baudrate and the next lower candidate is tried. Call this
+        right after opening the display (e.g. ``Display(port)`` at the
+        power on default of 9600 baud), while no other threads use it.
+
+        :param max_baudrate: Highest baudrate to try.
+        :type max_baudrate: int
+        :param checks: Number of queries used to verify each baudrate.
+        :type checks: int
+        :param timeout: Read timeout in seconds while probing, so a dead link
+            is detected quickly.
+        :type timeout: float
+        :returns: The negotiated baudrate.
+        :rtype: int
+        :raises: CommunicationError if the link does not work at the
+            current baudrate, or if it could not be restored after a failed
+            attempt.
+
+        """
+        if self._batch is not None:
+            raise PicasoError('The baudrate can not be changed inside of a batch.')
+        self.flush()
+        previous_timeout = self._ser.timeout
+        self._ser.timeout = timeout
+        try:
+            good = self.baudrate
+            if not self.verify_link(checks):
+                raise CommunicationError('The link does not work at {} baud.'.format(good))
+            for baudrate in reversed(BAUD_RATES):
+                if not good < baudrate <= max_baudrate:
+                    continue
+                try:
+                    self.set_baudrate(baudrate)
+                    if self.verify_link(checks):
+                        return baudrate
+                except CommunicationError:
+                    pass
+                self._restore_baudrate(good, checks)
+            return good
+        finally:
+            self._ser.timeout = previous_timeout
+
+    def _restore_baudrate(self, baudrate, checks):
+        """Return to a known good baudrate after a failed attempt, whether or
+        not the device switched to the failed baudrate."""
+        try:
+            self.set_baudrate(baudrate)
+            if self.verify_link(checks):
+                return
+        except CommunicationError:
+            pass
+        # The device never left the known good baudrate
+        self._ser.baudrate = baudrate
+        self._discard_input()
+        if not self.verify_link(checks):
+            raise CommunicationError('Lost the link to the display.')
+
+
+# Text state values that affect the font metrics: key -> (opcode, default)
+_METRIC_STATE = {
+    'font': (0xffe5, 3),
+    'width': (0xffe4, 1),
+    'height': (0xffe3, 1),
+    'x_gap': (0xffe2, 0),
+    'y_gap': (0xffe1, 0),
+}
 
 
 class DisplayText(object):
     """Text/String related functions. Can be accessed directly from a
-    :class:`Display` instance using ``display.text.<method>``."""
+    :class:`Display` instance using ``display.text.<method>``.
+
+    The text state of the device (colors, font, size, gaps and attributes) is
+    mirrored on the host. Setting a value that is already active returns
+    immediately, without communicating with the device (unless
+    :attr:`Display.skip_redundant_state` is disabled, as it is for
+    :class:`~picaso_lcd.threaded.ThreadedDisplay`). If the state of the
+    device was changed by other means (e.g. a reset of the device), call
+    :meth:`invalidate`.
+    """
 
     def __init__(self, display):
         """
@@ -211,6 +895,47 @@ class DisplayText(object):
         :type display: Display
         """
         self.d = display
+        self._state = {}
+
+        #: The font metrics cache, see :meth:`measure_string`. Replace it with
+        #: :meth:`FontMetrics.for_model() <picaso_lcd.metrics.FontMetrics.for_model>`
+        #: to persist the metrics of a device model.
+        self.metrics = metrics.FontMetrics()
+
+    def invalidate(self):
+        """
+        Forget the cached text state. The next call to each setter will be
+        sent to the device again.
+        """
+        self._state.clear()
+
+    def _set_state(self, key, opcode, value):
+        """
+        Send a text state command unless the value is already active.
+
+        :returns: The previous value (or a future in pipelined / batch mode).
+
+        """
+        if self.d.skip_redundant_state and key in self._state and self._state[key] == value:
+            return self.d._resolved(value)
+        result = self.d.write_cmd([opcode, value], 2, _to_int)
+        self._remember(result, {key: value})
+        return result
+
+    def _remember(self, result, values):
+        """
+        Update the cached text state after a command was sent. If the command
+        is still pending, the values are forgotten again should it fail.
+        """
+        self._state.update(values)
+        if hasattr(result, 'add_done_callback'):
+            def forget(future):
+                # asyncio futures raise on exception() if they were cancelled
+                cancelled = getattr(future, 'cancelled', None)
+                if (cancelled is not None and cancelled()) or future.exception() is not None:
+                    for key in values:
+                        self._state.pop(key, None)
+            result.add_done_callback(forget)
 
     def move_cursor(self, line, column):
         """
@@ -232,7 +957,7 @@ class DisplayText(object):
         :returns: None
 
         """
-        self.d.write_cmd([0xffe9, line, column])
+        return self.d.write_cmd([0xffe9, line, column])
 
     def put_character(self, char):
         """
@@ -243,32 +968,33 @@ class DisplayText(object):
         :returns: None
 
         """
-        self.d.write_cmd([0xfffe, ord(char)])
+        return self.d.write_cmd([0xfffe, ord(char)])
 
     def put_string(self, string):
         """
         Write a string to the display. Maximum string length is 511 chars.
+        To wrap and draw longer texts, see :func:`picaso_lcd.layout.draw_text`.
 
-        :param string: The string to print. Must consist of printable ASCII
-            characters.
+        Non-ASCII characters are replaced by ASCII look-alikes (see
+        :func:`picaso_lcd.utils.transliterate`), which counts towards the
+        maximum length.
+
+        :param string: The string to print.
         :type string: str
+        :raises: ValueError if the encoded string is too long, PicasoError if
+            the device reports a different number of written characters.
 
         """
-        # Validate input
-        if len(string) > 511:
+        data = utils.encode_string(string)
+        if len(data) > 512:
             raise ValueError('Max string length is 511 chars')
 
-        # Build and send command
-        cmd = [0x00, 0x18]
-        for char in string:
-            cmd.append(ord(char))
-        cmd.append(0x00)
-        response = self.d.write_raw_cmd(cmd, 2)
-
-        # Verify return values
-        length_written = utils.dbyte_to_int(*response)
-        assert length_written == len(string), \
-                'Length of string does not match length of original string'
+        def decode(response):
+            length_written = _to_int(response)
+            if length_written != len(data) - 1:
+                raise PicasoError('Device wrote {0} of {1} characters'.format(
+                    length_written, len(data) - 1))
+        return self.d._send(b'\x00\x18' + data, 2, decode)
 
     def get_character_width(self, character):
         """
@@ -276,21 +1002,20 @@ class DisplayText(object):
 
         The *Character Width* command is used to calculate the width in pixel
         units for a character, based on the currently selected font. The font can be
-        proportional or mono-spaced. If the total width of the character exceeds 255
-        pixel units, the function will return the 'wrapped' (modulo 8) value.
+        proportional or mono-spaced.
 
-        TODO: Handle and hide this strange modulo stuff!
+        The width is looked up in the font metrics cache (see
+        :meth:`measure_string`) and only fetched from the device if it's not
+        cached yet. Unlike the raw device command, widths exceeding 255 pixel
+        units are not wrapped.
 
         :param character: The ASCII character for which to calculate the width.
         :type character: str
-        :returns: The width of the character. If the total width of the
-            character exceeds 255 pixel units, the function will return the
-            'wrapped' (modulo 8) value.
+        :returns: The width of the character.
         :rtype: int
 
         """
-        response = self.d.write_raw_cmd([0x00, 0x1e, ord(character)], 2)
-        return utils.dbyte_to_int(*response)
+        return self.d._resolved(self._glyph_sizes(character)[0][0])
 
     def get_character_height(self, character):
         """
@@ -298,22 +1023,146 @@ class DisplayText(object):
 
         The *Character Height* command is used to calculate the height in pixel
         units for a character, based on the currently selected font. The font
-        can be proportional or mono-spaced. If the total height of the
-        character exceeds 255 pixel units, the function will return the
-        'wrapped' (modulo 8) value.
+        can be proportional or mono-spaced.
 
-        TODO: Handle and hide this strange modulo stuff!
+        The height is looked up in the font metrics cache (see
+        :meth:`measure_string`) and only fetched from the device if it's not
+        cached yet. Unlike the raw device command, heights exceeding 255 pixel
+        units are not wrapped.
 
         :param character: The ASCII character for which to calculate the height.
         :type character: str
-        :returns: The height of the character. If the total height of the
-            character exceeds 255 pixel units, the function will return the
-            'wrapped' (modulo 8) value.
+        :returns: The height of the character.
         :rtype: int
 
         """
-        response = self.d.write_raw_cmd([0x00, 0x1d, ord(character)], 2)
-        return utils.dbyte_to_int(*response)
+        return self.d._resolved(self._glyph_sizes(character)[0][1])
+
+    ### Font metrics ###
+
+    def probe_metrics(self, chars=metrics.PRINTABLE):
+        """
+        Fetch the sizes of all specified characters for the current text
+        state in a single burst and store them in the metrics cache. If the
+        cache is persisted, it's saved afterwards.
+
+        :param chars: The characters to probe. Defaults to all printable ASCII
+            characters.
+        :type chars: str
+
+        """
+        self._glyph_sizes(chars)
+        if self.metrics.path is not None:
+            self.metrics.save()
+
+    def measure_string(self, string):
+        """
+        Calculate the size of a string in pixels, using the current text
+        state. Character sizes are taken from the metrics cache (missing ones
+        are fetched from the device in a single burst), so measuring a string
+        usually doesn't communicate with the device at all.
+
+        Newlines start a new line of text.
+
+        :param string: The string to measure.
+        :type string: str
+        :returns: Tuple ``(width, height)``.
+        :rtype: tuple(int, int)
+
+        """
+        lines = string.split('\n')
+        sizes = self._glyph_sizes(''.join(lines) + ' ')
+        line_height = sizes.pop()[1]
+        x_gap, y_gap = self._state['x_gap'], self._state['y_gap']
+        width = height = offset = 0
+        for line in lines:
+            line_sizes, offset = sizes[offset:offset + len(line)], offset + len(line)
+            if line_sizes:
+                width = max(width, sum(w for w, h in line_sizes) + x_gap * (len(line) - 1))
+                height += max(h for w, h in line_sizes)
+            else:
+                height += line_height
+        return width, height + y_gap * (len(lines) - 1)
+
+    def fit_string(self, string, max_px):
+        """
+        Return the longest prefix of a (single line) string that fits into
+        the specified width, using the current text state.
+
+        :param string: The string to fit.
+        :type string: str
+        :param max_px: The available width in pixels.
+        :type max_px: int
+        :returns: The longest fitting prefix (may be empty).
+        :rtype: str
+
+        """
+        x_gap = None
+        width = 0
+        for i, (w, h) in enumerate(self._glyph_sizes(string)):
+            width += w if x_gap is None else w + x_gap
+            x_gap = self._state['x_gap']
+            if width > max_px:
+                return string[:i]
+        return string
+
+    def _metrics_key(self):
+        """
+        Return the metrics key for the current text state. Unknown state
+        values are fetched from the device first.
+        """
+        unknown = [key for key in _METRIC_STATE if key not in self._state]
+        if unknown:
+            # Setting a value returns the previous one, restore it afterwards.
+            with self.d.batch() as futures:
+                for key in unknown:
+                    opcode, default = _METRIC_STATE[key]
+                    self._set_state(key, opcode, default)
+            with self.d.batch():
+                for key, future in zip(unknown, futures):
+                    previous = future.result()
+                    if previous != self._state[key]:
+                        self._set_state(key, _METRIC_STATE[key][0], previous)
+        return tuple(self._state[key] for key in ('font', 'width', 'height', 'x_gap', 'y_gap'))
+
+    def _glyph_sizes(self, chars):
+        """
+        Return the list of ``(width, height)`` tuples for all characters,
+        fetching missing ones from the device in a single burst.
+
+        The device returns sizes wrapped to 8 bits. Therefore characters are
+        always probed with width and height multipliers of 1 and scaled on the
+        host.
+        """
+        if self.d._batch is not None:
+            key = tuple(self._state.get(k) for k in ('font', 'width', 'height', 'x_gap', 'y_gap'))
+            if None in key or self.metrics.missing(key, chars):
+                raise PicasoError('Font metrics are not cached yet, they can '
+                        'not be fetched inside of a batch.')
+        else:
+            key = self._metrics_key()
+        font, width, height, x_gap, y_gap = key
+        missing = self.metrics.missing(key, chars)
+        if missing:
+            base_key = (font, 1, 1, x_gap, y_gap)
+            probe = self.metrics.missing(base_key, missing)
+            if probe:
+                with self.d.batch():
+                    self.set_width(1)
+                    self.set_height(1)
+                    futures = [(
+                        char,
+                        self.d.write_raw_cmd([0x00, 0x1e, ord(char)], 2, _to_int),
+                        self.d.write_raw_cmd([0x00, 0x1d, ord(char)], 2, _to_int),
+                    ) for char in probe]
+                    self.set_width(width)
+                    self.set_height(height)
+                for char, char_width, char_height in futures:
+                    self.metrics.set(base_key, char, char_width.result(), char_height.result())
+            for char in missing:
+                base_width, base_height = self.metrics.get(base_key, char)
+                self.metrics.set(key, char, base_width * width, base_height * height)
+        return [self.metrics.get(key, char) for char in chars]
 
     def set_fg_color(self, color):
         """
@@ -328,8 +1177,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffe7, color], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('fg_color', 0xffe7, color)
 
     def set_bg_color(self, color):
         """
@@ -344,8 +1192,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffe6, color], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('bg_color', 0xffe6, color)
 
     def set_font(self, font):
         """
@@ -363,8 +1210,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffe5, font], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('font', 0xffe5, font)
 
     def set_width(self, multiplier):
         """
@@ -379,8 +1225,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffe4, multiplier], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('width', 0xffe4, multiplier)
 
     def set_height(self, multiplier):
         """
@@ -395,8 +1240,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffe3, multiplier], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('height', 0xffe3, multiplier)
 
     def set_size(self, multiplier):
         """
@@ -428,8 +1272,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffe2, pixelcount], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('x_gap', 0xffe2, pixelcount)
 
     def set_y_gap(self, pixelcount):
         """
@@ -450,8 +1293,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffe1, pixelcount], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('y_gap', 0xffe1, pixelcount)
 
     def set_gap(self, pixelcount):
         """
@@ -482,8 +1324,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffde, mode], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('bold', 0xffde, mode)
 
     def set_inverse(self, mode):
         """
@@ -498,8 +1339,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffdc, mode], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('inverse', 0xffdc, mode)
 
     def set_italic(self, mode):
         """
@@ -514,8 +1354,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffdd, mode], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('italic', 0xffdd, mode)
 
     def set_opacity(self, mode):
         """
@@ -531,8 +1370,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffdf, mode], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('opacity', 0xffdf, mode)
 
     def set_underline(self, mode):
         """
@@ -551,8 +1389,7 @@ class DisplayText(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xffdb, mode], 2)
-        return utils.dbyte_to_int(*response)
+        return self._set_state('underline', 0xffdb, mode)
 
     def set_attributes(self, bold=False, italic=False, inverse=False, underlined=False):
         """
@@ -596,14 +1433,22 @@ class DisplayText(object):
         if underlined is True:
             attributes |= UNDERLINED
 
-        response = self.d.write_cmd([0xffda, attributes], 2)
-        prev_attributes = utils.dbyte_to_int(*response)
-        return {
-            'bold': bool(prev_attributes & BOLD),
-            'italic': bool(prev_attributes & ITALIC),
-            'inverse': bool(prev_attributes & INVERSE),
-            'underlined': bool(prev_attributes & UNDERLINED),
-        }
+        def decode(response):
+            prev_attributes = _to_int(response)
+            return {
+                'bold': bool(prev_attributes & BOLD),
+                'italic': bool(prev_attributes & ITALIC),
+                'inverse': bool(prev_attributes & INVERSE),
+                'underlined': bool(prev_attributes & UNDERLINED),
+            }
+
+        # The device keeps these attributes separately from the values of
+        # the dedicated setters, so they are cached under their own key.
+        if self.d.skip_redundant_state and self._state.get('attributes') == attributes:
+            return self.d._resolved(decode(utils.int_to_dbyte(attributes)))
+        result = self.d.write_cmd([0xffda, attributes], 2, decode)
+        self._remember(result, {'attributes': attributes})
+        return result
 
 
 class DisplayTouch(object):
@@ -616,6 +1461,8 @@ class DisplayTouch(object):
         :type display: Display
         """
         self.d = display
+        #: Registry of touch regions, see :class:`~picaso_lcd.touch.TouchRegions`.
+        self.regions = TouchRegions(self)
 
     def set_detect_region(self, x1, y1, x2, y2):
         """
@@ -627,16 +1474,16 @@ class DisplayTouch(object):
         :meth:`get_status` command.
 
         :param x1: X coordinate of top left corner of the region
-        :type line: int
+        :type x1: int
         :param y1: Y coordinate of top left corner of the region
-        :type column: int
-        :param x1: X coordinate of bottom right corner of the region
-        :type line: int
-        :param y1: Y coordinate of bottom right corner of the region
-        :type column: int
+        :type y1: int
+        :param x2: X coordinate of bottom right corner of the region
+        :type x2: int
+        :param y2: Y coordinate of bottom right corner of the region
+        :type y2: int
 
         """
-        self.d.write_cmd([0xff39, line, column])
+        return self.d.write_cmd([0xff39, x1, y1, x2, y2])
 
     def set_mode(self, mode):
         """
@@ -655,7 +1502,7 @@ class DisplayTouch(object):
         :type mode: int
 
         """
-        self.d.write_cmd([0xff39, mode])
+        return self.d.write_cmd([0xff38, mode])
 
     def get_status(self, mode):
         """
@@ -685,5 +1532,33 @@ class DisplayTouch(object):
         :rtype: int
 
         """
-        response = self.d.write_cmd([0xff37, mode], 2)
-        return utils.dbyte_to_int(*response)
+        return self.d.write_cmd([0xff37, mode], 2, _to_int)
+
+    def events(self, **kwargs):
+        """
+        Return an iterator over touch events
+        (:class:`~picaso_lcd.touch.TouchEvent`), backed by a background
+        poller with adaptive poll rate. See :mod:`picaso_lcd.touch`. If
+        polling fails, the iterator raises the exception.
+
+        :param kwargs: Poll intervals, see
+            :class:`~picaso_lcd.touch.TouchPoller`.
+        :rtype: iterator
+
+        """
+        return iter_events(self, **kwargs)
+
+    def on_event(self, callback, **kwargs):
+        """
+        Call ``callback(event)`` for every touch event, from a background
+        poller thread. See :mod:`picaso_lcd.touch`.
+
+        :param callback: The function to call.
+        :type callback: callable
+        :param kwargs: Poll intervals and ``on_error`` callback, see
+            :class:`~picaso_lcd.touch.TouchPoller`.
+        :returns: The started poller, use its ``stop()`` method to stop it.
+        :rtype: TouchPoller
+
+        """
+        return TouchPoller(self, callback, **kwargs).start()
@@ -0,0 +1,542 @@
+# -*- coding: utf-8 -*-
+"""
+A pure Python emulation of a Picaso SPE device. An :class:`EmulatedDevice`
+provides the same interface as a :class:`serial.Serial` instance and can be
+passed to :class:`~picaso_lcd.display.Display` instead of a port name::
+
+    >>> from picaso_lcd import Display
+    >>> from picaso_lcd.emulator import EmulatedDevice
+    >>> disp = Display(EmulatedDevice())
+    >>> disp.get_display_size()
+    (480, 272)
+
+The emulator parses the command stream, keeps track of the device state and
+answers with ACKs and the same reply values as the device. Optionally, the
+time spent on the wire and the processing time of the device are simulated.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+import os
+import select
+import threading
+import time
+
+from .constants import ACK, BAUD_RATES, NAK, NOTOUCH, PRESS, RELEASE, MOVING
+
+
+_clock = getattr(time, 'monotonic', time.time)
+
+#: Glyph cell size ``(width, height)`` in pixels of the emulated fonts.
+FONT_SIZES = {
+    0: (7, 8),
+    1: (8, 8),
+    2: (8, 12),
+    3: (8, 12),
+}
+
+# Text state opcodes: opcode -> state key
+_TEXT_STATE = {
+    0xffe7: 'fg_color',
+    0xffe6: 'bg_color',
+    0xffe5: 'font',
+    0xffe4: 'width',
+    0xffe3: 'height',
+    0xffe2: 'x_gap',
+    0xffe1: 'y_gap',
+    0xffde: 'bold',
+    0xffdd: 'italic',
+    0xffdc: 'inverse',
+    0xffdf: 'opacity',
+    0xffdb: 'underline',
+    0xffda: 'attributes',
+}
+
+_TEXT_DEFAULTS = {
+    'fg_color': 0xffff,
+    'bg_color': 0x0000,
+    'font': 3,
+    'width': 1,
+    'height': 1,
+    'x_gap': 0,
+    'y_gap': 0,
+    'bold': 0,
+    'italic': 0,
+    'inverse': 0,
+    'opacity': 1,
+    'underline': 0,
+    'attributes': 0,
+}
+
+
+class EmulatedDevice(object):
+    """Emulated Picaso SPE device with a :class:`serial.Serial` compatible
+    interface (``write``, ``read``, ``in_waiting``, ``timeout``, ...)."""
+
+    def __init__(self, width=480, height=272, baudrate=9600, timeout=1,
+            simulate_wire=False, latency=0, command_delay=0, delays=None,
+            max_baudrate=None):
+        """
+        :param width: Native (landscape) display width in pixels.
+        :type width: int
+        :param height: Native (landscape) display height in pixels.
+        :type height: int
+        :param baudrate: Initial baudrate of the device and of the host side
+            (the ``baudrate`` attribute, which may be changed like the one of
+            a serial port). While both differ, written bytes are lost and
+            reply bytes are garbled.
+        :type baudrate: int
+        :param timeout: Read timeout in seconds. If not enough reply bytes
+            become available within the timeout, the available bytes are
+            returned. With ``None``, reads block until the requested bytes are
+            ready, but return immediately if the device is not going to send
+            them at all.
+        :type timeout: float or None
+        :param simulate_wire: Whether to simulate the transmission time of
+            every byte (10 bits per byte at ``baudrate``).
+        :type simulate_wire: bool
+        :param latency: Additional delay of every reply in seconds, e.g. to
+            simulate the latency timer of an USB serial converter.
+        :type latency: float
+        :param command_delay: Default processing time of a command in seconds.
+        :type command_delay: float
+        :param delays: Processing time in seconds per opcode, overrides
+            ``command_delay``.
+        :type delays: dict
+        :param max_baudrate: Highest baudrate at which the device replies
+            reliably. Above it, commands are still executed, but all reply
+            bytes are garbled.
+        :type max_baudrate: int or None
+        :rtype: EmulatedDevice instance
+
+        """
+        self.native_size = (width, height)
+        self.baudrate = baudrate
+        #: The baudrate the device currently uses.
+        self.device_baudrate = baudrate
+        self.max_baudrate = max_baudrate
+        self.timeout = timeout
+        self.simulate_wire = simulate_wire
+        self.latency = latency
+        self.command_delay = command_delay
+        self.delays = delays or {}
+
+        #: Number of processed commands per opcode.
+        self.command_counts = collections.Counter()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+        self._rx = bytearray()
+        self._tx = collections.deque()  # (ready time, bytearray, baudrate) segments
+        self._line_free = 0  # Time at which the host -> device line is idle
+        self._busy_until = 0  # Time at which the device finished processing
+
+        self._commands = {
+            0xffcd: (0, self._cls),
+            0xffc8: (5, self._draw('line')),
+            0xffc5: (5, self._draw('rect')),
+            0xffc4: (5, self._draw('rect_filled')),
+            0xffb2: (5, self._draw('ellipse')),
+            0xffb1: (5, self._draw('ellipse_filled')),
+            0xffcc: (2, self._move_origin),
+            0xffa4: (1, self._background_color),
+            0xff9c: (1, self._contrast),
+            0xff9e: (1, self._orientation),
+            0xffa6: (1, self._gfx_get),
+            0x0026: (1, self._baudrate),
+            0xffe9: (2, self._move_cursor),
+            0xfffe: (1, self._put_character),
+            0xff37: (1, self._touch_get),
+            0xff38: (1, self._touch_set),
+            0xff39: (4, self._touch_detect_region),
+        }
+        for opcode in _TEXT_STATE:
+            self._commands[opcode] = (1, self._text_state(_TEXT_STATE[opcode]))
+        for opcode, mode in ((0x0015, 'polyline'), (0x0013, 'polygon'),
+                (0x0014, 'polygon_filled')):
+            self._commands[opcode] = ('polyline', self._draw(mode))
+        self._commands[0x000a] = ('blit', self._draw('blit'))
+        self._commands[0x0018] = ('string', self._put_string)
+        self._commands[0x001e] = ('byte', self._char_width)
+        self._commands[0x001d] = ('byte', self._char_height)
+
+        self.reset()
+
+    def reset(self):
+        """Reset the device state to the power on defaults."""
+        self.text = dict(_TEXT_DEFAULTS)
+        self.background_color = 0x0000
+        self.contrast = 15
+        self.orientation = 0
+        self.baud_index = None
+        self.origin = (0, 0)
+        self.touch_mode = 0
+        self.touch_region = None
+        self.touch_state = NOTOUCH
+        self.touch_position = (0, 0)
+        self._touch_down = False
+
+    ### Serial interface ###
+
+    def write(self, data):
+        data = bytearray(data)
+        now = _clock()
+        start = max(now, self._line_free)
+        self._line_free = start + len(data) * self._byte_time(self.baudrate)
+        self.bytes_received += len(data)
+        if self.baudrate != self.device_baudrate:
+            # The device can't decode bytes sent at the wrong baudrate
+            return len(data)
+        self._rx += data
+        self._process(self._line_free)
+        return len(data)
+
+    def read(self, size=1):
+        deadline = None if self.timeout is None else _clock() + self.timeout
+        while True:
+            now = _clock()
+            ready, pending_until = self._available(size, now)
+            if ready >= size:
+                break
+            wake = pending_until
+            if deadline is not None:
+                wake = deadline if wake is None else min(wake, deadline)
+            if wake is None or wake <= now:
+                break
+            time.sleep(wake - now)
+        return bytes(self._pop(min(ready, size)))
+
+    @property
+    def in_waiting(self):
+        return self._available(None, _clock())[0]
+
+    def reset_input_buffer(self):
+        self._tx.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    ### Touch simulation ###
+
+    def touch_press(self, x, y):
+        """Simulate touching the screen at the specified position."""
+        self._touch_down = True
+        self.touch_position = (x, y)
+        self.touch_state = PRESS
+
+    def touch_move(self, x, y):
+        """Simulate moving the finger to the specified position."""
+        self.touch_position = (x, y)
+        if self.touch_state != PRESS:
+            self.touch_state = MOVING
+
+    def touch_release(self):
+        """Simulate lifting the finger from the screen."""
+        self._touch_down = False
+        self.touch_state = RELEASE
+
+    ### Internals ###
+
+    def _byte_time(self, baudrate):
+        return 10 / baudrate if self.simulate_wire else 0
+
+    def _available(self, size, now):
+        """
+        Return the number of bytes that are ready at time ``now`` and the
+        time at which ``size`` bytes will be ready (None if never).
+        """
+        ready = 0
+        total = 0
+        pending_until = None
+        for ready_time, segment, _ in self._tx:
+            total += len(segment)
+            if ready_time <= now:
+                ready += len(segment)
+            if pending_until is None and size is not None and total >= size:
+                pending_until = ready_time
+        return ready, pending_until
+
+    def _pop(self, size):
+        data = bytearray()
+        while len(data) < size:
+            ready_time, segment, baudrate = self._tx[0]
+            take = size - len(data)
+            if baudrate != self.baudrate or (self.max_baudrate is not None and
+                    baudrate > self.max_baudrate):
+                data += bytearray(len(segment[:take]))  # Garbled
+            else:
+                data += segment[:take]
+            if take >= len(segment):
+                self._tx.popleft()
+            else:
+                self._tx[0] = (ready_time, segment[take:], baudrate)
+        self.bytes_sent += len(data)
+        return data
+
+    def _reply(self, data, start):
+        """Queue a reply whose transmission starts at ``start``."""
+        baudrate = self.device_baudrate
+        ready = start + self.latency + len(data) * self._byte_time(baudrate)
+        self._tx.append((ready, data, baudrate))
+
+    def _process(self, received):
+        """Parse and execute all complete commands in the receive buffer."""
+        while True:
+            parsed = self._parse()
+            if parsed is None:
+                return
+            opcode, args, handler = parsed
+            start = max(received, self._busy_until)
+            self._busy_until = start + self.delays.get(opcode, self.command_delay)
+            self.command_counts[opcode] += 1
+            if handler is None:
+                reply = bytearray([NAK])
+            else:
+                try:
+                    values = handler(*args)
+                except ValueError:
+                    reply = bytearray([NAK])
+                else:
+                    reply = bytearray([ACK])
+                    for value in values or ():
+                        reply += bytearray([(value >> 8) & 0xff, value & 0xff])
+            self._reply(reply, self._busy_until)
+
+    def _parse(self):
+        """
+        Remove the next complete command from the receive buffer.
+
+        :returns: ``(opcode, args, handler)`` or None if the buffer doesn't
+            contain a complete command yet.
+
+        """
+        rx = self._rx
+        if len(rx) < 2:
+            return None
+        opcode = rx[0] << 8 | rx[1]
+        fmt, handler = self._commands.get(opcode, (0, None))
+        if fmt == 'string':
+            end = rx.find(b'\x00', 2)
+            if end < 0:
+                return None
+            args, size = (bytes(rx[2:end]),), end + 1
+        elif fmt == 'byte':
+            if len(rx) < 3:
+                return None
+            args, size = (rx[2],), 3
+        elif fmt == 'blit':
+            if len(rx) < 10:
+                return None
+            x, y, width, height = _words(rx[2:10])
+            size = 10 + 2 * width * height
+            if len(rx) < size:
+                return None
+            args = (x, y, width, height, bytes(rx[10:size]))
+        elif fmt == 'polyline':
+            if len(rx) < 4:
+                return None
+            count = rx[2] << 8 | rx[3]
+            size = 4 + 2 * (2 * count + 1)
+            if len(rx) < size:
+                return None
+            words = _words(rx[4:size])
+            args = (words[:count], words[count:2 * count], words[-1])
+        else:
+            size = 2 + 2 * fmt
+            if len(rx) < size:
+                return None
+            args = _words(rx[2:size])
+        del rx[:size]
+        return opcode, args, handler
+
+    ### Command handlers ###
+    # Handlers return a list of reply words (or None). A ValueError results
+    # in a NAK.
+
+    def _draw(self, primitive):
+        def handler(*args):
+            self._render(primitive, *args)
+        return handler
+
+    def _render(self, primitive, *args):
+        """Render a primitive. The plain emulator doesn't keep a framebuffer."""
+
+    def _cls(self):
+        self._render('cls', self.background_color)
+        self.origin = (0, 0)
+
+    def _move_origin(self, x, y):
+        self.origin = (x, y)
+
+    def _background_color(self, color):
+        previous, self.background_color = self.background_color, color
+        return [previous]
+
+    def _contrast(self, contrast):
+        previous, self.contrast = self.contrast, contrast
+        return [previous]
+
+    def _orientation(self, value):
+        if value > 3:
+            raise ValueError(value)
+        previous, self.orientation = self.orientation, value
+        return [previous]
+
+    def _gfx_get(self, mode):
+        width, height = self.size
+        if mode == 0:
+            return [width - 1]
+        if mode == 1:
+            return [height - 1]
+        raise ValueError(mode)
+
+    def _baudrate(self, index):
+        if index >= len(BAUD_RATES):
+            raise ValueError(index)
+        # The ACK is already sent at the new baudrate
+        self.baud_index = index
+        self.device_baudrate = BAUD_RATES[index]
+
+    def _text_state(self, key):
+        def handler(value):
+            previous, self.text[key] = self.text[key], value
+            return [previous]
+        return handler
+
+    def _move_cursor(self, line, column):
+        cell_width, cell_height = self._cell_size()
+        self.origin = (column * cell_width, line * cell_height)
+
+    def _put_character(self, code):
+        self._put_text(chr(code))
+
+    def _put_string(self, data):
+        self._put_text(data.decode('latin-1'))
+        return [len(data)]
+
+    def _put_text(self, string):
+        cell_width, cell_height = self._cell_size()
+        x, y = self.origin
+        for char in string:
+            if char == '\n':
+                x, y = 0, y + cell_height
+                continue
+            self._render('char', x, y, char)
+            x += cell_width
+        self.origin = (x, y)
+
+    def _char_width(self, code):
+        return [self._glyph_size()[0] & 0xff]
+
+    def _char_height(self, code):
+        return [self._glyph_size()[1] & 0xff]
+
+    def _glyph_size(self):
+        width, height = FONT_SIZES.get(self.text['font'], FONT_SIZES[3])
+        return width * self.text['width'], height * self.text['height']
+
+    def _cell_size(self):
+        width, height = self._glyph_size()
+        return width + self.text['x_gap'], height + self.text['y_gap']
+
+    def _touch_get(self, mode):
+        if mode == 0:
+            state = self.touch_state
+            if self.touch_mode == 1 or not self._in_touch_region():
+                state = NOTOUCH
+            if self.touch_state == PRESS and self._touch_down:
+                self.touch_state = MOVING
+            elif self.touch_state == RELEASE:
+                self.touch_state = NOTOUCH
+            return [state]
+        if mode == 1:
+            return [self.touch_position[0]]
+        if mode == 2:
+            return [self.touch_position[1]]
+        raise ValueError(mode)
+
+    def _touch_set(self, mode):
+        if mode == 2:
+            self.touch_region = None
+        elif mode in (0, 1):
+            self.touch_mode = mode
+        else:
+            raise ValueError(mode)
+
+    def _touch_detect_region(self, x1, y1, x2, y2):
+        self.touch_region = (x1, y1, x2, y2)
+
+    def _in_touch_region(self):
+        if self.touch_region is None:
+            return True
+        x1, y1, x2, y2 = self.touch_region
+        x, y = self.touch_position
+        return x1 <= x <= x2 and y1 <= y <= y2
+
+    @property
+    def size(self):
+        """The display size ``(width, height)`` for the current orientation."""
+        width, height = self.native_size
+        if self.orientation >= 2:
+            return height, width
+        return width, height
+
+
+class PtyBridge(object):
+    """Make an emulated device available as a pseudo terminal (POSIX only).
+
+    A background thread forwards the data between the pty and the device, so
+    the device can be used like a real serial port, including all the
+    overhead of the operating system's serial stack::
+
+        >>> bridge = PtyBridge(EmulatedDevice())
+        >>> disp = Display(bridge.port)
+        >>> bridge.close()
+
+    """
+
+    def __init__(self, device):
+        """
+        :param device: The emulated device.
+        :type device: EmulatedDevice
+        """
+        import pty
+        import tty
+        self.device = device
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        #: The path of the pty, to be opened as serial port.
+        self.port = os.ttyname(self._slave)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        """Stop forwarding and close the pty."""
+        self._closed = True
+        self._thread.join()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def _run(self):
+        device = self.device
+        while not self._closed:
+            readable, _, _ = select.select([self._master], [], [], 0.001)
+            if readable:
+                device.write(os.read(self._master, 4096))
+            waiting = device.in_waiting
+            if waiting:
+                os.write(self._master, device.read(waiting))
+
+
+def _words(data):
+    """Convert big endian byte pairs into a list of words."""
+    return [data[i] << 8 | data[i + 1] for i in range(0, len(data), 2)]
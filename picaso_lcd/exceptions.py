@@ -11,3 +11,19 @@ class PicasoError(RuntimeError):
 
 class CommunicationError(RuntimeError):
     """Communication with device failed (e.g. a serial read / write timeout)."""
+
+
+class BatchError(PicasoError):
+    """One or more commands of a batch failed.
+
+    The failed commands are available in the ``errors`` attribute as a list
+    of ``(index, exception)`` tuples, where ``index`` is the position of the
+    command within the batch. ``index`` is the position of the first failed
+    command.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.index = errors[0][0]
+        msg = '{0} command(s) of batch failed, first failure at command #{1}: {2}'
+        super(BatchError, self).__init__(msg.format(len(errors), self.index, errors[0][1]))
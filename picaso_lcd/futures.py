@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Futures representing the result of a command whose reply may not have been
+received yet (e.g. when the display is used in pipelined mode).
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+from .exceptions import CommunicationError
+
+
+class CommandFuture(object):
+    """The (future) result of a single display command.
+
+    A future is resolved with the decoded reply of its command, or with the
+    exception that occured while processing it. Calling :meth:`result` on a
+    pending future fetches replies from the device until the future is
+    resolved.
+    """
+
+    def __init__(self, wait=None):
+        """
+        :param wait: Callable that receives the future and fetches replies
+            until the future is resolved.
+        :type wait: callable or None
+        """
+        self._wait = wait
+        self._done = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def done(self):
+        """Return ``True`` if the future has been resolved."""
+        return self._done
+
+    def result(self):
+        """
+        Return the result of the command. Wait for the reply if necessary.
+
+        :returns: The decoded reply of the command.
+        :raises: The exception raised while processing the command.
+
+        """
+        self._wait_done()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self):
+        """
+        Return the exception raised while processing the command, or ``None``
+        if the command succeeded. Wait for the reply if necessary.
+        """
+        self._wait_done()
+        return self._exception
+
+    def add_done_callback(self, fn):
+        """
+        Call ``fn(future)`` as soon as the future is resolved. If the future
+        is already resolved, ``fn`` is called immediately.
+        """
+        if self._done:
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+
+    def set_result(self, result):
+        """Resolve the future with a result."""
+        self._result = result
+        self._resolve()
+
+    def set_exception(self, exception):
+        """Resolve the future with an exception."""
+        self._exception = exception
+        self._resolve()
+
+    def _resolve(self):
+        self._done = True
+        callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+    def _wait_done(self):
+        if not self._done and self._wait is not None:
+            self._wait(self)
+        if not self._done:
+            raise CommunicationError('Reply for command was never received.')
+
+    def __repr__(self):
+        if not self._done:
+            state = 'pending'
+        elif self._exception is not None:
+            state = 'raised {!r}'.format(self._exception)
+        else:
+            state = 'returned {!r}'.format(self._result)
+        return '<CommandFuture {0}>'.format(state)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Encode images as drawing commands (requires NumPy). Images that mostly
+consist of flat colors (icons, UI graphics) are much cheaper to send as
+filled rectangles and lines than as raw pixels::
+
+    >>> commands = draw_image(disp, 10, 10, logo)
+    >>> print('Sent {} bytes'.format(cost(commands)))
+
+The image is split into square tiles. Areas of uniform tiles become single
+rectangles. For every other tile, the cheapest of these encodings is used:
+
+- horizontal runs of equal color, merged into rectangles where they repeat
+  in consecutive rows (single row runs are drawn as lines),
+- a rectangle of the most frequent color, with the runs of all other colors
+  on top of it,
+- the raw pixels (see :meth:`Display.gfx_blit() <picaso_lcd.display.Display.gfx_blit>`).
+
+The cost of a command is the number of bytes on the wire, including the ACK.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+
+import numpy as np
+
+from . import utils
+
+
+#: A filled rectangle of a single color.
+Fill = collections.namedtuple('Fill', ['x1', 'y1', 'x2', 'y2', 'color'])
+#: A horizontal line of a single color.
+Span = collections.namedtuple('Span', ['x1', 'y', 'x2', 'color'])
+#: Raw pixels (RGB565 array of shape ``(height, width)``).
+Pixels = collections.namedtuple('Pixels', ['x', 'y', 'pixels'])
+
+# Bytes on the wire: command words plus the ACK byte
+RECT_COST = 6 * 2 + 1
+LINE_COST = 6 * 2 + 1
+BLIT_COST = 5 * 2 + 1  # Plus two bytes per pixel
+
+
+def command_cost(command):
+    """Return the number of bytes needed to send a command."""
+    if isinstance(command, Pixels):
+        return BLIT_COST + 2 * command.pixels.size
+    if isinstance(command, Span):
+        return LINE_COST
+    return RECT_COST
+
+
+def cost(commands):
+    """Return the number of bytes needed to send a list of commands."""
+    return sum(command_cost(command) for command in commands)
+
+
+def _runs(pixels, skip=None):
+    """
+    Find the horizontal runs of equal color in all rows.
+
+    :returns: Arrays ``(rows, starts, ends, colors)``, in row major order.
+
+    """
+    height, width = pixels.shape
+    change = pixels[:, 1:] != pixels[:, :-1]
+    edge = np.ones((height, 1), dtype=bool)
+    rows, starts = np.nonzero(np.hstack([edge, change]))
+    ends = np.nonzero(np.hstack([change, edge]))[1]
+    colors = pixels[rows, starts]
+    if skip is not None:
+        keep = colors != skip
+        rows, starts, ends, colors = rows[keep], starts[keep], ends[keep], colors[keep]
+    return rows, starts, ends, colors
+
+
+def _merge_runs(rows, starts, ends, colors):
+    """Merge runs with the same columns and color in consecutive rows into
+    rectangles ``(x1, y1, x2, y2, color)``."""
+    rects = []
+    active = {}  # (x1, x2, color) -> [y1, y2]
+    for row, start, end, color in zip(rows.tolist(), starts.tolist(), ends.tolist(),
+                                      colors.tolist()):
+        key = start, end, color
+        rect = active.get(key)
+        if rect is not None and rect[1] == row - 1:
+            rect[1] = row
+            continue
+        if rect is not None:
+            rects.append((start, rect[0], end, rect[1], color))
+        active[key] = [row, row]
+    for (start, end, color), (top, bottom) in active.items():
+        rects.append((start, top, end, bottom, color))
+    return rects
+
+
+def _to_commands(rects, x, y):
+    return [Span(x + x1, y + y1, x + x2, color) if y1 == y2 else
+            Fill(x + x1, y + y1, x + x2, y + y2, color)
+            for x1, y1, x2, y2, color in rects]
+
+
+def _encode_tile(tile, x, y):
+    """Return the cheapest list of commands for a tile."""
+    height = tile.shape[0]
+    best = [Pixels(x, y, tile)]
+    best_cost = command_cost(best[0])
+
+    runs = _runs(tile)
+    # Every rectangle covers at most one run per row
+    if len(runs[0]) // height * RECT_COST < best_cost:
+        commands = _to_commands(_merge_runs(*runs), x, y)
+        if cost(commands) < best_cost:
+            best, best_cost = commands, cost(commands)
+
+    values, counts = np.unique(tile, return_counts=True)
+    dominant = values[counts.argmax()]
+    runs = _runs(tile, skip=dominant)
+    if RECT_COST + len(runs[0]) // height * RECT_COST < best_cost:
+        commands = [Fill(x, y, x + tile.shape[1] - 1, y + height - 1, int(dominant))]
+        commands += _to_commands(_merge_runs(*runs), x, y)
+        if cost(commands) < best_cost:
+            best = commands
+    return best
+
+
+def encode(image, tile_size=16):
+    """
+    Encode an image as list of drawing commands (:class:`Fill`,
+    :class:`Span` and :class:`Pixels`), with coordinates relative to the
+    top left corner of the image.
+
+    :param image: The image, see :meth:`Display.gfx_blit()
+        <picaso_lcd.display.Display.gfx_blit>`.
+    :type image: numpy.ndarray or PIL.Image.Image
+    :param tile_size: Edge length of the tiles in pixels.
+    :type tile_size: int
+    :returns: The commands.
+    :rtype: list
+
+    """
+    pixels = utils.image_to_rgb565(image).astype(np.int64)
+    height, width = pixels.shape
+    tiles_y, tiles_x = -(-height // tile_size), -(-width // tile_size)
+
+    # Uniform tiles are merged across tile boundaries
+    grid = np.full((tiles_y, tiles_x), -1, dtype=np.int64)
+    for ty in range(tiles_y):
+        for tx in range(tiles_x):
+            tile = pixels[ty * tile_size:(ty + 1) * tile_size, tx * tile_size:(tx + 1) * tile_size]
+            if (tile == tile[0, 0]).all():
+                grid[ty, tx] = tile[0, 0]
+
+    commands = []
+    for tx1, ty1, tx2, ty2, color in _merge_runs(*_runs(grid, skip=-1)):
+        commands.append(Fill(tx1 * tile_size, ty1 * tile_size,
+                             min((tx2 + 1) * tile_size, width) - 1,
+                             min((ty2 + 1) * tile_size, height) - 1, color))
+    for ty, tx in zip(*np.nonzero(grid < 0)):
+        x, y = tx * tile_size, ty * tile_size
+        tile = pixels[y:y + tile_size, x:x + tile_size].astype(np.uint16)
+        commands.extend(_encode_tile(tile, x, y))
+    return commands
+
+
+def draw_image(display, x, y, image, tile_size=16):
+    """
+    Draw an image using the cheapest commands per tile (see
+    :func:`encode`), in a single batch.
+
+    :param display: The display to draw on.
+    :type display: Display
+    :param x: X coordinate of the top left corner.
+    :type x: int
+    :param y: Y coordinate of the top left corner.
+    :type y: int
+    :param image: The image, see :meth:`Display.gfx_blit()
+        <picaso_lcd.display.Display.gfx_blit>`.
+    :type image: numpy.ndarray or PIL.Image.Image
+    :param tile_size: Edge length of the tiles in pixels.
+    :type tile_size: int
+    :returns: The commands that were sent.
+    :rtype: list
+
+    """
+    commands = encode(image, tile_size)
+    with display.batch():
+        for command in commands:
+            if isinstance(command, Pixels):
+                display.gfx_blit(x + command.x, y + command.y, command.pixels)
+            elif isinstance(command, Span):
+                display.gfx_line(x + command.x1, y + command.y, x + command.x2,
+                                 y + command.y, command.color)
+            else:
+                display.gfx_rect(x + command.x1, y + command.y1, x + command.x2,
+                                 y + command.y2, command.color, filled=True)
+    return commands
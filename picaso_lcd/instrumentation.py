@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Per command instrumentation. An :class:`Instrumentation` instance can be
+installed on a display, it records call counts, transferred bytes and timing
+histograms per opcode::
+
+    >>> instrumentation = disp.instrument()
+    >>> disp.cls()
+    >>> instrumentation.stats()[0xffcd]['count']
+    1
+
+Generally, every object with a ``command(payload, reply, write_time,
+ack_time, reply_time)`` method can be installed as hook using
+:meth:`Display.add_hook() <picaso_lcd.display.Display.add_hook>`.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+
+
+#: A single instrumented command, as passed to the export callback.
+CommandRecord = collections.namedtuple('CommandRecord', [
+    'opcode', 'bytes_written', 'bytes_read', 'write_time', 'ack_time', 'reply_time'])
+
+
+def opcode_of(payload):
+    """Return the opcode (first word) of an encoded command."""
+    payload = bytearray(payload[:2])
+    if len(payload) < 2:
+        return None
+    return payload[0] << 8 | payload[1]
+
+
+class Histogram(object):
+    """Histogram of durations with logarithmic buckets. Bucket ``i``
+    contains the durations ``d`` with ``2**(i-1) <= d < 2**i`` microseconds
+    (bucket 0 contains durations below one microsecond)."""
+
+    BUCKETS = 40
+
+    def __init__(self):
+        self.buckets = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, duration):
+        """Add a duration in seconds."""
+        index = min(int(duration * 1e6).bit_length(), self.BUCKETS - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += duration
+        if self.min is None or duration < self.min:
+            self.min = duration
+        if self.max is None or duration > self.max:
+            self.max = duration
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile (e.g. ``0.99``), as the upper bound of the
+        bucket containing it.
+
+        :returns: Duration in seconds or ``None`` if the histogram is empty.
+
+        """
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= threshold:
+                return min((1 << index) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self):
+        """Return the histogram as dictionary."""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'buckets': list(self.buckets),
+        }
+
+
+class OpcodeStats(object):
+    """Statistics of a single opcode."""
+
+    def __init__(self):
+        self.count = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.write_time = Histogram()
+        self.ack_time = Histogram()
+        self.reply_time = Histogram()
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'bytes_written': self.bytes_written,
+            'bytes_read': self.bytes_read,
+            'write_time': self.write_time.snapshot(),
+            'ack_time': self.ack_time.snapshot(),
+            'reply_time': self.reply_time.snapshot(),
+        }
+
+
+class Instrumentation(object):
+    """Display hook recording statistics per opcode.
+
+    The recorded times are:
+
+    - ``write_time``: Time spent writing the command to the serial port.
+    - ``ack_time``: Time from the end of the write until the ACK byte was
+      received (in pipelined mode, this includes the time the command spent
+      waiting in the queue).
+    - ``reply_time``: Time from the ACK until all response values were
+      received.
+
+    In batch mode, the write time of the whole batch is distributed between
+    the commands according to their size, the ACK and reply times are not
+    recorded.
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param callback: Optional function that is called with a
+            :class:`CommandRecord` for every command, e.g. to export it to a
+            metrics system.
+        :type callback: callable or None
+        """
+        self.callback = callback
+        self._stats = collections.defaultdict(OpcodeStats)
+
+    def command(self, payload, reply, write_time, ack_time, reply_time):
+        """Record a command. This is the hook interface called by the display."""
+        opcode = opcode_of(payload)
+        stats = self._stats[opcode]
+        stats.count += 1
+        stats.bytes_written += len(payload)
+        stats.bytes_read += len(reply)
+        if write_time is not None:
+            stats.write_time.add(write_time)
+        if ack_time is not None:
+            stats.ack_time.add(ack_time)
+        if reply_time is not None:
+            stats.reply_time.add(reply_time)
+        if self.callback is not None:
+            self.callback(CommandRecord(opcode, len(payload), len(reply),
+                    write_time, ack_time, reply_time))
+
+    def stats(self):
+        """
+        Return a snapshot of the statistics.
+
+        :returns: Dictionary ``opcode -> statistics``.
+        :rtype: dict
+
+        """
+        return dict((opcode, stats.snapshot()) for opcode, stats in self._stats.items())
+
+    def reset(self):
+        """Discard all statistics."""
+        self._stats.clear()
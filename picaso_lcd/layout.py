@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Host side text layout. Text is wrapped on word boundaries using the font
+metrics cache of :class:`~picaso_lcd.display.DisplayText`, every line is
+placed at its pixel position with
+:meth:`Display.gfx_move_origin() <picaso_lcd.display.Display.gfx_move_origin>`
+and lines longer than the limit of
+:meth:`DisplayText.put_string() <picaso_lcd.display.DisplayText.put_string>`
+are split into multiple commands. The whole text is sent in a single batch::
+
+    >>> disp.text.set_font(2)
+    >>> draw_text(disp, 0, 0, log_text, 480, max_height=272)
+
+Only characters that are missing from the metrics cache are fetched from
+the device (in a single burst, before drawing starts). All functions use
+the current text state of the display. Non-ASCII characters are
+transliterated first (see :func:`picaso_lcd.utils.transliterate`), so the
+returned lines contain the characters that are actually sent.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+from . import utils
+
+#: Maximum number of characters of a single put_string command.
+MAX_STRING_LENGTH = 511
+
+
+def _wrap_paragraph(paragraph, widths, x_gap, max_px):
+    """Wrap a single paragraph (without newlines), given the widths of its
+    characters. Returns a list of ``(start, end)`` index pairs."""
+    # offsets[i] is the width of paragraph[:i] without gaps
+    offsets = [0]
+    for width in widths:
+        offsets.append(offsets[-1] + width)
+
+    def fits(start, end):
+        return offsets[end] - offsets[start] + x_gap * (end - start - 1) <= max_px
+
+    lines = []
+    start = 0
+    space = None  # Index of the last space in the current line
+    for i, char in enumerate(paragraph):
+        if char == ' ':
+            space = i
+            continue
+        if i > start and not fits(start, i + 1):
+            if space is not None:
+                lines.append((start, space))
+                start = space + 1
+            # Words that are wider than a line are broken anywhere
+            while i > start and not fits(start, i + 1):
+                lines.append((start, i))
+                start = i
+            space = None
+    lines.append((start, len(paragraph)))
+    result = []
+    for start, end in lines:
+        while end > start and paragraph[end - 1] == ' ':
+            end -= 1
+        result.append((start, end))
+    return result
+
+
+def wrap(display, string, max_px):
+    """
+    Wrap a text into lines that fit into the specified width. Lines are
+    broken at spaces, which are dropped at the end of a line. Words that
+    don't fit into a line on their own are broken between two characters.
+    Newlines start a new paragraph.
+
+    :param display: The display whose text state and metrics are used.
+    :type display: Display
+    :param string: The text.
+    :type string: str
+    :param max_px: The available width in pixels.
+    :type max_px: int
+    :returns: The lines.
+    :rtype: list of str
+
+    """
+    return [line for line, height in _measure_lines(display, string, max_px)]
+
+
+def _measure_lines(display, string, max_px):
+    """Wrap a text and return ``(line, height)`` tuples."""
+    paragraphs = utils.transliterate(string).split('\n')
+    sizes = display.text._glyph_sizes(''.join(paragraphs) + ' ')
+    empty_height = sizes.pop()[1]
+    x_gap = display.text._state['x_gap']
+    lines = []
+    offset = 0
+    for paragraph in paragraphs:
+        paragraph_sizes = sizes[offset:offset + len(paragraph)]
+        offset += len(paragraph)
+        widths = [w for w, h in paragraph_sizes]
+        for start, end in _wrap_paragraph(paragraph, widths, x_gap, max_px):
+            line_sizes = paragraph_sizes[start:end]
+            height = max(h for w, h in line_sizes) if line_sizes else empty_height
+            lines.append((paragraph[start:end], height))
+    return lines
+
+
+def layout(display, x, y, string, max_px, max_height=None):
+    """
+    Wrap a text (see :func:`wrap`) and calculate the position of each line.
+
+    :param display: The display whose text state and metrics are used.
+    :type display: Display
+    :param x: X coordinate of the top left corner.
+    :type x: int
+    :param y: Y coordinate of the top left corner.
+    :type y: int
+    :param string: The text.
+    :type string: str
+    :param max_px: The available width in pixels.
+    :type max_px: int
+    :param max_height: The available height in pixels. Lines that don't fit
+        completely are omitted. ``None`` for no limit.
+    :type max_height: int or None
+    :returns: List of ``(x, y, line)`` tuples.
+    :rtype: list
+
+    """
+    lines = _measure_lines(display, string, max_px)
+    y_gap = display.text._state['y_gap']
+    placed = []
+    top = y
+    for line, height in lines:
+        if max_height is not None and y + height > top + max_height:
+            break
+        placed.append((x, y, line))
+        y += height + y_gap
+    return placed
+
+
+def draw_text(display, x, y, string, max_px, max_height=None):
+    """
+    Wrap a text and draw it in a single batch. Every line is positioned
+    with :meth:`Display.gfx_move_origin()
+    <picaso_lcd.display.Display.gfx_move_origin>`, so the result does not
+    depend on the newline handling of the device.
+
+    The arguments are the same as for :func:`layout`.
+
+    :returns: The ``(x, y, line)`` tuples of the drawn lines.
+    :rtype: list
+
+    """
+    placed = layout(display, x, y, string, max_px, max_height)
+    with display.batch():
+        for line_x, line_y, line in placed:
+            if not line:
+                continue
+            display.gfx_move_origin(line_x, line_y)
+            for start in range(0, len(line), MAX_STRING_LENGTH):
+                display.text.put_string(line[start:start + MAX_STRING_LENGTH])
+    return placed
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Host side cache of font metrics (glyph widths and heights), so that strings
+can be measured without communicating with the device.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import io
+import json
+import os
+
+
+#: All printable ASCII characters.
+PRINTABLE = ''.join(chr(i) for i in range(0x20, 0x7f))
+
+#: Directory in which metrics files are stored by default.
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.picaso_lcd', 'metrics')
+
+
+class FontMetrics(object):
+    """Cache of glyph sizes.
+
+    Glyph sizes are stored per text state, identified by a key tuple
+    ``(font, width_multiplier, height_multiplier, x_gap, y_gap)``. For every
+    key, a mapping ``character -> (width, height)`` is kept.
+
+    If a path is specified, existing metrics are loaded from that file and
+    :meth:`save` writes them back to it.
+    """
+
+    def __init__(self, path=None):
+        """
+        :param path: Optional path of a JSON file the metrics are persisted
+            in. If the file exists, it is loaded.
+        :type path: str or None
+        """
+        self.path = path
+        self._glyphs = {}
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    @classmethod
+    def for_model(cls, model, directory=None):
+        """
+        Return the metrics cache for a specific device model (e.g.
+        ``'uLCD-43PT'``), persisted in ``<directory>/<model>.json``.
+
+        :param model: The device model name.
+        :type model: str
+        :param directory: Directory of the metrics files. Defaults to
+            :data:`DEFAULT_DIRECTORY`.
+        :type directory: str or None
+        :rtype: FontMetrics
+
+        """
+        directory = DEFAULT_DIRECTORY if directory is None else directory
+        return cls(os.path.join(directory, '{0}.json'.format(model)))
+
+    def get(self, key, char):
+        """
+        Return the size of a character.
+
+        :returns: Tuple ``(width, height)`` or ``None`` if it's not cached.
+        :rtype: tuple(int, int) or None
+
+        """
+        return self._glyphs.get(key, {}).get(char)
+
+    def set(self, key, char, width, height):
+        """Store the size of a character."""
+        self._glyphs.setdefault(key, {})[char] = (width, height)
+
+    def missing(self, key, chars):
+        """
+        Return the characters of ``chars`` whose size is not cached yet,
+        without duplicates.
+        """
+        glyphs = self._glyphs.get(key, {})
+        missing = []
+        for char in chars:
+            if char not in glyphs and char not in missing:
+                missing.append(char)
+        return missing
+
+    def clear(self):
+        """Forget all cached metrics."""
+        self._glyphs.clear()
+
+    def save(self, path=None):
+        """
+        Write the metrics to a JSON file.
+
+        :param path: Target path. Defaults to the path the cache was created
+            with.
+        :type path: str or None
+
+        """
+        path = self.path if path is None else path
+        if path is None:
+            raise ValueError('No path specified')
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        data = {
+            'version': 1,
+            'glyphs': dict(
+                (','.join(str(k) for k in key),
+                 dict((str(ord(char)), list(size)) for char, size in glyphs.items()))
+                for key, glyphs in self._glyphs.items()
+            ),
+        }
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, sort_keys=True))
+
+    def load(self, path):
+        """Load metrics from a JSON file, merging them into the cache."""
+        with io.open(path, 'r', encoding='utf-8') as f:
+            data = json.loads(f.read())
+        if data.get('version') != 1:
+            raise ValueError('Unsupported metrics file version')
+        for key, glyphs in data['glyphs'].items():
+            key = tuple(int(k) for k in key.split(','))
+            for code, (width, height) in glyphs.items():
+                self.set(key, chr(int(code)), width, height)
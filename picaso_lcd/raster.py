@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+An offline Picaso SPE device model that renders the graphics and text
+commands into a RGB565 framebuffer. This requires NumPy.
+
+    >>> from picaso_lcd import Display
+    >>> from picaso_lcd.raster import RasterDevice
+    >>> device = RasterDevice()
+    >>> disp = Display(device)
+    >>> disp.gfx_rect(10, 10, 20, 20, 0xf800, filled=True)
+    >>> device.framebuffer.pixels[15, 15]
+    63488
+    >>> device.framebuffer.save_png('screen.png')
+
+All primitives are rasterized using vectorized NumPy operations.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import struct
+import zlib
+
+import numpy as np
+
+from . import utils
+from .emulator import EmulatedDevice, FONT_SIZES
+
+
+# Classic 5x7 font for the printable ASCII range (0x20 - 0x7e). Every
+# character consists of 5 columns, the least significant bit is the top row.
+_FONT_5X7 = (
+    '0000000000' '00005f0000' '0007000700' '147f147f14' '242a7f2a12'
+    '2313086462' '3649552250' '0005030000' '001c224100' '0041221c00'
+    '082a1c2a08' '08083e0808' '0050300000' '0808080808' '0060600000'
+    '2010080402' '3e5149453e' '00427f4000' '4261514946' '2141454b31'
+    '1814127f10' '2745454539' '3c4a494930' '0171090503' '3649494936'
+    '064949291e' '0036360000' '0056360000' '0008142241' '1414141414'
+    '4122140800' '0201510906' '3249794132' '7e1111117e' '7f49494936'
+    '3e41414122' '7f4141221c' '7f49494941' '7f09090101' '3e41415132'
+    '7f0808087f' '00417f4100' '2040413f01' '7f08142241' '7f40404040'
+    '7f0204027f' '7f0408107f' '3e4141413e' '7f09090906' '3e4151215e'
+    '7f09192946' '4649494931' '01017f0101' '3f4040403f' '1f2040201f'
+    '7f2018207f' '6314081463' '0304780403' '6151494543' '00007f4141'
+    '0204081020' '41417f0000' '0402010204' '4040404040' '0001020400'
+    '2054545478' '7f48444438' '3844444420' '384444487f' '3854545418'
+    '087e090102' '081454543c' '7f08040478' '00447d4000' '2040443d00'
+    '007f102844' '00417f4000' '7c04180478' '7c08040478' '3844444438'
+    '7c14141408' '081414187c' '7c08040408' '4854545420' '043f444020'
+    '3c4040207c' '1c2040201c' '3c4030403c' '4428102844' '0c5050503c'
+    '4464544c44' '0008364100' '00007f0000' '0041360800' '0804081008'
+)
+
+_glyphs = None
+
+
+def _glyph(char):
+    """Return the 7x5 boolean bitmap of a character."""
+    global _glyphs
+    if _glyphs is None:
+        columns = np.frombuffer(bytearray.fromhex(_FONT_5X7), dtype=np.uint8)
+        bits = (columns.reshape(-1, 5)[:, np.newaxis, :] >> np.arange(7)[:, np.newaxis]) & 1
+        _glyphs = bits.astype(bool)
+    index = ord(char) - 0x20
+    if not 0 <= index < len(_glyphs):
+        index = ord('?') - 0x20
+    return _glyphs[index]
+
+
+def _line_points(x1, y1, x2, y2):
+    """
+    Rasterize any number of line segments at once.
+
+    :param x1, y1, x2, y2: Arrays with the segment end points.
+    :returns: Tuple of arrays ``(xs, ys)`` with all pixel coordinates.
+
+    """
+    x1, y1, x2, y2 = (np.atleast_1d(np.asarray(v, dtype=np.int64)) for v in (x1, y1, x2, y2))
+    dx, dy = x2 - x1, y2 - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    counts = steps + 1
+    segment = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = offsets / np.maximum(steps, 1)[segment]
+    xs = np.rint(x1[segment] + t * dx[segment]).astype(np.int64)
+    ys = np.rint(y1[segment] + t * dy[segment]).astype(np.int64)
+    return xs, ys
+
+
+class Framebuffer(object):
+    """A RGB565 framebuffer with vectorized drawing primitives. Coordinates
+    outside of the framebuffer are clipped."""
+
+    def __init__(self, width, height, color=0x0000):
+        """
+        :param width: Width in pixels.
+        :type width: int
+        :param height: Height in pixels.
+        :type height: int
+        :param color: Initial color.
+        :type color: int
+        """
+        #: The pixels as ``uint16`` array of shape ``(height, width)``.
+        self.pixels = np.full((height, width), color, dtype=np.uint16)
+
+    @property
+    def width(self):
+        return self.pixels.shape[1]
+
+    @property
+    def height(self):
+        return self.pixels.shape[0]
+
+    ### Primitives ###
+
+    def cls(self, color=0x0000):
+        self.pixels.fill(color)
+
+    def points(self, xs, ys, color):
+        """Set all pixels at the specified coordinates, clipping them."""
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        self.pixels[ys[inside], xs[inside]] = color
+
+    def line(self, x1, y1, x2, y2, color):
+        self.points(*(_line_points(x1, y1, x2, y2) + (color,)))
+
+    def polyline(self, xs, ys, color, closed=False):
+        xs, ys = np.asarray(xs), np.asarray(ys)
+        if closed:
+            xs, ys = np.append(xs, xs[:1]), np.append(ys, ys[:1])
+        if len(xs) == 1:
+            self.points(xs, ys, color)
+        elif len(xs):
+            self.line(xs[:-1], ys[:-1], xs[1:], ys[1:], color)
+
+    def rect(self, x1, y1, x2, y2, color):
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        self.polyline([x1, x2, x2, x1], [y1, y1, y2, y2], color, closed=True)
+
+    def rect_filled(self, x1, y1, x2, y2, color):
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        self.pixels[max(y1, 0):max(y2 + 1, 0), max(x1, 0):max(x2 + 1, 0)] = color
+
+    def blit(self, x, y, width, height, data):
+        """Copy big endian RGB565 pixel data to the specified area."""
+        pixels = np.frombuffer(data, dtype='>u2').reshape(height, width)
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, self.width), min(y + height, self.height)
+        if left < right and top < bottom:
+            self.pixels[top:bottom, left:right] = pixels[top - y:bottom - y, left - x:right - x]
+
+    def ellipse(self, x, y, xrad, yrad, color):
+        self._ellipse(x, y, xrad, yrad, color, filled=False)
+
+    def ellipse_filled(self, x, y, xrad, yrad, color):
+        self._ellipse(x, y, xrad, yrad, color, filled=True)
+
+    def polygon(self, xs, ys, color):
+        self.polyline(xs, ys, color, closed=True)
+
+    def polygon_filled(self, xs, ys, color):
+        xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        if not len(xs):
+            return
+        left, right = max(int(xs.min()), 0), min(int(xs.max()), self.width - 1)
+        top, bottom = max(int(ys.min()), 0), min(int(ys.max()), self.height - 1)
+        if left > right or top > bottom:
+            return
+        py, px = np.mgrid[top:bottom + 1, left:right + 1]
+        inside = np.zeros(px.shape, dtype=bool)
+        # Even-odd rule, vectorized over all pixels of the bounding box
+        for x1, y1, x2, y2 in zip(xs, ys, np.roll(xs, 1), np.roll(ys, 1)):
+            if y1 == y2:
+                continue
+            crosses = (y1 > py) != (y2 > py)
+            inside ^= crosses & (px < x1 + (py - y1) * (x2 - x1) / (y2 - y1))
+        self.pixels[top:bottom + 1, left:right + 1][inside] = color
+        self.polygon(xs.astype(np.int64), ys.astype(np.int64), color)
+
+    def text(self, x, y, char, cell_size, multipliers, fg_color, bg_color,
+            opaque=True, bold=False, inverse=False, underline=False):
+        """
+        Render a single character cell with the top left corner at ``x, y``.
+
+        :param cell_size: The unscaled ``(width, height)`` of the glyph cell.
+        :param multipliers: The ``(width, height)`` multipliers.
+
+        """
+        cell_width, cell_height = cell_size
+        mask = np.zeros((cell_height, cell_width), dtype=bool)
+        top = (cell_height - 7) // 2
+        mask[top:top + 7, 1:6] = _glyph(char)
+        if bold:
+            mask[:, 1:] |= mask[:, :-1].copy()
+        if underline:
+            mask[-1, :] = True
+        mask = mask.repeat(multipliers[1], axis=0).repeat(multipliers[0], axis=1)
+        if inverse:
+            fg_color, bg_color = bg_color, fg_color
+
+        height, width = mask.shape
+        x2, y2 = min(x + width, self.width), min(y + height, self.height)
+        if x >= x2 or y >= y2:
+            return
+        mask = mask[:y2 - y, :x2 - x]
+        target = self.pixels[y:y2, x:x2]
+        if opaque:
+            target[...] = bg_color
+        target[mask] = fg_color
+
+    def _ellipse(self, x, y, xrad, yrad, color, filled):
+        xrad, yrad = max(xrad, 0), max(yrad, 0)
+        if not xrad or not yrad:
+            self.line(x - xrad, y - yrad, x + xrad, y + yrad, color)
+            return
+        left, right = max(x - xrad - 1, 0), min(x + xrad + 1, self.width - 1)
+        top, bottom = max(y - yrad - 1, 0), min(y + yrad + 1, self.height - 1)
+        if left > right or top > bottom:
+            return
+        py, px = np.ogrid[top - 1:bottom + 2, left - 1:right + 2]
+        inside = ((px - x) / (xrad + 0.5)) ** 2 + ((py - y) / (yrad + 0.5)) ** 2 <= 1
+        if not filled:
+            # Keep the pixels with at least one 4-neighbour outside
+            core = inside.copy()
+            core[1:-1, 1:-1] = (inside[1:-1, 1:-1] & inside[:-2, 1:-1] & inside[2:, 1:-1]
+                    & inside[1:-1, :-2] & inside[1:-1, 2:])
+            inside = inside & ~core
+        self.pixels[top:bottom + 1, left:right + 1][inside[1:-1, 1:-1]] = color
+
+    ### Export ###
+
+    def snapshot(self):
+        """Return a copy of the pixels as ``uint16`` RGB565 array."""
+        return self.pixels.copy()
+
+    def to_rgb888(self):
+        """Return the pixels as ``uint8`` array of shape ``(height, width, 3)``."""
+        return utils.rgb565_to_rgb888(self.pixels)
+
+    def save_png(self, path):
+        """Save the framebuffer as 24 bit PNG image."""
+        rgb = self.to_rgb888()
+        height, width = rgb.shape[:2]
+        # Every row is prefixed with filter type 0
+        raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+        raw[:, 1:] = rgb.reshape(height, -1)
+
+        def chunk(kind, data):
+            body = kind + data
+            return struct.pack(str('>I'), len(data)) + body + \
+                    struct.pack(str('>I'), zlib.crc32(body) & 0xffffffff)
+
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            f.write(chunk(b'IHDR', struct.pack(str('>IIBBBBB'), width, height, 8, 2, 0, 0, 0)))
+            f.write(chunk(b'IDAT', zlib.compress(raw.tobytes())))
+            f.write(chunk(b'IEND', b''))
+
+
+class RasterDevice(EmulatedDevice):
+    """An :class:`~picaso_lcd.emulator.EmulatedDevice` that renders all
+    drawing commands into a :class:`Framebuffer`."""
+
+    def __init__(self, *args, **kwargs):
+        super(RasterDevice, self).__init__(*args, **kwargs)
+        #: The :class:`Framebuffer`, in the coordinates of the current
+        #: orientation.
+        self.framebuffer = Framebuffer(*self.size)
+
+    def _render(self, primitive, *args):
+        if primitive == 'char':
+            x, y, char = args
+            text = self.text
+            attributes = text['attributes']
+            self.framebuffer.text(x, y, char,
+                    FONT_SIZES.get(text['font'], FONT_SIZES[3]),
+                    (text['width'], text['height']),
+                    text['fg_color'], text['bg_color'],
+                    opaque=bool(text['opacity']),
+                    bold=bool(text['bold'] or attributes & 0x10),
+                    inverse=bool(text['inverse'] or attributes & 0x40),
+                    underline=bool(text['underline'] or attributes & 0x80))
+        else:
+            getattr(self.framebuffer, primitive)(*args)
+
+    def _orientation(self, value):
+        previous = super(RasterDevice, self)._orientation(value)
+        if (previous[0] >= 2) != (value >= 2):
+            # The screen content stays, but is seen rotated by 90 degrees
+            self.framebuffer.pixels = np.ascontiguousarray(np.rot90(self.framebuffer.pixels))
+        return previous
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Record the commands sent to a display, including the replies and timing, in
+a compact binary log, and replay such a log to a device as fast as the link
+allows::
+
+    >>> with Recorder(disp, 'splash.rec'):
+    ...     draw_splash_screen(disp)
+    >>> replay(disp, 'splash.rec')
+
+**Log format**
+
+The log starts with the magic bytes ``PLCDREC`` followed by a version byte.
+Every command is stored as record of the following fields, where numbers
+are unsigned LEB128 variable length integers:
+
+- time since the previous record in microseconds
+- length of the encoded command, followed by the encoded command
+- length of the reply, followed by the reply (including the ACK byte)
+
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+import io
+import time
+
+from .constants import ACK
+from .exceptions import CommunicationError, PicasoError, BatchError
+
+
+MAGIC = b'PLCDREC'
+VERSION = 1
+
+#: A single recorded command. ``delay`` is the time since the previous
+#: record in seconds.
+Record = collections.namedtuple('Record', ['delay', 'payload', 'reply'])
+
+
+def _write_varint(f, value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            break
+    f.write(bytes(out))
+
+
+def _read_varint(f):
+    value = shift = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            if shift:
+                raise ValueError('Truncated record')
+            return None
+        byte = bytearray(byte)[0]
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value
+        shift += 7
+
+
+def _read_exactly(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError('Truncated record')
+    return data
+
+
+class Recorder(object):
+    """Display hook that records all commands into a binary log.
+
+    The recorder can be used as context manager, which starts and stops the
+    recording.
+    """
+
+    def __init__(self, display, target):
+        """
+        :param display: The display to record.
+        :type display: Display
+        :param target: Path or binary file object the log is written to.
+        :type target: str or file
+        """
+        self.display = display
+        self._target = target
+        self._file = None
+        self._owns_file = False
+        self._last = None
+        #: Number of recorded commands.
+        self.count = 0
+
+    def start(self):
+        """Write the log header and start recording."""
+        if hasattr(self._target, 'write'):
+            self._file = self._target
+        else:
+            self._file = io.open(self._target, 'wb')
+            self._owns_file = True
+        self._file.write(MAGIC + bytes(bytearray([VERSION])))
+        self._last = time.time()
+        self.display.add_hook(self)
+
+    def stop(self):
+        """Stop recording and close the log (if it was opened by the
+        recorder)."""
+        self.display.remove_hook(self)
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+    def command(self, payload, reply, write_time, ack_time, reply_time):
+        """Record a command. This is the hook interface called by the display."""
+        now = time.time()
+        delay, self._last = now - self._last, now
+        f = self._file
+        _write_varint(f, max(int(delay * 1e6), 0))
+        _write_varint(f, len(payload))
+        f.write(bytes(payload))
+        _write_varint(f, len(reply))
+        f.write(bytes(reply))
+        self.count += 1
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def read_records(source):
+    """
+    Read all records of a log.
+
+    :param source: Path or binary file object of the log.
+    :type source: str or file
+    :returns: Iterator over :class:`Record` tuples.
+
+    """
+    if not hasattr(source, 'read'):
+        with io.open(source, 'rb') as f:
+            for record in read_records(f):
+                yield record
+        return
+    header = source.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not a command log')
+    if bytearray(header[len(MAGIC):])[0] != VERSION:
+        raise ValueError('Unsupported log version')
+    while True:
+        delay = _read_varint(source)
+        if delay is None:
+            return
+        payload = _read_exactly(source, _read_varint(source))
+        reply = _read_exactly(source, _read_varint(source))
+        yield Record(delay / 1e6, payload, reply)
+
+
+def replay(display, source, chunk_size=4096, strict=False):
+    """
+    Send a recorded session to a display as fast as possible.
+
+    The commands are written in chunks of about ``chunk_size`` bytes. While
+    the next chunk is being written, the replies of the previous chunk are
+    read and checked. Timing information of the log is ignored.
+
+    Afterwards, all cached device state of the display is invalidated.
+
+    :param display: The display to replay the session on.
+    :type display: Display
+    :param source: Path or binary file object of the log.
+    :type source: str or file
+    :param chunk_size: Approximate number of bytes per write.
+    :type chunk_size: int
+    :param strict: If ``True``, the replies must match the recorded ones
+        exactly. Otherwise only the ACK bytes are checked.
+    :type strict: bool
+    :returns: The number of replayed commands.
+    :rtype: int
+    :raises: BatchError if replies don't match, with the indices of the
+        failed commands.
+
+    """
+    display.flush()
+    ser = display._ser
+    errors = []
+    pending = []  # Records of the chunk written last
+    index = 0
+
+    def check(records, first_index):
+        data = ser.read(sum(len(record.reply) for record in records))
+        offset = 0
+        for i, record in enumerate(records):
+            reply = data[offset:offset + len(record.reply)]
+            offset += len(record.reply)
+            if len(reply) < len(record.reply):
+                errors.append((first_index + i, CommunicationError('Read timeout reached.')))
+            elif strict and reply != record.reply:
+                errors.append((first_index + i, PicasoError(
+                    'Reply {!r} does not match recorded reply {!r}'.format(reply, record.reply))))
+            elif bytearray(reply[:1]) != bytearray(record.reply[:1]) and \
+                    bytearray(record.reply[:1]) == bytearray([ACK]):
+                errors.append((first_index + i, PicasoError(
+                    'Instead of an ACK byte, "{!r}" was returned.'.format(bytearray(reply)[0]))))
+
+    chunk, chunk_bytes = [], 0
+    try:
+        for record in read_records(source):
+            chunk.append(record)
+            chunk_bytes += len(record.payload)
+            if chunk_bytes >= chunk_size:
+                ser.write(b''.join(r.payload for r in chunk))
+                if pending:
+                    check(pending, index - len(pending))
+                pending, chunk, chunk_bytes = chunk, [], 0
+                index += len(pending)
+        if chunk:
+            ser.write(b''.join(r.payload for r in chunk))
+        if pending:
+            check(pending, index - len(pending))
+        if chunk:
+            check(chunk, index)
+            index += len(chunk)
+    finally:
+        display.invalidate()
+
+    if errors:
+        raise BatchError(errors)
+    return index
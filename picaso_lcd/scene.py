@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+A retained mode scene. The application declares the complete screen content
+as primitives on every refresh, the scene compares it to the content that
+is already on the screen and only sends what changed::
+
+    scene = Scene(disp)
+    while True:
+        scene.gfx_rect(0, 0, 479, 31, colors.NAVY, filled=True)
+        scene.put_string(8, 8, 'Status', colors.WHITE)
+        scene.put_string(8, 40, 'Temperature: {:.1f}'.format(read_temperature()))
+        scene.commit()
+
+Unchanged primitives cost nothing. For removed primitives, their bounding
+box is erased with the background color. Everything that overlaps an erased
+or newly drawn area and lies above it is drawn again, in the declared
+order, so the result is the same as drawing the whole scene from scratch.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import bisect
+import collections
+
+from . import colors
+from .spatial import GridIndex
+
+
+def _points_bounds(xs, ys):
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class Rect(collections.namedtuple('Rect', ['x1', 'y1', 'x2', 'y2', 'color', 'filled'])):
+    """A rectangle, see :meth:`Display.gfx_rect() <picaso_lcd.display.Display.gfx_rect>`."""
+    __slots__ = ()
+
+    def bounds(self, display):
+        return _points_bounds((self.x1, self.x2), (self.y1, self.y2))
+
+    def draw(self, display):
+        display.gfx_rect(*self)
+
+
+class Line(collections.namedtuple('Line', ['x1', 'y1', 'x2', 'y2', 'color'])):
+    """A line, see :meth:`Display.gfx_line() <picaso_lcd.display.Display.gfx_line>`."""
+    __slots__ = ()
+
+    def bounds(self, display):
+        return _points_bounds((self.x1, self.x2), (self.y1, self.y2))
+
+    def draw(self, display):
+        display.gfx_line(*self)
+
+
+class Ellipse(collections.namedtuple('Ellipse', ['x', 'y', 'xrad', 'yrad', 'color', 'filled'])):
+    """An ellipse, see :meth:`Display.gfx_ellipse() <picaso_lcd.display.Display.gfx_ellipse>`."""
+    __slots__ = ()
+
+    def bounds(self, display):
+        return self.x - self.xrad, self.y - self.yrad, self.x + self.xrad, self.y + self.yrad
+
+    def draw(self, display):
+        display.gfx_ellipse(*self)
+
+
+class Polyline(collections.namedtuple('Polyline', ['points', 'color', 'closed', 'filled'])):
+    """A polyline, see :meth:`Display.gfx_polyline() <picaso_lcd.display.Display.gfx_polyline>`.
+    The points are a tuple of ``(x, y)`` tuples."""
+    __slots__ = ()
+
+    def bounds(self, display):
+        return _points_bounds([x for x, y in self.points], [y for x, y in self.points])
+
+    def draw(self, display):
+        display.gfx_polyline(self.points, self.color, self.closed, self.filled)
+
+
+class Text(collections.namedtuple('Text', ['x', 'y', 'string', 'color', 'bg_color',
+                                           'font', 'size', 'opaque'])):
+    """A single line of text, whose top left corner is at ``(x, y)``."""
+    __slots__ = ()
+
+    def _prepare(self, display):
+        display.text.set_font(self.font)
+        display.text.set_size(self.size)
+
+    def bounds(self, display):
+        self._prepare(display)
+        width, height = display.text.measure_string(self.string)
+        return self.x, self.y, self.x + max(width, 1) - 1, self.y + max(height, 1) - 1
+
+    def draw(self, display):
+        self._prepare(display)
+        display.text.set_fg_color(self.color)
+        display.text.set_bg_color(self.bg_color)
+        display.text.set_opacity(1 if self.opaque else 0)
+        display.gfx_move_origin(self.x, self.y)
+        display.text.put_string(self.string)
+
+
+def _unordered(sequence):
+    """Return the indices of the entries of a sequence of distinct numbers
+    that are not part of its longest increasing subsequence."""
+    tails = []  # Smallest tail value of increasing subsequences per length
+    tail_indices = []
+    previous = [None] * len(sequence)
+    for i, value in enumerate(sequence):
+        length = bisect.bisect_left(tails, value)
+        if length:
+            previous[i] = tail_indices[length - 1]
+        if length == len(tails):
+            tails.append(value)
+            tail_indices.append(i)
+        else:
+            tails[length] = value
+            tail_indices[length] = i
+    ordered = set()
+    i = tail_indices[-1] if tail_indices else None
+    while i is not None:
+        ordered.add(i)
+        i = previous[i]
+    return [i for i in range(len(sequence)) if i not in ordered]
+
+
+class Scene(object):
+    """Retained scene of primitives, which sends only the changes between
+    two :meth:`commit` calls to the display.
+
+    The declaration methods take the same arguments as the corresponding
+    methods of :class:`~picaso_lcd.display.Display` and
+    :class:`~picaso_lcd.display.DisplayText`. Primitives are drawn in the
+    order they were declared.
+    """
+
+    def __init__(self, display, background=colors.BLACK, cell_size=32):
+        """
+        :param display: The display to draw on.
+        :type display: Display
+        :param background: Color used to erase removed primitives. It
+            should match the background of the screen.
+        :type background: int
+        :param cell_size: Cell size of the spatial index in pixels.
+        :type cell_size: int
+        """
+        self.display = display
+        self.background = background
+        self.cell_size = cell_size
+        self._pending = []
+        self._sent = []  # Primitives on the screen, in drawing order
+        self._bounds = {}  # Primitive -> bounding box
+
+    ### Declaration ###
+
+    def add(self, primitive):
+        """Add a primitive (e.g. a :class:`Rect`) to the next frame."""
+        self._pending.append(primitive)
+        return primitive
+
+    def gfx_rect(self, x1, y1, x2, y2, color, filled=False):
+        return self.add(Rect(x1, y1, x2, y2, color, filled))
+
+    def gfx_line(self, x1, y1, x2, y2, color):
+        return self.add(Line(x1, y1, x2, y2, color))
+
+    def gfx_ellipse(self, x, y, xrad, yrad, color, filled=False):
+        return self.add(Ellipse(x, y, xrad, yrad, color, filled))
+
+    def gfx_circle(self, x, y, rad, color, filled=False):
+        return self.add(Ellipse(x, y, rad, rad, color, filled))
+
+    def gfx_polyline(self, points, color, closed=False, filled=False):
+        points = tuple((int(x), int(y)) for x, y in points)
+        return self.add(Polyline(points, color, closed, filled))
+
+    def gfx_triangle(self, vertices, color, filled=False):
+        return self.gfx_polyline(vertices, color, closed=True, filled=filled)
+
+    def put_string(self, x, y, string, color=colors.WHITE, bg_color=colors.BLACK,
+                   font=3, size=1, opaque=False):
+        """
+        Add a single line of text.
+
+        :param x: X coordinate of the top left corner.
+        :type x: int
+        :param y: Y coordinate of the top left corner.
+        :type y: int
+        :param string: The text.
+        :type string: str
+        :param color: Foreground color.
+        :type color: int
+        :param bg_color: Background color (only drawn if ``opaque``).
+        :type bg_color: int
+        :param font: Font number.
+        :type font: int
+        :param size: Width and height multiplier.
+        :type size: int
+        :param opaque: Whether the background pixels are drawn.
+        :type opaque: bool
+
+        """
+        if '\n' in string:
+            raise ValueError('Text primitives must not contain newlines.')
+        return self.add(Text(x, y, string, color, bg_color, font, size, opaque))
+
+    ### Rendering ###
+
+    def invalidate(self):
+        """Forget what is on the screen, e.g. after it was cleared. The next
+        commit draws the whole scene."""
+        self._sent = []
+        self._bounds.clear()
+
+    def _bounds_of(self, primitive):
+        bounds = self._bounds.get(primitive)
+        if bounds is None:
+            bounds = self._bounds[primitive] = primitive.bounds(self.display)
+        return bounds
+
+    def commit(self):
+        """
+        Send the changes since the last commit to the display, in a single
+        batch, and start a new (empty) frame.
+
+        :returns: The number of primitives that were drawn.
+        :rtype: int
+
+        """
+        scene = list(collections.OrderedDict.fromkeys(self._pending))
+        self._pending = []
+        z_order = dict((primitive, z) for z, primitive in enumerate(scene))
+        sent = dict((primitive, z) for z, primitive in enumerate(self._sent))
+
+        removed = [primitive for primitive in self._sent if primitive not in z_order]
+        redraw = set(z for z, primitive in enumerate(scene) if primitive not in sent)
+        # Kept primitives whose drawing order changed are drawn again as well
+        kept = [z for z, primitive in enumerate(scene) if primitive in sent]
+        redraw.update(kept[i] for i in _unordered([sent[scene[z]] for z in kept]))
+
+        # Bounds of text primitives may require measuring, which is not
+        # possible inside of a batch, so fetch all of them first.
+        index = GridIndex(self.cell_size)
+        for z, primitive in enumerate(scene):
+            index.insert(z, self._bounds_of(primitive))
+        erase = [self._bounds_of(primitive) for primitive in removed]
+
+        # Everything above an erased or redrawn area must be redrawn too
+        work = [(bounds, -1) for bounds in erase]
+        work.extend((self._bounds_of(scene[z]), z) for z in redraw)
+        while work:
+            bounds, below = work.pop()
+            for z in index.query_rect(bounds):
+                if z > below and z not in redraw:
+                    redraw.add(z)
+                    work.append((self._bounds_of(scene[z]), z))
+
+        with self.display.batch():
+            for x1, y1, x2, y2 in erase:
+                if x2 >= 0 and y2 >= 0:
+                    self.display.gfx_rect(max(x1, 0), max(y1, 0), x2, y2,
+                                          self.background, filled=True)
+            for z in sorted(redraw):
+                scene[z].draw(self.display)
+
+        self._sent = scene
+        self._bounds = dict((primitive, self._bounds[primitive]) for primitive in scene)
+        return len(redraw)
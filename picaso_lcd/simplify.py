@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Host side simplification of polylines (requires NumPy). Plots often contain
+far more points than the display can resolve. Simplifying them first keeps
+the drawn result identical within a pixel tolerance, but needs much fewer
+bytes on the serial link::
+
+    >>> points = simplify(np.column_stack([xs, ys]), tolerance=0.5)
+    >>> disp.gfx_polyline(points, colors.GREEN)
+
+The same is available as ``tolerance`` argument of
+:meth:`Display.gfx_polyline() <picaso_lcd.display.Display.gfx_polyline>`.
+
+All functions take and return the X and Y coordinates as separate arrays.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import numpy as np
+
+
+def _as_coordinates(xs, ys):
+    xs, ys = np.asarray(xs), np.asarray(ys)
+    if xs.shape != ys.shape or xs.ndim != 1:
+        raise ValueError('X and Y coordinates must be one dimensional arrays of the same length')
+    return xs, ys
+
+
+def drop_duplicates(xs, ys):
+    """
+    Remove consecutive points at the same position (e.g. points that fell
+    onto the same pixel after rounding).
+
+    :returns: Tuple ``(xs, ys)``.
+
+    """
+    xs, ys = _as_coordinates(xs, ys)
+    if len(xs) < 2:
+        return xs, ys
+    keep = np.ones(len(xs), dtype=bool)
+    keep[1:] = (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])
+    return xs[keep], ys[keep]
+
+
+def drop_collinear(xs, ys):
+    """
+    Remove points in the middle of straight runs, i.e. points on the line
+    between their neighbours which continue in the same direction. Points
+    where the path turns back are kept.
+
+    :returns: Tuple ``(xs, ys)``.
+
+    """
+    xs, ys = drop_duplicates(xs, ys)
+    if len(xs) < 3:
+        return xs, ys
+    dx1, dy1 = xs[1:-1] - xs[:-2], ys[1:-1] - ys[:-2]
+    dx2, dy2 = xs[2:] - xs[1:-1], ys[2:] - ys[1:-1]
+    straight = (dx1 * dy2 == dy1 * dx2) & (dx1 * dx2 + dy1 * dy2 > 0)
+    keep = np.ones(len(xs), dtype=bool)
+    keep[1:-1] = ~straight
+    return xs[keep], ys[keep]
+
+
+def _segment_distances(xs, ys, start, end):
+    """Distances of the points between ``start`` and ``end`` to the segment
+    connecting them."""
+    ax, ay = float(xs[start]), float(ys[start])
+    bx, by = float(xs[end]), float(ys[end])
+    px, py = xs[start + 1:end] - ax, ys[start + 1:end] - ay
+    abx, aby = bx - ax, by - ay
+    length = abx * abx + aby * aby
+    if length:
+        t = np.clip((px * abx + py * aby) / length, 0, 1)
+        px, py = px - t * abx, py - t * aby
+    return np.hypot(px, py)
+
+
+def rdp(xs, ys, tolerance):
+    """
+    Simplify a path with the Ramer-Douglas-Peucker algorithm. Every point
+    of the original path is at most ``tolerance`` pixels away from the
+    simplified path. The first and the last point are always kept.
+
+    :param tolerance: Maximum deviation in pixels.
+    :type tolerance: float
+    :returns: Tuple ``(xs, ys)``.
+
+    """
+    xs, ys = _as_coordinates(xs, ys)
+    if len(xs) < 3:
+        return xs, ys
+    keep = np.zeros(len(xs), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(xs) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        distances = _segment_distances(xs, ys, start, end)
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            index += start + 1
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return xs[keep], ys[keep]
+
+
+def decimate_columns(xs, ys):
+    """
+    Reduce a plot whose X coordinates never decrease to at most four points
+    per pixel column: the first, the lowest, the highest and the last one.
+    The drawn result covers the same pixels in every column.
+
+    :returns: Tuple ``(xs, ys)``.
+    :raises: ValueError if the X coordinates decrease.
+
+    """
+    xs, ys = _as_coordinates(xs, ys)
+    if len(xs) < 3:
+        return xs, ys
+    columns = np.floor(xs).astype(np.int64)
+    steps = np.diff(columns)
+    if (steps < 0).any():
+        raise ValueError('Column decimation requires non-decreasing X coordinates')
+    boundaries = np.flatnonzero(steps) + 1
+    firsts = np.concatenate([[0], boundaries])
+    lasts = np.concatenate([boundaries, [len(xs)]]) - 1
+    # Sorted by column, then by Y: The first and last entry of every column
+    # group are its lowest and highest point.
+    order = np.lexsort((ys, columns))
+    indices = np.unique(np.concatenate([firsts, lasts, order[firsts], order[lasts]]))
+    return xs[indices], ys[indices]
+
+
+def simplify(points, tolerance=0.5, method='rdp'):
+    """
+    Simplify a polyline for drawing: Snap the points to the pixel grid,
+    remove duplicate and collinear points and reduce the remaining ones.
+
+    :param points: The ``(x, y)`` points.
+    :type points: numpy.ndarray or sequence of (int, int)
+    :param tolerance: Maximum deviation in pixels (for ``'rdp'``).
+    :type tolerance: float
+    :param method: ``'rdp'`` (:func:`rdp`, for any path) or ``'columns'``
+        (:func:`decimate_columns`, for plots over X).
+    :type method: str
+    :returns: The simplified points as integer array of shape ``(n, 2)``.
+    :rtype: numpy.ndarray
+
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    xs, ys = np.rint(points[:, 0]).astype(np.int64), np.rint(points[:, 1]).astype(np.int64)
+    xs, ys = drop_duplicates(xs, ys)
+    if method == 'rdp':
+        xs, ys = rdp(xs, ys, tolerance)
+    elif method == 'columns':
+        xs, ys = decimate_columns(xs, ys)
+    else:
+        raise ValueError('Unknown simplification method: {!r}'.format(method))
+    xs, ys = drop_collinear(xs, ys)
+    return np.column_stack([xs, ys])
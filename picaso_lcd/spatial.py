@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+A uniform grid index over rectangles, for fast point and rectangle queries
+(e.g. hit testing of touch regions).
+
+Rectangles are ``(x1, y1, x2, y2)`` tuples with inclusive corners, like the
+drawing commands of the display use them.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+
+
+class GridIndex(object):
+    """Spatial index mapping keys to rectangles.
+
+    The plane is divided into square cells of ``cell_size`` pixels. Every
+    key is stored in all cells its rectangle overlaps, so a point query only
+    needs to look at the candidates of a single cell. The grid is sparse and
+    unbounded, only non-empty cells use memory.
+    """
+
+    def __init__(self, cell_size=32):
+        """
+        :param cell_size: Edge length of a grid cell in pixels.
+        :type cell_size: int
+        """
+        if cell_size < 1:
+            raise ValueError('Cell size must be at least 1.')
+        self.cell_size = cell_size
+        self._rects = {}
+        self._cells = collections.defaultdict(set)
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, key):
+        return key in self._rects
+
+    def __iter__(self):
+        return iter(self._rects)
+
+    def _cell_range(self, rect):
+        x1, y1, x2, y2 = rect
+        size = self.cell_size
+        for cy in range(y1 // size, y2 // size + 1):
+            for cx in range(x1 // size, x2 // size + 1):
+                yield cx, cy
+
+    def insert(self, key, rect):
+        """
+        Add a rectangle, or move it if the key is already present.
+
+        :param key: Hashable key of the rectangle.
+        :param rect: The rectangle ``(x1, y1, x2, y2)``. The corners may be
+            specified in any order.
+        :type rect: tuple(int, int, int, int)
+
+        """
+        x1, y1, x2, y2 = rect
+        rect = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        if key in self._rects:
+            self.remove(key)
+        self._rects[key] = rect
+        for cell in self._cell_range(rect):
+            self._cells[cell].add(key)
+
+    def remove(self, key):
+        """
+        Remove a rectangle.
+
+        :raises: KeyError if the key is not present.
+
+        """
+        rect = self._rects.pop(key)
+        for cell in self._cell_range(rect):
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+    def clear(self):
+        """Remove all rectangles."""
+        self._rects.clear()
+        self._cells.clear()
+
+    def get(self, key):
+        """Return the rectangle of a key."""
+        return self._rects[key]
+
+    def query_point(self, x, y):
+        """
+        Find the rectangles containing a point.
+
+        :returns: Set of keys.
+        :rtype: set
+
+        """
+        size = self.cell_size
+        candidates = self._cells.get((x // size, y // size), ())
+        result = set()
+        for key in candidates:
+            x1, y1, x2, y2 = self._rects[key]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                result.add(key)
+        return result
+
+    def query_rect(self, rect):
+        """
+        Find the rectangles overlapping a rectangle.
+
+        :param rect: The rectangle ``(x1, y1, x2, y2)``.
+        :type rect: tuple(int, int, int, int)
+        :returns: Set of keys.
+        :rtype: set
+
+        """
+        x1, y1, x2, y2 = rect
+        x1, y1, x2, y2 = min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+        candidates = set()
+        for cell in self._cell_range((x1, y1, x2, y2)):
+            candidates.update(self._cells.get(cell, ()))
+        result = set()
+        for key in candidates:
+            rx1, ry1, rx2, ry2 = self._rects[key]
+            if rx1 <= x2 and x1 <= rx2 and ry1 <= y2 and y1 <= ry2:
+                result.add(key)
+        return result
+
+    def bounds(self):
+        """
+        Return the bounding box of all rectangles.
+
+        :returns: ``(x1, y1, x2, y2)`` or ``None`` if the index is empty.
+
+        """
+        if not self._rects:
+            return None
+        rects = self._rects.values()
+        return (min(r[0] for r in rects), min(r[1] for r in rects),
+                max(r[2] for r in rects), max(r[3] for r in rects))
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+A thread safe display. Commands of all threads are encoded by the calling
+thread and put into a queue, which is drained by a single I/O thread::
+
+    disp = ThreadedDisplay('/dev/ttyUSB0', 115200)
+
+    def sensor_thread(index):
+        while True:
+            value = read_sensor(index)
+            with disp.batch():
+                disp.gfx_rect(0, index * 20, 100, index * 20 + 19, colors.BLACK, filled=True)
+                disp.text.move_cursor(index, 0)
+                disp.text.put_string('{0:.1f}'.format(value))
+
+The I/O thread writes all queued commands with a single write and fetches
+their replies with a single read, so commands of multiple threads are
+coalesced instead of waiting for each other's round trips.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+import threading
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+from .display import Display
+from .exceptions import BatchError, CommunicationError, PicasoError
+from .futures import CommandFuture
+
+
+class ThreadedDisplay(Display):
+    """A :class:`~picaso_lcd.display.Display` that can be used from multiple
+    threads at the same time.
+
+    Blocking calls wait only for the reply of their own command. Pipelined
+    mode (:meth:`set_pipeline`) and batches (:meth:`batch`) are available per
+    thread. A batch is queued as a whole, so its commands are never
+    interleaved with commands of other threads. Use batches to keep changes
+    of the (device global) text state together with the text they apply to.
+
+    The baudrate can't be changed, as that requires exclusive access to the
+    serial port. Use a :class:`~picaso_lcd.display.Display` on the same port
+    before creating the threaded display.
+
+    Text state setters are always sent: The cached state can't tell whether
+    a value set by another thread has already reached the device, or will
+    only be sent after the batch of the calling thread.
+    """
+
+    #: Approximate maximum number of bytes written by the I/O thread at once.
+    max_write = 4096
+
+    skip_redundant_state = False
+
+    def __init__(self, *args, **kwargs):
+        """Takes the same arguments as :class:`~picaso_lcd.display.Display`."""
+        self._local = threading.local()
+        super(ThreadedDisplay, self).__init__(*args, **kwargs)
+        # Queue of (items, event) groups, where items is a list of
+        # (payload, return_bytes, decode, future) commands.
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='picaso-io')
+        self._thread.daemon = True
+        self._thread.start()
+
+    ### Per thread state ###
+
+    @property
+    def _batch(self):
+        return getattr(self._local, 'batch', None)
+
+    @_batch.setter
+    def _batch(self, value):
+        self._local.batch = value
+
+    @property
+    def _window(self):
+        return getattr(self._local, 'window', 0)
+
+    @_window.setter
+    def _window(self, value):
+        self._local.window = value
+
+    @property
+    def _inflight(self):
+        try:
+            return self._local.inflight
+        except AttributeError:
+            self._local.inflight = collections.deque()
+            return self._local.inflight
+
+    @_inflight.setter
+    def _inflight(self, value):
+        self._local.inflight = value
+
+    ### Serial communication handling ###
+
+    def _send(self, payload, return_bytes, decode):
+        if self._batch is not None:
+            return super(ThreadedDisplay, self)._send(payload, return_bytes, decode)
+        event = threading.Event()
+        future = CommandFuture(lambda future: event.wait())
+        self._queue.put(([(payload, return_bytes, decode, future)], event))
+        if not self._window:
+            return future.result()
+        inflight = self._inflight
+        inflight.append(future)
+        while len(inflight) > self._window:
+            inflight.popleft().exception()
+        return future
+
+    def _flush_batch(self, items):
+        if not items:
+            return
+        event = threading.Event()
+        self._queue.put((items, event))
+        event.wait()
+        errors = [(index, item[3].exception()) for index, item in enumerate(items)
+                  if item[3].exception() is not None]
+        if errors:
+            raise BatchError(errors)
+
+    def flush(self):
+        """Wait for the replies of all commands sent in pipelined mode by
+        the calling thread."""
+        inflight = self._inflight
+        while inflight:
+            inflight.popleft().exception()
+
+    def set_baudrate(self, baudrate):
+        raise PicasoError('Change the baudrate with a Display on the same port '
+                          'before creating the ThreadedDisplay.')
+
+    def negotiate_baudrate(self, *args, **kwargs):
+        raise PicasoError('Negotiate the baudrate with a Display on the same port '
+                          'before creating the ThreadedDisplay.')
+
+    def close(self):
+        """Stop the I/O thread after all queued commands have been sent and
+        close the serial port."""
+        self._queue.put(None)
+        self._thread.join()
+        self._ser.close()
+
+    def _run(self):
+        """Main loop of the I/O thread."""
+        closing = False
+        while not closing:
+            group = self._queue.get()
+            if group is None:
+                return
+            groups = [group]
+            size = sum(len(item[0]) for item in group[0])
+            while size < self.max_write:
+                try:
+                    group = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if group is None:
+                    closing = True
+                    break
+                groups.append(group)
+                size += sum(len(item[0]) for item in group[0])
+
+            items = [item for group_items, event in groups for item in group_items]
+            try:
+                self._exchange(items)
+            except Exception as e:
+                error = e if isinstance(e, CommunicationError) else CommunicationError(str(e))
+                for item in items:
+                    if not item[3].done():
+                        item[3].set_exception(error)
+            for group_items, event in groups:
+                event.set()
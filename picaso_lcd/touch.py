@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Touch screen helpers: A background poller that turns the touch status into
+a stream of :class:`TouchEvent` objects::
+
+    for event in disp.touch.events():
+        if event.kind == PRESS:
+            print('Pressed at', event.x, event.y)
+
+The status, X and Y coordinate queries of every poll are sent as a single
+batch. The poll interval adapts to the activity: while the screen is
+touched, it's polled every ``fast_interval`` seconds, otherwise the interval
+doubles after every idle poll up to ``idle_interval`` seconds.
+
+If a poll fails (e.g. with a
+:class:`~picaso_lcd.exceptions.CommunicationError`), the poller stops and
+reports the exception: :func:`iter_events` raises it in the consuming
+thread, :class:`TouchPoller` passes it to its ``on_error`` callback.
+
+The poller uses the display from a background thread. If other threads use
+the display at the same time, use a
+:class:`~picaso_lcd.threaded.ThreadedDisplay`.
+
+Buttons and other touch areas can be registered in the
+:class:`TouchRegions` registry of a display, which dispatches events to the
+handler of the region that was touched::
+
+    disp.touch.regions.add('ok', 10, 200, 90, 240, on_ok)
+    disp.touch.regions.add('cancel', 100, 200, 180, 240, on_cancel)
+    disp.touch.regions.apply()
+    disp.touch.on_event(disp.touch.regions.dispatch)
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import collections
+import threading
+import time
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+from .constants import PRESS, RELEASE, MOVING
+from .spatial import GridIndex
+
+
+#: Event kind of a finger moving on the screen (same as the ``MOVING`` status).
+MOVE = MOVING
+
+#: A touch event. ``kind`` is one of :data:`PRESS`, :data:`MOVE` or
+#: :data:`RELEASE`, ``timestamp`` is the time of the poll (``time.time()``).
+TouchEvent = collections.namedtuple('TouchEvent', ['kind', 'x', 'y', 'timestamp'])
+
+
+class TouchPoller(object):
+    """Polls the touch screen in a background thread and reports changes as
+    :class:`TouchEvent` to a callback."""
+
+    def __init__(self, touch, callback, fast_interval=0.01, idle_interval=0.2,
+                 on_error=None):
+        """
+        :param touch: The touch subsystem of the display.
+        :type touch: DisplayTouch
+        :param callback: Function that is called (from the poller thread)
+            with every :class:`TouchEvent`.
+        :type callback: callable
+        :param fast_interval: Poll interval in seconds while the screen is
+            touched.
+        :type fast_interval: float
+        :param idle_interval: Maximum poll interval in seconds while the
+            screen is not touched.
+        :type idle_interval: float
+        :param on_error: Function that is called (from the poller thread)
+            with the exception if polling fails. Polling stops afterwards.
+            Without it, the exception is raised in the poller thread.
+        :type on_error: callable or None
+        """
+        self.touch = touch
+        self.callback = callback
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.on_error = on_error
+        #: The exception that stopped polling, or ``None``.
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._position = None
+
+    def start(self):
+        """Start polling."""
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name='picaso-touch')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling and wait for the poller thread to finish."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def poll(self):
+        """
+        Poll the touch screen once and report the resulting event (if any).
+
+        :returns: The event, or ``None`` if nothing changed.
+        :rtype: TouchEvent or None
+
+        """
+        display = self.touch.d
+        with display.batch():
+            state = self.touch.get_status(0)
+            x = self.touch.get_status(1)
+            y = self.touch.get_status(2)
+        event = self._track(state.result(), (x.result(), y.result()))
+        if event is not None:
+            self.callback(event)
+        return event
+
+    def _track(self, state, position):
+        """Turn a polled status into an event, or ``None`` if nothing
+        changed."""
+        event = None
+        if state == PRESS:
+            event = TouchEvent(PRESS, position[0], position[1], time.time())
+            self._position = position
+        elif state == MOVING:
+            if position != self._position:
+                event = TouchEvent(MOVE, position[0], position[1], time.time())
+            self._position = position
+        elif state == RELEASE:
+            event = TouchEvent(RELEASE, position[0], position[1], time.time())
+            self._position = None
+        return event
+
+    def _next_interval(self, interval):
+        if self._position is not None:
+            return self.fast_interval
+        return min(interval * 2, self.idle_interval)
+
+    def _run(self):
+        interval = self.fast_interval
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as exc:
+                self.error = exc
+                if self.on_error is None:
+                    raise
+                self.on_error(exc)
+                return
+            interval = self._next_interval(interval)
+            self._stop.wait(interval)
+
+
+def iter_events(touch, **kwargs):
+    """
+    Generator of touch events, backed by a :class:`TouchPoller`. The poller
+    is stopped when the generator is closed. If polling fails, the
+    exception is raised by the generator.
+
+    :param touch: The touch subsystem of the display.
+    :type touch: DisplayTouch
+    :param kwargs: Further arguments of :class:`TouchPoller`.
+
+    """
+    events = queue.Queue()
+    poller = TouchPoller(touch, events.put, on_error=events.put, **kwargs).start()
+    try:
+        while True:
+            # Wake up regularly, so KeyboardInterrupt works on Python 2
+            try:
+                item = events.get(timeout=1)
+            except queue.Empty:
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        poller.stop()
+
+
+class TouchRegions(object):
+    """Registry of named touch regions (e.g. buttons) with handlers.
+
+    Hit testing uses a :class:`~picaso_lcd.spatial.GridIndex`, so its cost
+    does not grow with the number of regions. If regions overlap, the one
+    added last wins.
+    """
+
+    def __init__(self, touch, cell_size=32):
+        """
+        :param touch: The touch subsystem of the display.
+        :type touch: DisplayTouch
+        :param cell_size: Cell size of the grid index in pixels.
+        :type cell_size: int
+        """
+        self.touch = touch
+        self._index = GridIndex(cell_size)
+        self._handlers = {}
+        self._order = {}
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def add(self, name, x1, y1, x2, y2, handler=None):
+        """
+        Register a region, or replace the region with the same name.
+
+        :param name: Name of the region.
+        :param x1: X coordinate of the top left corner
+        :type x1: int
+        :param y1: Y coordinate of the top left corner
+        :type y1: int
+        :param x2: X coordinate of the bottom right corner
+        :type x2: int
+        :param y2: Y coordinate of the bottom right corner
+        :type y2: int
+        :param handler: Function that is called with the
+            :class:`TouchEvent` by :meth:`dispatch`.
+        :type handler: callable or None
+
+        """
+        self._index.insert(name, (x1, y1, x2, y2))
+        self._handlers[name] = handler
+        self._counter += 1
+        self._order[name] = self._counter
+
+    def remove(self, name):
+        """
+        Unregister a region.
+
+        :raises: KeyError if there is no region with that name.
+
+        """
+        self._index.remove(name)
+        del self._handlers[name]
+        del self._order[name]
+
+    def clear(self):
+        """Unregister all regions."""
+        self._index.clear()
+        self._handlers.clear()
+        self._order.clear()
+
+    def hit(self, x, y):
+        """
+        Find the region at a coordinate.
+
+        :returns: The name of the region, or ``None``.
+
+        """
+        names = self._index.query_point(x, y)
+        if not names:
+            return None
+        return max(names, key=self._order.__getitem__)
+
+    def dispatch(self, event):
+        """
+        Call the handler of the region hit by a touch event. Can be used as
+        callback of a :class:`TouchPoller`.
+
+        :param event: The touch event.
+        :type event: TouchEvent
+        :returns: The name of the region, or ``None``.
+
+        """
+        name = self.hit(event.x, event.y)
+        if name is not None and self._handlers[name] is not None:
+            self._handlers[name](event)
+        return name
+
+    def bounds(self):
+        """
+        Return the bounding box of all regions.
+
+        :returns: ``(x1, y1, x2, y2)`` or ``None`` if there are no regions.
+
+        """
+        return self._index.bounds()
+
+    def apply(self):
+        """
+        Narrow the touch detect region of the device to the bounding box of
+        all regions, so touches outside of them are not reported at all. If
+        there are no regions, the detect region is reset to the full screen.
+        """
+        bounds = self.bounds()
+        if bounds is None:
+            return self.touch.set_mode(2)
+        return self.touch.set_detect_region(*bounds)
@@ -5,6 +5,25 @@ data or colors.
 """
 from __future__ import print_function, division, absolute_import, unicode_literals
 
+import re
+import struct
+import unicodedata
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional
+    numpy = None
+
+try:
+    unichr
+except NameError:  # Python 3
+    unichr = chr
+
+
+# Cache of precompiled big endian word packers, keyed by word count.
+_WORD_PACKERS = {}
+_MAX_CACHED_PACKER = 64
+
 
 def int_to_dbyte(value):
     """Convert a single integer to a double byte: ``(high byte, low byte)``.
@@ -26,6 +45,84 @@ def int_to_dbyte(value):
     return value >> 8, value & 0xFF
 
 
+def pack_words(words):
+    """Pack a sequence of 16 bit words into a big endian byte string.
+
+    This is the bulk counterpart of :func:`int_to_dbyte`: the whole command
+    is encoded in a single step using a precompiled :class:`struct.Struct`
+    instead of splitting every value separately.
+
+        >>> pack_words([0xffc8, 1, 2])
+        b'\\xff\\xc8\\x00\\x01\\x00\\x02'
+
+    :param words: The words to be packed.
+    :type words: sequence of int < 2**16
+    :returns: The packed words (high byte first).
+    :raises: ValueError
+    :rtype: bytes
+
+    """
+    count = len(words)
+    packer = _WORD_PACKERS.get(count)
+    if packer is None:
+        packer = struct.Struct(str('>{0}H'.format(count)))
+        if count <= _MAX_CACHED_PACKER:
+            _WORD_PACKERS[count] = packer
+    try:
+        return packer.pack(*words)
+    except struct.error:
+        raise ValueError('All words must be in the range 0..2^16-1')
+
+
+def pack_word_array(words):
+    """Pack an array of 16 bit words into a big endian byte string.
+
+    NumPy arrays are converted in a single vectorized step, other sequences
+    are packed using :func:`pack_words`.
+
+    :param words: The words to be packed.
+    :type words: numpy.ndarray or sequence of int < 2**16
+    :returns: The packed words (high byte first).
+    :raises: ValueError
+    :rtype: bytes
+
+    """
+    if numpy is not None and isinstance(words, numpy.ndarray):
+        if words.size and (words.min() < 0 or words.max() > 0xffff):
+            raise ValueError('All words must be in the range 0..2^16-1')
+        return words.astype('>u2').tobytes()
+    return pack_words(words)
+
+
+def split_points(points):
+    """Split a sequence of ``(x, y)`` points into X and Y coordinates.
+
+    Coordinates are rounded to integers. If NumPy is available, any array
+    like object of shape ``(n, 2)`` is accepted and NumPy arrays are
+    returned, otherwise lists.
+
+    :param points: The points.
+    :type points: sequence of (int, int) or numpy.ndarray
+    :returns: Tuple ``(xs, ys)``.
+    :raises: ValueError
+    :rtype: (sequence of int, sequence of int)
+
+    """
+    if numpy is not None:
+        points = numpy.asarray(points)
+        if not points.size:
+            points = points.reshape(0, 2)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError('Points must be a sequence of (x, y) pairs')
+        if points.dtype.kind == 'f':
+            points = numpy.rint(points)
+        points = points.astype(numpy.int64)
+        return points[:, 0], points[:, 1]
+    xs = [int(round(x)) for x, y in points]
+    ys = [int(round(y)) for x, y in points]
+    return xs, ys
+
+
 def dbyte_to_int(high_byte, low_byte):
     """Convert a double byte ``(high byte, low byte)`` to a single integer.
 
@@ -53,6 +150,164 @@ def dbyte_to_int(high_byte, low_byte):
     return (high_byte << 8) | low_byte
 
 
+# Lookup tables for color conversion, built on first use
+_LUTS = {}
+
+# 8x8 Bayer threshold matrix for ordered dithering
+_BAYER_8X8 = (
+    (0, 32, 8, 40, 2, 34, 10, 42),
+    (48, 16, 56, 24, 50, 18, 58, 26),
+    (12, 44, 4, 36, 14, 46, 6, 38),
+    (60, 28, 52, 20, 62, 30, 54, 22),
+    (3, 35, 11, 43, 1, 33, 9, 41),
+    (51, 19, 59, 27, 49, 17, 57, 25),
+    (15, 47, 7, 39, 13, 45, 5, 37),
+    (63, 31, 55, 23, 61, 29, 53, 21),
+)
+
+
+def _luts():
+    """Return the color conversion lookup tables."""
+    if not _LUTS:
+        values = numpy.arange(256, dtype=numpy.uint16)
+        # RGB888 -> RGB565, per component (already shifted into place)
+        _LUTS['red'] = (values >> 3) << 11
+        _LUTS['green'] = (values >> 2) << 5
+        _LUTS['blue'] = values >> 3
+        # 5 and 6 bit components -> 8 bit, replicating the high bits
+        expand5 = numpy.arange(32, dtype=numpy.uint16)
+        expand6 = numpy.arange(64, dtype=numpy.uint16)
+        _LUTS['expand5'] = ((expand5 << 3) | (expand5 >> 2)).astype(numpy.uint8)
+        _LUTS['expand6'] = ((expand6 << 2) | (expand6 >> 4)).astype(numpy.uint8)
+    return _LUTS
+
+
+def rgb888_to_rgb565(rgb, dither=None):
+    """Convert an array of 24 bit RGB colors to 16 bit (565) colors.
+
+    This is the vectorized counterpart of :func:`to_16bit_color`, for full
+    range (0..255) color components, using lookup tables. Requires NumPy.
+
+    Without dithering, the components are truncated. ``'ordered'``
+    dithering uses a Bayer threshold pattern instead of truncating,
+    ``'floyd-steinberg'`` rounds to the nearest color and diffuses the
+    error to the neighbouring pixels (images only).
+
+    :param rgb: Array of shape ``(..., 3)`` with the red, green and blue
+        values.
+    :type rgb: numpy.ndarray
+    :param dither: ``None``, ``'ordered'`` or ``'floyd-steinberg'``.
+    :type dither: str or None
+    :returns: Array of shape ``(...)`` with the 16 bit colors.
+    :rtype: numpy.ndarray of numpy.uint16
+
+    """
+    rgb = numpy.asarray(rgb)
+    if rgb.shape[-1:] != (3,):
+        raise ValueError('Colors must have 3 components')
+    if dither == 'floyd-steinberg':
+        return _floyd_steinberg(rgb)
+    if rgb.dtype != numpy.uint8:
+        rgb = numpy.clip(rgb, 0, 255).astype(numpy.uint8)
+    if dither == 'ordered':
+        return _ordered_dither(rgb)
+    elif dither is not None:
+        raise ValueError('Unknown dithering method: {!r}'.format(dither))
+    luts = _luts()
+    return luts['red'][rgb[..., 0]] | luts['green'][rgb[..., 1]] | luts['blue'][rgb[..., 2]]
+
+
+def _ordered_dither(rgb):
+    """Ordered dithering to RGB565 with a 8x8 Bayer matrix."""
+    if rgb.ndim != 3:
+        raise ValueError('Dithering requires an image of shape (height, width, 3)')
+    height, width = rgb.shape[:2]
+    bayer = (numpy.array(_BAYER_8X8, dtype=numpy.float32) + 0.5) / 64
+    threshold = numpy.tile(bayer, (height // 8 + 1, width // 8 + 1))[:height, :width, None]
+    levels = numpy.array([31, 63, 31], dtype=numpy.float32)
+    quantized = numpy.floor(rgb * (levels / 255) + threshold)
+    quantized = numpy.minimum(quantized, levels).astype(numpy.uint16)
+    return quantized[..., 0] << 11 | quantized[..., 1] << 5 | quantized[..., 2]
+
+
+def _floyd_steinberg(rgb):
+    """Floyd-Steinberg dithering to RGB565.
+
+    A pixel only depends on the errors of its left, upper left, upper and
+    upper right neighbours. All pixels on an anti-diagonal ``x + 2 * y = t``
+    are therefore independent of each other and are processed at once.
+    """
+    if rgb.ndim != 3:
+        raise ValueError('Dithering requires an image of shape (height, width, 3)')
+    height, width = rgb.shape[:2]
+    # Work on a flat copy padded by one column on both sides and one row at
+    # the bottom, so the error can be diffused without bounds checks.
+    stride = width + 2
+    work = numpy.zeros((height + 1, stride, 3), dtype=numpy.float32)
+    work[:height, 1:width + 1] = rgb
+    work = work.reshape(-1, 3)
+    out = numpy.empty(height * width, dtype=numpy.uint16)
+    luts = _luts()
+    expand = numpy.stack([luts['expand5'][numpy.arange(64) & 31], luts['expand6'],
+                          luts['expand5'][numpy.arange(64) & 31]], axis=1).astype(numpy.float32)
+    scale = numpy.array([31, 63, 31], dtype=numpy.float32) / 255
+    channels = numpy.arange(3)
+    for t in range(width + 2 * (height - 1)):
+        ys = numpy.arange(max(0, (t - width + 2) // 2), min(height - 1, t // 2) + 1)
+        xs = t - 2 * ys
+        index = ys * stride + xs + 1
+        old = work[index]
+        quantized = numpy.rint(numpy.clip(old, 0, 255) * scale).astype(numpy.intp)
+        out[ys * width + xs] = quantized[:, 0] << 11 | quantized[:, 1] << 5 | quantized[:, 2]
+        error = old - expand[quantized, channels]
+        work[index + 1] += error * (7 / 16)
+        work[index + stride - 1] += error * (3 / 16)
+        work[index + stride] += error * (5 / 16)
+        work[index + stride + 1] += error * (1 / 16)
+    return out.reshape(height, width)
+
+
+def image_to_rgb565(image, dither=None):
+    """Convert an image to an array of 16 bit (565) colors. Requires NumPy.
+
+    :param image: Either an array of 16 bit colors of shape
+        ``(height, width)``, an array of 8 bit RGB (or RGBA) colors of shape
+        ``(height, width, 3 or 4)``, or a PIL image.
+    :type image: numpy.ndarray or PIL.Image.Image
+    :param dither: Dithering method for 8 bit RGB images, see
+        :func:`rgb888_to_rgb565`.
+    :type dither: str or None
+    :returns: Array of shape ``(height, width)``.
+    :rtype: numpy.ndarray
+    :raises: ValueError
+
+    """
+    if hasattr(image, 'convert') and hasattr(image, 'mode'):
+        image = image.convert('RGB')  # PIL image
+    pixels = numpy.asarray(image)
+    if pixels.ndim == 3 and pixels.shape[2] in (3, 4):
+        return rgb888_to_rgb565(pixels[..., :3], dither)
+    if pixels.ndim != 2:
+        raise ValueError('Images must have the shape (height, width) or (height, width, 3)')
+    return pixels
+
+
+def rgb565_to_rgb888(colors):
+    """Convert an array of 16 bit (565) colors to 24 bit RGB colors, using
+    lookup tables. Requires NumPy.
+
+    :param colors: The 16 bit colors.
+    :type colors: numpy.ndarray
+    :returns: Array of shape ``colors.shape + (3,)``.
+    :rtype: numpy.ndarray of numpy.uint8
+
+    """
+    colors = numpy.asarray(colors, dtype=numpy.uint16)
+    luts = _luts()
+    return numpy.stack([luts['expand5'][colors >> 11], luts['expand6'][(colors >> 5) & 0x3f],
+                        luts['expand5'][colors & 0x1f]], axis=-1)
+
+
 def to_16bit_color(red, green, blue):
     """Convert rgb color to 16 bit color.
     
@@ -69,3 +324,95 @@ def to_16bit_color(red, green, blue):
 
     """
     return min(red, 31) << 11 | min(green, 63) << 5 | min(blue, 31)
+
+
+# Replacements for non-ASCII characters, as the built-in fonts only cover
+# ASCII. Accented latin letters are added below by stripping their accents,
+# control characters (except newlines) are replaced by '?'. A NUL would end
+# the string early and the rest of it would be read as further commands.
+_TRANSLITERATIONS = {
+    '\u00a0': ' ', '\u00a9': '(c)', '\u00ab': '<<', '\u00ae': '(R)', '\u00b0': "'",
+    '\u00b1': '+-', '\u00b2': '2', '\u00b3': '3', '\u00b5': 'u', '\u00b7': '.',
+    '\u00bb': '>>', '\u00bc': '1/4', '\u00bd': '1/2', '\u00be': '3/4', '\u00c6': 'AE',
+    '\u00d7': 'x', '\u00d8': 'O', '\u00df': 'ss', '\u00e6': 'ae', '\u00f7': '/',
+    '\u00f8': 'o', '\u0141': 'L', '\u0142': 'l', '\u0152': 'OE', '\u0153': 'oe',
+    '\u03a9': 'Ohm', '\u03bc': 'u', '\u2010': '-', '\u2011': '-', '\u2012': '-',
+    '\u2013': '-', '\u2014': '-', '\u2018': "'", '\u2019': "'", '\u201a': "'",
+    '\u201c': '"', '\u201d': '"', '\u201e': '"', '\u2022': '*', '\u2026': '...',
+    '\u2030': '%o', '\u2032': "'", '\u2033': '"', '\u20ac': 'EUR', '\u2122': 'TM',
+    '\u2190': '<-', '\u2192': '->', '\u2212': '-', '\u2264': '<=', '\u2265': '>=',
+}
+
+
+def _transliteration_table():
+    table = dict((ord(char), replacement) for char, replacement in _TRANSLITERATIONS.items())
+    for code in list(range(0x20)) + [0x7f]:
+        if code != ord('\n'):
+            table[code] = '?'
+    for code in range(0xc0, 0x250):
+        if code not in table:
+            base = unicodedata.normalize('NFKD', unichr(code))
+            base = base.encode('ascii', 'ignore').decode('ascii')
+            if base:
+                table[code] = base
+    return table
+
+
+_TRANSLITERATION_TABLE = _transliteration_table()
+_CONTROL_CHARACTERS = re.compile('[\x00-\x09\x0b-\x1f\x7f]')
+
+
+def _as_text(string):
+    """Decode byte strings (e.g. native strings on Python 2) as UTF-8, or
+    Latin-1 if they aren't valid UTF-8."""
+    if isinstance(string, bytes):
+        try:
+            return string.decode('utf-8')
+        except UnicodeDecodeError:
+            return string.decode('latin-1')
+    return string
+
+
+def transliterate(string):
+    """
+    Replace non-ASCII characters of a string by ASCII look-alikes (e.g.
+    ``'\u00e9'`` by ``'e'`` or ``'\u2026'`` by ``'...'``). Characters without
+    replacement and control characters other than newlines become ``'?'``.
+
+    :param string: The string. Byte strings are decoded as UTF-8 (or
+        Latin-1 if they aren't valid UTF-8) first.
+    :type string: str or bytes
+    :returns: The ASCII string. It may be longer than the original one.
+    :rtype: str
+
+    """
+    string = _as_text(string)
+    try:
+        string.encode('ascii')
+    except UnicodeError:
+        pass
+    else:
+        if _CONTROL_CHARACTERS.search(string) is None:
+            return string
+    string = string.translate(_TRANSLITERATION_TABLE)
+    return string.encode('ascii', 'replace').decode('ascii')
+
+
+def encode_string(string):
+    """
+    Encode a string for the *Put String* command: transliterate it (see
+    :func:`transliterate`) and append the NUL terminator.
+
+    :param string: The string.
+    :type string: str or bytes
+    :returns: The NUL terminated ASCII bytes.
+    :rtype: bytes
+
+    """
+    string = _as_text(string)
+    if _CONTROL_CHARACTERS.search(string) is None:
+        try:
+            return string.encode('ascii') + b'\x00'
+        except UnicodeError:
+            pass
+    return transliterate(string).encode('ascii') + b'\x00'
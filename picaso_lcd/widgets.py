@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Widgets that draw themselves incrementally, so that their update cost does
+not depend on their size.
+"""
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+from . import colors
+
+
+class StripChart(object):
+    """A live chart of a stream of samples, drawn in sweep mode.
+
+    Every sample occupies the next ``step`` pixel columns. When the right
+    edge is reached, the chart wraps around and overwrites the oldest
+    samples from the left, like the trace of an oscilloscope. In front of
+    the newest sample, a gap of ``gap`` pixel columns is kept clear.
+
+    An update only erases the columns of the new samples (plus the gap) and
+    draws the new line segment, all in a single batch. This is independent
+    of the width of the chart::
+
+        chart = StripChart(disp, 0, 0, 480, 100, y_min=-1, y_max=1)
+        while True:
+            chart.add(read_sensor())
+
+    Unlike a scrolling chart, no old samples have to be redrawn.
+    """
+
+    def __init__(self, display, x, y, width, height, y_min=0, y_max=1,
+                 color=colors.GREEN, background=colors.BLACK, step=1, gap=4):
+        """
+        :param display: The display to draw on.
+        :type display: Display
+        :param x: X coordinate of the top left corner.
+        :type x: int
+        :param y: Y coordinate of the top left corner.
+        :type y: int
+        :param width: Width of the chart in pixels.
+        :type width: int
+        :param height: Height of the chart in pixels.
+        :type height: int
+        :param y_min: Sample value at the bottom edge. Smaller values are
+            clamped.
+        :type y_min: float
+        :param y_max: Sample value at the top edge. Larger values are
+            clamped.
+        :type y_max: float
+        :param color: Color of the trace.
+        :type color: int
+        :param background: Background color of the chart.
+        :type background: int
+        :param step: Horizontal distance between samples in pixels.
+        :type step: int
+        :param gap: Number of pixel columns in front of the newest sample
+            that are kept clear.
+        :type gap: int
+        """
+        if width < 2 or height < 2:
+            raise ValueError('The chart must be at least 2x2 pixels.')
+        if step < 1 or gap < 0:
+            raise ValueError('Step must be positive and gap must not be negative.')
+        if y_max == y_min:
+            raise ValueError('y_min and y_max must differ.')
+        self.display = display
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.y_min, self.y_max = y_min, y_max
+        self.color = color
+        self.background = background
+        self.step = step
+        self.gap = gap
+
+        #: Number of samples that fit into the chart.
+        self.capacity = (width - 1) // step + 1
+        # Ring buffer of samples, indexed by position in the chart
+        self._values = [None] * self.capacity
+        self._index = 0  # Position of the next sample
+        self._last = None  # Pixel (x, y) of the newest sample of the sweep
+
+    def _column(self, position):
+        return self.x + position * self.step
+
+    def _row(self, value):
+        fraction = (value - self.y_min) / (self.y_max - self.y_min)
+        fraction = min(max(fraction, 0), 1)
+        return self.y + self.height - 1 - int(round(fraction * (self.height - 1)))
+
+    def values(self):
+        """
+        Return the samples in the ring buffer.
+
+        :returns: The samples, oldest first.
+        :rtype: list
+
+        """
+        values = self._values[self._index:] + self._values[:self._index]
+        return [value for value in values if value is not None]
+
+    def add(self, value):
+        """Add and draw a sample."""
+        self.extend([value])
+
+    def extend(self, values):
+        """Add and draw multiple samples. They are drawn as one segment per
+        sweep, using a single batch."""
+        with self.display.batch():
+            points = []
+            first = None  # First column to erase
+            for value in values:
+                if self._index == self.capacity:
+                    self._draw(points, first)
+                    self._index, self._last, points = 0, None, []
+                position = self._index
+                self._values[position] = value
+                point = self._column(position), self._row(value)
+                if not points:
+                    if self._last is not None:
+                        points.append(self._last)
+                        first = self._last[0] + 1
+                    else:
+                        first = point[0]
+                points.append(point)
+                self._last = point
+                self._index += 1
+            self._draw(points, first)
+
+    def clear(self):
+        """Forget all samples and clear the chart area."""
+        self._values = [None] * self.capacity
+        self._index, self._last = 0, None
+        self.display.gfx_rect(self.x, self.y, self.x + self.width - 1,
+                              self.y + self.height - 1, self.background, filled=True)
+
+    def redraw(self):
+        """Redraw the whole chart from the ring buffer, e.g. after the screen
+        was cleared."""
+        right = self.x + self.width - 1
+        with self.display.batch():
+            self.display.gfx_rect(self.x, self.y, right, self.y + self.height - 1,
+                                  self.background, filled=True)
+            # Older part of the ring buffer (end of the previous sweep)
+            # first, then the current sweep
+            for positions in (range(self._index, self.capacity), range(self._index)):
+                points = [(self._column(p), self._row(self._values[p]))
+                          for p in positions if self._values[p] is not None]
+                self._trace(points)
+            if self._last is not None:
+                self._erase(self._last[0] + 1, self._last[0] + self.gap)
+
+    def _draw(self, points, first):
+        """Erase the columns from ``first`` to the last point plus the gap,
+        then draw the points."""
+        if not points:
+            return
+        self._erase(first, points[-1][0] + self.gap)
+        self._trace(points)
+
+    def _trace(self, points):
+        if len(points) == 1:
+            x, y = points[0]
+            self.display.gfx_line(x, y, x, y, self.color)
+        elif points:
+            self.display.gfx_polyline(points, self.color)
+
+    def _erase(self, first, last):
+        """Clear the columns from ``first`` to ``last``, wrapping around at
+        the right edge."""
+        right = self.x + self.width - 1
+        bottom = self.y + self.height - 1
+        if first <= right and first <= last:
+            self.display.gfx_rect(first, self.y, min(last, right), bottom,
+                                  self.background, filled=True)
+        if last > right:
+            self.display.gfx_rect(self.x, self.y, min(self.x + last - right - 1, right),
+                                  bottom, self.background, filled=True)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import sys
+
+import pytest
+
+from picaso_lcd.display import Display
+from picaso_lcd.emulator import EmulatedDevice
+from picaso_lcd.threaded import ThreadedDisplay
+
+
+# The asyncio display uses syntax that older interpreters can't even parse,
+# so its tests must not be collected there.
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append('test_aio.py')
+
+
+@pytest.fixture
+def device():
+    return EmulatedDevice(timeout=0.05)
+
+
+@pytest.fixture
+def disp(device):
+    return Display(device)
+
+
+@pytest.fixture
+def threaded_disp(device):
+    disp = ThreadedDisplay(device)
+    yield disp
+    disp.close()
+
+
+@pytest.fixture
+def raster_device():
+    raster = pytest.importorskip('picaso_lcd.raster')
+    return raster.RasterDevice(width=64, height=48, timeout=0.05)
+
+
+@pytest.fixture
+def raster_disp(raster_device):
+    return Display(raster_device)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import asyncio
+
+import pytest
+
+from picaso_lcd.aio import AsyncDisplay
+from picaso_lcd.emulator import EmulatedDevice, PtyBridge
+from picaso_lcd.exceptions import PicasoError
+
+
+def run(device, coroutine_function):
+    bridge = PtyBridge(device)
+    try:
+        async def main():
+            disp = AsyncDisplay(bridge.port, 115200)
+            try:
+                return await asyncio.wait_for(coroutine_function(disp), 5)
+            finally:
+                disp.close()
+        return asyncio.run(main())
+    finally:
+        bridge.close()
+
+
+def test_commands():
+    device = EmulatedDevice()
+
+    async def session(disp):
+        await disp.cls()
+        previous = await disp.text.set_fg_color(0x1234)
+        size = await disp.get_display_size()
+        return previous, size
+
+    assert run(device, session) == (0xffff, (480, 272))
+    assert device.text['fg_color'] == 0x1234
+
+
+def test_concurrent_awaiters():
+    device = EmulatedDevice()
+
+    async def worker(disp, i):
+        for j in range(20):
+            await disp.gfx_line(0, 0, i, j, 0)
+        return await disp.touch.get_status(1)
+
+    async def session(disp):
+        return await asyncio.gather(*(worker(disp, i) for i in range(10)))
+
+    assert run(device, session) == [0] * 10
+    assert device.command_counts[0xffc8] == 200
+
+
+def test_errors_and_text():
+    device = EmulatedDevice()
+
+    async def session(disp):
+        failing = disp.write_cmd([0x1234])
+        size = await disp.text.set_size(2)
+        with pytest.raises(PicasoError):
+            await failing
+        width = await disp.text.measure_string('abc')
+        cached = await disp.text.set_fg_color(0xffff)
+        return size, width, cached
+
+    assert run(device, session) == ((1, 1), (48, 24), 0xffff)
+
+
+def test_touch_events():
+    from picaso_lcd.touch import PRESS, RELEASE
+    device = EmulatedDevice()
+
+    async def session(disp):
+        events = disp.touch.events(fast_interval=0.001, idle_interval=0.002)
+        device.touch_press(5, 6)
+        press = await events.__anext__()
+        device.touch_release()
+        release = await events.__anext__()
+        await events.aclose()
+
+        received = []
+        task = disp.touch.on_event(received.append, fast_interval=0.001, idle_interval=0.002)
+        device.touch_press(7, 8)
+        while not received:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return press[:3], release[:3], received[0][:3]
+
+    assert run(device, session) == ((PRESS, 5, 6), (RELEASE, 5, 6), (PRESS, 7, 8))
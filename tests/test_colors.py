@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from picaso_lcd import colors, utils
+
+
+def test_rgb565_round_trip():
+    everything = np.arange(1 << 16, dtype=np.uint16)
+    rgb = utils.rgb565_to_rgb888(everything)
+    assert rgb.shape == (1 << 16, 3)
+    assert (utils.rgb888_to_rgb565(rgb) == everything).all()
+    assert rgb[colors.WHITE].tolist() == [255, 255, 255]
+
+
+@pytest.mark.parametrize('dither', ['ordered', 'floyd-steinberg'])
+def test_dithering_preserves_average(dither):
+    # A flat color between two RGB565 levels
+    image = np.full((32, 48, 3), [100, 101, 102], dtype=np.uint8)
+    plain = utils.rgb565_to_rgb888(utils.rgb888_to_rgb565(image)).astype(float)
+    dithered = utils.rgb565_to_rgb888(utils.rgb888_to_rgb565(image, dither)).astype(float)
+    assert len(np.unique(dithered[..., 0])) == 2
+    error = np.abs(dithered.mean(axis=(0, 1)) - [100, 101, 102])
+    assert (error < 1).all()
+    # Red and blue are not representable exactly
+    plain_error = np.abs(plain.mean(axis=(0, 1)) - [100, 101, 102])
+    assert error[0] < plain_error[0] and error[2] < plain_error[2]
+
+
+def test_floyd_steinberg_exact_colors():
+    image = utils.rgb565_to_rgb888(np.random.RandomState(0).randint(0, 1 << 16, (10, 13)))
+    assert (utils.rgb888_to_rgb565(image, 'floyd-steinberg') == utils.rgb888_to_rgb565(image)).all()
+
+
+def test_nearest_color():
+    assert colors.nearest_name(colors.RED) == 'RED'
+    assert colors.nearest_name(colors.RED ^ 0x0001) == 'RED'
+    assert colors.nearest_color(colors.NAVY) == colors.NAVY
+    assert colors.nearest_name(colors.CYAN) == 'AQUA'
+    result = colors.nearest_color(np.array([[colors.WHITE, 0x0001]]))
+    assert result.tolist() == [[colors.WHITE, colors.BLACK]]
+    assert 'WHITE' in colors.palette()
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import pytest
+
+from picaso_lcd import display
+from picaso_lcd.exceptions import PicasoError, CommunicationError, BatchError
+
+
+class FakeSerial(object):
+    """Minimal serial port stand-in that records writes and serves
+    predefined replies."""
+
+    def __init__(self, *args, **kwargs):
+        self.written = []
+        self.reads = []
+        self.replies = bytearray()
+
+    def write(self, data):
+        self.written.append(bytes(data))
+
+    def read(self, size=1):
+        self.reads.append(size)
+        data, self.replies = self.replies[:size], self.replies[size:]
+        return bytes(data)
+
+    def flush(self):
+        pass
+
+    def flushInput(self):  # pyserial 2 API
+        self.replies = bytearray()
+
+
+@pytest.fixture
+def disp(monkeypatch):
+    monkeypatch.setattr(display.serial, 'Serial', FakeSerial)
+    return display.Display('/dev/null')
+
+
+### write_cmd / write_raw_cmd ###
+
+def test_write_cmd_single_write(disp):
+    disp._ser.replies += b'\x06'
+    disp.gfx_line(1, 2, 300, 4, 0xffff)
+    assert disp._ser.written == [b'\xff\xc8\x00\x01\x00\x02\x01\x2c\x00\x04\xff\xff']
+    assert disp._ser.reads == [1]
+
+
+def test_write_raw_cmd_single_write(disp):
+    disp._ser.replies += b'\x06\x00\x02'
+    disp.text.put_string('ab')
+    assert disp._ser.written == [b'\x00\x18ab\x00']
+    assert disp._ser.reads == [1, 2]
+
+
+def test_nak_does_not_read_reply_values(disp):
+    # A real port would block until the read timeout for missing bytes
+    disp._ser.replies += b'\x15'
+    with pytest.raises(PicasoError):
+        disp.text.put_string('ab')
+    assert disp._ser.reads == [1]
+    disp.instrument()
+    disp._ser.replies += b'\x15'
+    with pytest.raises(PicasoError):
+        disp.text.put_string('ab')
+    assert disp._ser.reads == [1, 1]
+
+
+def test_set_baudrate_without_ack(disp):
+    disp._ser.replies += b'\x15\x00'
+    with pytest.raises(CommunicationError):
+        disp.set_baudrate(115200)
+    assert disp._ser.written == [b'\x00\x26\x00\x0d']
+    assert disp._ser.baudrate == 115200
+    assert disp._ser.replies == b''
+
+
+def test_put_string_encoding(disp):
+    disp._ser.replies += b'\x06\x00\x0a'
+    disp.text.put_string('22.5\u00b0C \u2026')
+    assert disp._ser.written == [b"\x00\x1822.5'C ...\x00"]
+    disp._ser.replies += b'\x06\x00\x01'
+    with pytest.raises(PicasoError):
+        disp.text.put_string('ab')
+    with pytest.raises(ValueError):
+        disp.text.put_string('\u2026' * 200)
+
+
+def test_polyline_chunks(disp):
+    disp.max_polyline_vertices = 3
+    disp._ser.replies += b'\x06' * 2
+    disp.gfx_polyline([(0, 1), (2, 3), (4, 5), (6, 7)], 0xffff)
+    assert disp._ser.written == [
+        b'\x00\x15\x00\x03' b'\x00\x00\x00\x02\x00\x04' b'\x00\x01\x00\x03\x00\x05' b'\xff\xff'
+        b'\x00\x15\x00\x02' b'\x00\x04\x00\x06' b'\x00\x05\x00\x07' b'\xff\xff']
+    assert disp._ser.reads == [2]
+
+    # Closed outlines are drawn as open path back to the start
+    disp._ser.written = []
+    disp._ser.replies += b'\x06' * 2
+    disp.gfx_polyline([(0, 1), (2, 3), (4, 5), (6, 7)], 0xffff, closed=True)
+    assert len(disp._ser.written) == 1
+    assert disp._ser.written[0].endswith(
+        b'\x00\x15\x00\x03' b'\x00\x04\x00\x06\x00\x00' b'\x00\x05\x00\x07\x00\x01' b'\xff\xff')
+    with pytest.raises(ValueError):
+        disp.gfx_polyline([(0, 1), (2, 3), (4, 5), (6, 7)], 0xffff, filled=True)
+
+
+def test_reply_values(disp):
+    disp._ser.replies += b'\x06\x01\x02'
+    assert disp.text.set_fg_color(0) == 0x0102
+
+
+def test_nak(disp):
+    disp._ser.replies += b'\x15'
+    with pytest.raises(PicasoError):
+        disp.cls()
+
+
+@pytest.mark.parametrize('reply', [b'', b'\x06\x01'])
+def test_read_timeout(disp, reply):
+    disp._ser.replies += reply
+    with pytest.raises(CommunicationError):
+        disp.text.set_fg_color(0)
+
+
+### Pipelined mode ###
+
+def test_pipeline_window(disp):
+    disp._ser.replies += b'\x06\x00\x01\x06\x00\x02\x06'
+    disp.set_pipeline(2)
+    first = disp.text.set_fg_color(1)
+    second = disp.text.set_fg_color(2)
+    assert disp._ser.reads == []
+    third = disp.cls()
+    assert disp._ser.reads == [1, 2]
+    assert first.result() == 1
+    assert not second.done()
+    disp.flush()
+    assert second.result() == 2
+    assert third.result() is None
+    assert len(disp._ser.written) == 3
+
+
+def test_pipeline_error_on_right_command(disp):
+    disp._ser.replies += b'\x06\x15\x06\x00\x07'
+    disp.set_pipeline(8)
+    futures = [disp.cls(), disp.cls(), disp.text.set_font(0)]
+    assert futures[2].result() == 7
+    assert futures[0].result() is None
+    with pytest.raises(PicasoError):
+        futures[1].result()
+
+
+def test_pipeline_nak_on_command_with_values(disp):
+    # The NAK of the first query is not followed by response values, the
+    # following reply belongs to the second command
+    disp._ser.replies += b'\x15\x06\xff\xff'
+    disp.set_pipeline(4)
+    futures = [disp.set_orientation(7), disp.text.set_fg_color(0x1234)]
+    disp.flush()
+    with pytest.raises(PicasoError):
+        futures[0].result()
+    assert futures[1].result() == 0xffff
+    assert disp._ser.replies == b''
+
+
+def test_pipeline_timeout_fails_remaining(disp):
+    disp._ser.replies += b'\x06'
+    disp.set_pipeline(8)
+    futures = [disp.cls(), disp.cls(), disp.cls()]
+    disp.set_pipeline(0)
+    assert futures[0].result() is None
+    for future in futures[1:]:
+        assert isinstance(future.exception(), CommunicationError)
+
+
+### Batch mode ###
+
+def test_batch(disp):
+    disp._ser.replies += b'\x06\x06\x00\x05\x06\x00\x02'
+    with disp.batch() as futures:
+        disp.gfx_line(0, 0, 1, 1, 0)
+        prev = disp.text.set_fg_color(1)
+        disp.text.put_string('ab')
+        assert disp._ser.written == []
+    assert len(disp._ser.written) == 1
+    assert sum(disp._ser.reads) == 7
+    assert prev.result() == 5
+    assert len(futures) == 3
+    assert all(f.done() for f in futures)
+
+
+def test_batch_nak_does_not_wait_for_timeout(disp):
+    # The NAK of the first command is not followed by response values
+    disp._ser.replies += b'\x15\x06\x00\x02\x06'
+    with pytest.raises(BatchError) as excinfo:
+        with disp.batch() as futures:
+            disp.text.set_fg_color(1)
+            disp.text.put_string('ab')
+            disp.cls()
+    assert excinfo.value.index == 0
+    # Never more bytes were requested than the device sent (FakeSerial
+    # returns short reads where a real port would block until the timeout)
+    assert sum(disp._ser.reads) == 5
+    assert futures[1].result() is None and futures[2].result() is None
+
+
+def test_batch_error_index(disp):
+    disp._ser.replies += b'\x06\x15\x06\x00\x05'
+    with pytest.raises(BatchError) as excinfo:
+        with disp.batch():
+            disp.cls()
+            disp.cls()
+            prev = disp.text.set_fg_color(1)
+    assert excinfo.value.index == 1
+    assert prev.result() == 5
+
+
+def test_batch_discarded_on_exception(disp):
+    with pytest.raises(KeyError):
+        with disp.batch():
+            disp.cls()
+            raise KeyError()
+    assert disp._ser.written == []
+
+
+### Text state cache ###
+
+def test_text_cache_skips_redundant_set(disp):
+    disp._ser.replies += b'\x06\x00\x05\x06\x00\x07'
+    assert disp.text.set_fg_color(7) == 5
+    assert disp.text.set_fg_color(7) == 7
+    assert len(disp._ser.written) == 1
+    disp.text.invalidate()
+    assert disp.text.set_fg_color(7) == 7
+    assert len(disp._ser.written) == 2
+
+
+def test_text_cache_attributes(disp):
+    disp._ser.replies += b'\x06\x00\x00'
+    disp.text.set_attributes(bold=True)
+    assert disp.text.set_attributes(bold=True) == {
+        'bold': True, 'italic': False, 'inverse': False, 'underlined': False}
+    assert len(disp._ser.written) == 1
+    # The device keeps the attributes and the dedicated bold flag apart
+    disp._ser.replies += b'\x06\x00\x00'
+    assert disp.text.set_bold(1) == 0
+    assert len(disp._ser.written) == 2
+
+
+def test_text_cache_forgets_failed_command(disp):
+    disp._ser.replies += b'\x15'
+    disp.set_pipeline(4)
+    future = disp.text.set_font(1)
+    assert isinstance(future.exception(), PicasoError)
+    assert 'font' not in disp.text._state
+
+
+### Font metrics ###
+
+def test_measure_string(disp):
+    # Current text state: font 3, width 1, height 1, no gaps
+    disp._ser.replies += b'\x06\x00\x03\x06\x00\x01\x06\x00\x01\x06\x00\x00\x06\x00\x00'
+    # Glyph sizes of 'a', 'b' and ' '
+    disp._ser.replies += b'\x06\x00\x05\x06\x00\x08\x06\x00\x06\x06\x00\x08\x06\x00\x04\x06\x00\x08'
+    assert disp.text.measure_string('ab') == (11, 8)
+    assert len(disp._ser.written) == 2
+    assert disp.text.measure_string('ba\n\nb') == (11, 24)
+    assert disp.text.fit_string('abab', 12) == 'ab'
+    assert len(disp._ser.written) == 2
+
+    # Multipliers are applied on the host, without wrapping
+    disp._ser.replies += b'\x06\x00\x01\x06\x00\x01'
+    disp.text.set_size(16)
+    assert disp.text.get_character_width('b') == 96
+    assert disp.text.measure_string('ab') == (176, 128)
+    assert len(disp._ser.written) == 4
+
+
+def test_nested_batch(disp):
+    disp._ser.replies += b'\x06' * 4
+    with disp.batch() as outer:
+        disp.cls()
+        with disp.batch() as inner:
+            disp.cls()
+            disp.cls()
+        assert len(inner) == 2
+        disp.cls()
+    assert len(disp._ser.written) == 1
+    assert len(outer) == 4
+    assert inner == outer[1:3]
+    assert all(f.done() for f in inner)
+
+
+def test_measure_string_inside_batch(disp):
+    with pytest.raises(PicasoError):
+        with disp.batch():
+            disp.text.measure_string('a')
+
+
+### Geometry cache ###
+
+def test_display_size_cached(disp):
+    disp._ser.replies += b'\x06\x01\xdf\x06\x01\x0f'
+    assert disp.get_display_size() == (480, 272)
+    assert sum(disp._ser.reads) == 6
+    assert disp.get_display_size() == (480, 272)
+    assert len(disp._ser.written) == 1
+
+
+def test_orientation_swaps_size(disp):
+    disp._ser.replies += b'\x06\x01\xdf\x06\x01\x0f\x06\x00\x00\x06\x00\x02'
+    disp.get_display_size()
+    assert disp.set_orientation(2) == 0
+    assert disp.orientation == 2
+    assert disp.get_display_size() == (272, 480)
+    assert disp.set_orientation(3) == 2
+    assert disp.get_display_size() == (272, 480)
+    assert len(disp._ser.written) == 3
+
+
+def test_refresh_geometry(disp):
+    disp._ser.replies += b'\x06\x01\xdf\x06\x01\x0f\x06\x01\x0f\x06\x01\xdf'
+    disp.get_display_size()
+    assert disp.refresh_geometry() == (272, 480)
+    assert disp.get_display_size() == (272, 480)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import time
+
+import pytest
+
+from picaso_lcd.display import Display
+from picaso_lcd.emulator import EmulatedDevice, PRESS, MOVING, RELEASE, NOTOUCH
+from picaso_lcd.exceptions import PicasoError
+
+
+def test_text_state(disp, device):
+    assert disp.text.set_fg_color(0x1234) == 0xffff
+    assert disp.text.set_bg_color(0x0001) == 0x0000
+    disp.text.invalidate()
+    assert disp.text.set_fg_color(0x0000) == 0x1234
+    assert device.text['bg_color'] == 0x0001
+
+
+def test_display_size_and_orientation(disp, device):
+    assert disp.get_display_size() == (480, 272)
+    assert disp.set_orientation(2) == 0
+    assert device.orientation == 2
+    assert disp.refresh_geometry() == (272, 480)
+
+
+def test_put_string_and_metrics(disp, device):
+    disp.text.put_string('Hello\nWorld')
+    assert device.command_counts[0x0018] == 1
+    disp.text.set_size(2)
+    assert disp.text.measure_string('Hello') == (80, 24)
+    # The device itself wraps large sizes
+    disp.text.set_width(16)
+    assert disp.text.get_character_width('A') == 128
+    disp.text.set_width(40)
+    assert disp.text.get_character_width('A') == 320
+
+
+def test_attributes_and_dedicated_setters(disp, device):
+    disp.text.set_bold(1)
+    disp.text.set_attributes(bold=False)
+    disp.text.set_bold(0)
+    assert device.text['bold'] == 0
+    assert device.text['attributes'] == 0
+
+
+def test_touch(disp, device):
+    device.touch_press(10, 20)
+    assert disp.touch.get_status(0) == PRESS
+    assert (disp.touch.get_status(1), disp.touch.get_status(2)) == (10, 20)
+    assert disp.touch.get_status(0) == MOVING
+    device.touch_release()
+    assert disp.touch.get_status(0) == RELEASE
+    assert disp.touch.get_status(0) == NOTOUCH
+
+
+def test_unknown_command(disp):
+    with pytest.raises(PicasoError):
+        disp.write_cmd([0x1234])
+    disp.cls()
+
+
+def test_pipeline_and_batch(disp, device):
+    disp.set_pipeline(4)
+    futures = [disp.gfx_line(0, 0, i, i, 0) for i in range(10)]
+    disp.set_pipeline(0)
+    assert all(f.done() for f in futures)
+    with disp.batch():
+        for i in range(10):
+            disp.gfx_polyline([(0, 0), (i, i), (2 * i, 0)], 0)
+    assert device.command_counts[0xffc8] == 10
+    assert device.command_counts[0x0015] == 10
+
+
+def test_simulated_wire_time():
+    device = EmulatedDevice(baudrate=100000, simulate_wire=True, latency=0.01,
+            command_delay=0.005)
+    disp = Display(device)
+    start = time.time()
+    disp.gfx_line(0, 0, 10, 10, 0)
+    # 12 bytes + 1 byte at 10 bits per byte, plus latency and processing
+    assert time.time() - start >= 0.0013 + 0.01 + 0.005
+
+
+def test_set_baudrate(disp, device):
+    disp.set_baudrate(115200)
+    assert device.device_baudrate == device.baudrate == disp.baudrate == 115200
+    assert device.baud_index == 13
+    assert disp.get_display_size() == (480, 272)
+    with pytest.raises(ValueError):
+        disp.set_baudrate(12345)
+
+
+def test_baudrate_mismatch(disp, device):
+    device.baudrate = 19200
+    assert not disp.verify_link()
+    device.baudrate = 9600
+    assert disp.verify_link()
+
+
+def test_negotiate_baudrate(disp, device):
+    device.max_baudrate = 256000
+    assert disp.negotiate_baudrate() == 256000
+    assert device.device_baudrate == device.baudrate == 256000
+    assert device.timeout == 0.05
+    assert disp.text.set_fg_color(0x1234) == 0xffff
+
+
+def test_negotiate_baudrate_limit(disp, device):
+    assert disp.negotiate_baudrate(max_baudrate=100000) == 57600
+    assert device.device_baudrate == 57600
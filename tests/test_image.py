@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from picaso_lcd.display import Display
+from picaso_lcd.image import encode, cost, draw_image, Fill, Span, Pixels
+from picaso_lcd.raster import RasterDevice
+
+
+def _ui_image():
+    image = np.full((70, 100), 0x001f, dtype=np.uint16)
+    image[0:12, :] = 0xffff  # Title bar
+    image[20:40, 10:50] = 0xf800  # Button
+    image[25:35, 15:45] = 0x07e0
+    image[50:53, 60:97] = 0x1234
+    image[45:48, 5:8] = 0x4321  # Small icon crossing tile boundaries
+    image[47, 6] = 0x0000
+    return image
+
+
+def _render(image, **kwargs):
+    device = RasterDevice(width=128, height=96, timeout=0.05)
+    commands = draw_image(Display(device), 3, 5, image, **kwargs)
+    return device, commands
+
+
+def test_flat_image():
+    image = _ui_image()
+    device, commands = _render(image)
+    pixels = device.framebuffer.pixels
+    assert (pixels[5:75, 3:103] == image).all()
+    assert not pixels[:5].any() and not pixels[:, :3].any()
+    assert cost(commands) * 10 < 11 + 2 * image.size
+    assert not any(isinstance(command, Pixels) for command in commands)
+    assert device.bytes_received == cost(commands) - len(commands)
+
+
+def test_noise_uses_raw_pixels():
+    image = np.random.RandomState(0).randint(0, 1 << 16, (20, 40)).astype(np.uint16)
+    device, commands = _render(image, tile_size=8)
+    assert all(isinstance(command, Pixels) for command in commands)
+    assert len(commands) == 3 * 5
+    assert (device.framebuffer.pixels[5:25, 3:43] == image).all()
+
+
+def test_dominant_color_tile():
+    image = np.zeros((16, 16), dtype=np.uint16)
+    image[2:14, 2] = image[2:14, 13] = 0xffff  # Frame
+    image[2, 2:14] = image[13, 2:14] = 0xffff
+    image[7:9, 5:11] = 0xf800
+    commands = encode(image)
+    assert commands[0] == Fill(0, 0, 15, 15, 0)
+    assert len(commands) == 6
+    device, commands = _render(image)
+    assert (device.framebuffer.pixels[5:21, 3:19] == image).all()
+
+
+def test_spans_and_rgb_input():
+    image = np.zeros((4, 32, 3), dtype=np.uint8)
+    image[1, 3:20] = [255, 0, 0]
+    commands = encode(image, tile_size=32)
+    assert Span(3, 1, 19, 0xf800) in commands
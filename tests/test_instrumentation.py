@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+from picaso_lcd.display import Display
+from picaso_lcd.emulator import EmulatedDevice
+from picaso_lcd.instrumentation import Histogram
+
+
+def test_histogram():
+    histogram = Histogram()
+    for duration in (0.0000005, 0.001, 0.001, 0.002, 0.5):
+        histogram.add(duration)
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 5
+    assert snapshot['min'] == 0.0000005
+    assert snapshot['max'] == 0.5
+    assert 0.001 <= snapshot['p50'] < 0.002
+    assert snapshot['p99'] == 0.5
+    assert sum(snapshot['buckets']) == 5
+
+
+def test_instrumentation():
+    disp = Display(EmulatedDevice(timeout=0.05))
+    records = []
+    instrumentation = disp.instrument(records.append)
+    disp.cls()
+    disp.text.set_fg_color(3)
+    disp.set_pipeline(4)
+    disp.gfx_line(0, 0, 1, 1, 0)
+    disp.flush()
+    with disp.batch():
+        disp.gfx_line(0, 0, 1, 1, 0)
+
+    stats = instrumentation.stats()
+    assert stats[0xffcd]['count'] == 1
+    assert stats[0xffe7]['bytes_written'] == 4
+    assert stats[0xffe7]['bytes_read'] == 3
+    assert stats[0xffe7]['ack_time']['count'] == 1
+    assert stats[0xffe7]['reply_time']['count'] == 1
+    assert stats[0xffc8]['count'] == 2
+    assert stats[0xffc8]['write_time']['count'] == 2
+    assert stats[0xffc8]['ack_time']['count'] == 1
+    assert [r.opcode for r in records] == [0xffcd, 0xffe7, 0xffc8, 0xffc8]
+
+    disp.remove_hook(instrumentation)
+    disp.cls()
+    assert instrumentation.stats()[0xffcd]['count'] == 1
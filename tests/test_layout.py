@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+from picaso_lcd.layout import wrap, layout, draw_text
+
+
+def test_wrap(disp):
+    # Font 3 is 8x12 pixels, so 5 characters fit into 40 pixels
+    assert wrap(disp, 'ab cd ef  ghi', 40) == ['ab cd', 'ef', 'ghi']
+    assert wrap(disp, 'abcdefghijkl mn', 40) == ['abcde', 'fghij', 'kl mn']
+    assert wrap(disp, 'ab\n\ncd  ', 40) == ['ab', '', 'cd']
+    disp.text.set_x_gap(2)
+    assert wrap(disp, 'abcd efgh', 40) == ['abcd', 'efgh']
+
+
+def test_layout(disp):
+    disp.text.set_y_gap(3)
+    assert layout(disp, 5, 10, 'one two\nthree', 40, max_height=30) == [
+        (5, 10, 'one'), (5, 25, 'two')]
+
+
+def test_draw_text(disp, device):
+    text = 'x' * 600 + '\n' + 'log line ' * 3
+    layout(disp, 0, 0, text, 10000)  # Fetch the metrics
+    device.command_counts.clear()
+    assert draw_text(disp, 0, 0, text, 10000) == [
+        (0, 0, 'x' * 600), (0, 12, 'log line log line log line')]
+    assert device.command_counts[0xffcc] == 2
+    assert device.command_counts[0x0018] == 3
+    assert device.origin == (26 * 8, 12)
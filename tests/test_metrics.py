@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+from picaso_lcd.metrics import FontMetrics
+
+
+def test_missing():
+    metrics = FontMetrics()
+    metrics.set((3, 1, 1, 0, 0), 'a', 5, 8)
+    assert metrics.missing((3, 1, 1, 0, 0), 'abca') == ['b', 'c']
+    assert metrics.missing((3, 2, 1, 0, 0), 'a') == ['a']
+
+
+def test_save_load(tmpdir):
+    metrics = FontMetrics.for_model('uLCD-43', directory=str(tmpdir.join('metrics')))
+    metrics.set((3, 1, 1, 0, 0), 'a', 5, 8)
+    metrics.set((0, 2, 1, 1, 0), '"', 3, 7)
+    metrics.save()
+
+    loaded = FontMetrics.for_model('uLCD-43', directory=str(tmpdir.join('metrics')))
+    assert loaded.get((3, 1, 1, 0, 0), 'a') == (5, 8)
+    assert loaded.get((0, 2, 1, 1, 0), '"') == (3, 7)
+    assert loaded.get((3, 1, 1, 0, 0), 'b') is None
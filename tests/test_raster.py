@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from picaso_lcd import utils
+from picaso_lcd.raster import Framebuffer
+
+
+def test_line(raster_disp, raster_device):
+    raster_disp.gfx_line(0, 0, 10, 5, 0xffff)
+    pixels = raster_device.framebuffer.pixels
+    assert pixels[0, 0] == pixels[5, 10] == 0xffff
+    assert (pixels == 0xffff).sum() == 11
+
+
+def test_rect(raster_disp, raster_device):
+    raster_disp.gfx_rect(2, 3, 11, 8, 0x1234, filled=True)
+    raster_disp.gfx_rect(20, 20, 29, 29, 0x4321)
+    pixels = raster_device.framebuffer.pixels
+    assert (pixels == 0x1234).sum() == 10 * 6
+    assert (pixels == 0x4321).sum() == 4 * 9
+    assert pixels[25, 25] == 0
+
+
+def test_ellipse(raster_disp, raster_device):
+    raster_disp.gfx_circle(20, 20, 5, 0x00ff, filled=True)
+    pixels = raster_device.framebuffer.pixels
+    assert pixels[20, 20] == pixels[15, 20] == pixels[20, 25] == 0x00ff
+    assert pixels[15, 15] == 0
+    raster_disp.cls()
+    raster_disp.gfx_circle(20, 20, 5, 0x00ff)
+    assert pixels[20, 20] == 0
+    assert pixels[15, 20] == pixels[20, 25] == 0x00ff
+
+
+def test_polyline(raster_disp, raster_device):
+    raster_disp.gfx_polyline([(0, 0), (10, 0), (10, 10)], 0x0f0f)
+    pixels = raster_device.framebuffer.pixels
+    assert (pixels == 0x0f0f).sum() == 21
+    raster_disp.gfx_polyline([(20, 20), (30, 20), (30, 30), (20, 30)], 0x0ff0, filled=True)
+    assert (pixels == 0x0ff0).sum() == 11 * 11
+
+
+def test_polyline_numpy(raster_disp, raster_device):
+    raster_disp.max_polyline_vertices = 16
+    xs = np.arange(60)
+    points = np.column_stack([xs, 20 + 10 * np.sin(xs / 5.0)])
+    raster_disp.gfx_polyline(points, 0xffff)
+    assert raster_device.command_counts[0x0015] == 4
+    expected = Framebuffer(64, 48)
+    expected.polyline(np.rint(points[:, 0]).astype(int), np.rint(points[:, 1]).astype(int), 0xffff)
+    assert (raster_device.framebuffer.pixels == expected.pixels).all()
+
+
+def test_text(raster_disp, raster_device):
+    raster_disp.text.set_fg_color(0xffff)
+    raster_disp.text.put_string('I')
+    pixels = raster_device.framebuffer.pixels
+    assert pixels[:12, :8].any()
+    assert not pixels[:, 8:].any()
+    raster_disp.text.move_cursor(1, 1)
+    raster_disp.text.set_size(2)
+    raster_disp.text.put_string('I\nI')
+    assert pixels[24:48, 8:24].any()
+
+
+def test_orientation(raster_disp, raster_device):
+    raster_disp.set_orientation(2)
+    assert raster_device.framebuffer.pixels.shape == (64, 48)
+
+
+def test_png(tmpdir):
+    framebuffer = Framebuffer(4, 3)
+    framebuffer.rect_filled(0, 0, 1, 1, 0xf800)
+    assert framebuffer.to_rgb888()[0, 0].tolist() == [255, 0, 0]
+    path = tmpdir.join('screen.png')
+    framebuffer.save_png(str(path))
+    assert path.read_binary().startswith(b'\x89PNG')
+
+
+def test_blit(raster_disp, raster_device):
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 0x10000, (20, 30)).astype(np.uint16)
+    raster_disp.max_blit_bytes = 256
+    raster_disp.gfx_blit(5, 7, image)
+    assert raster_device.command_counts[0x000a] == 5  # Bands of 4 rows
+    assert (raster_device.framebuffer.pixels[7:27, 5:35] == image).all()
+    assert raster_device.framebuffer.pixels.sum() == image.astype(np.int64).sum()
+
+    # Rows larger than a command are split into tiles, RGB is converted
+    raster_disp.max_blit_bytes = 16
+    rgb = rng.randint(0, 256, (3, 20, 3)).astype(np.uint8)
+    raster_disp.gfx_blit(50, 40, rgb)
+    assert raster_device.command_counts[0x000a] == 5 + 9
+    pixels = raster_device.framebuffer.pixels[40:43, 50:]
+    assert (pixels == utils.rgb888_to_rgb565(rgb)[:, :14]).all()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import io
+
+import pytest
+
+from picaso_lcd.display import Display
+from picaso_lcd.emulator import EmulatedDevice
+from picaso_lcd.exceptions import BatchError
+from picaso_lcd.recorder import Recorder, read_records, replay
+
+
+def record_session():
+    disp = Display(EmulatedDevice(timeout=0.05))
+    log = io.BytesIO()
+    with Recorder(disp, log) as recorder:
+        disp.cls()
+        disp.text.set_fg_color(0x1234)
+        for i in range(100):
+            disp.gfx_line(0, 0, i, i, 0xffff)
+        disp.text.put_string('Hello')
+    assert recorder.count == 103
+    disp.cls()
+    return log.getvalue()
+
+
+def test_record():
+    records = list(read_records(io.BytesIO(record_session())))
+    assert len(records) == 103
+    assert records[0].payload == b'\xff\xcd'
+    assert records[0].reply == b'\x06'
+    assert records[1].reply == b'\x06\xff\xff'
+    assert records[-1].payload == b'\x00\x18Hello\x00'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 100, 4096])
+def test_replay(chunk_size):
+    device = EmulatedDevice(timeout=0.05)
+    disp = Display(device)
+    disp.text.set_fg_color(0x1234)
+    assert replay(disp, io.BytesIO(record_session()), chunk_size=chunk_size) == 103
+    assert device.command_counts[0xffc8] == 100
+    assert device.command_counts[0x0018] == 1
+    assert device.text['fg_color'] == 0x1234
+    # The text state cache was invalidated
+    assert disp.text.set_fg_color(0x1234) == 0x1234
+    assert device.command_counts[0xffe7] == 3
+
+
+def test_replay_strict():
+    device = EmulatedDevice(timeout=0.05)
+    device.text['fg_color'] = 0x0001
+    with pytest.raises(BatchError) as excinfo:
+        replay(Display(device), io.BytesIO(record_session()), strict=True)
+    assert excinfo.value.index == 1
+
+
+def test_invalid_log():
+    with pytest.raises(ValueError):
+        list(read_records(io.BytesIO(b'foo')))
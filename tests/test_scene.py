@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from picaso_lcd.display import Display
+from picaso_lcd.raster import RasterDevice
+from picaso_lcd.scene import Scene, Rect, Line, Ellipse, Text, _unordered
+
+
+def _render(primitives):
+    """Draw a scene from scratch on a new device."""
+    device = RasterDevice(width=96, height=64, timeout=0.05)
+    scene = Scene(Display(device))
+    for primitive in primitives:
+        scene.add(primitive)
+    scene.commit()
+    return device.framebuffer.pixels
+
+
+@pytest.fixture
+def device():
+    return RasterDevice(width=96, height=64, timeout=0.05)
+
+
+@pytest.fixture
+def scene(device):
+    return Scene(Display(device))
+
+
+def test_unordered():
+    assert _unordered([]) == []
+    assert _unordered([0, 1, 2]) == []
+    assert _unordered([2, 0, 1]) == [0]
+    assert _unordered([0, 3, 1, 2]) == [1]
+
+
+def test_static_scene_costs_nothing(scene, device):
+    def frame(value):
+        scene.gfx_rect(0, 0, 95, 15, 0x001f, filled=True)
+        scene.put_string(2, 4, 'Status', 0xffff)
+        scene.gfx_circle(80, 40, 10, 0xf800)
+        scene.put_string(2, 30, 'T={}'.format(value), 0xffff, opaque=True)
+        return scene.commit()
+
+    assert frame(1) == 4
+    received = device.bytes_received
+    assert frame(1) == 0
+    assert device.bytes_received == received
+    # Only the changed text is erased and drawn again
+    assert frame(2) == 1
+    assert (device.framebuffer.pixels == _render(scene._sent)).all()
+
+
+def test_overlap_closure(scene, device):
+    below = Rect(10, 10, 40, 40, 0x1111, True)
+    above = Rect(30, 30, 60, 60, 0x2222, True)
+    apart = Rect(70, 0, 90, 10, 0x3333, True)
+    for primitives in ([below, above, apart], [above, apart], [below, above, apart],
+                       [above, below, apart]):
+        for primitive in primitives:
+            scene.add(primitive)
+        scene.commit()
+        assert (device.framebuffer.pixels == _render(primitives)).all()
+
+
+def test_random_scenes(scene, device):
+    rng = random.Random(2)
+
+    def random_primitive():
+        x, y = rng.randrange(90), rng.randrange(60)
+        kind = rng.randrange(4)
+        color = rng.randrange(1, 0x10000)
+        if kind == 0:
+            return Rect(x, y, x + rng.randrange(20), y + rng.randrange(20), color, rng.random() < 0.5)
+        if kind == 1:
+            return Line(x, y, rng.randrange(96), rng.randrange(64), color)
+        if kind == 2:
+            radius = rng.randrange(1, 8)
+            return Ellipse(x, y, radius, radius, color, rng.random() < 0.5)
+        return Text(x, y, 'ab', color, 0, 3, 1, rng.random() < 0.5)
+
+    primitives = [random_primitive() for _ in range(30)]
+    for step in range(20):
+        for _ in range(rng.randrange(4)):
+            del primitives[rng.randrange(len(primitives))]
+        for _ in range(rng.randrange(4)):
+            primitives.insert(rng.randrange(len(primitives) + 1), random_primitive())
+        if step % 5 == 4:
+            i, j = rng.randrange(len(primitives)), rng.randrange(len(primitives))
+            primitives[i], primitives[j] = primitives[j], primitives[i]
+        for primitive in primitives:
+            scene.add(primitive)
+        scene.commit()
+        assert (device.framebuffer.pixels == _render(primitives)).all(), step
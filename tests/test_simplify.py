@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from picaso_lcd import simplify
+from picaso_lcd.display import Display
+from picaso_lcd.raster import RasterDevice
+
+
+def _distance_to_path(px, py, xs, ys):
+    """Distance of every point (px, py) to the polyline (xs, ys)."""
+    best = np.full(len(px), np.inf)
+    for ax, ay, bx, by in zip(xs[:-1], ys[:-1], xs[1:], ys[1:]):
+        abx, aby = bx - ax, by - ay
+        length = float(abx * abx + aby * aby) or 1.0
+        t = np.clip(((px - ax) * abx + (py - ay) * aby) / length, 0, 1)
+        best = np.minimum(best, np.hypot(px - ax - t * abx, py - ay - t * aby))
+    return best
+
+
+def test_drop_collinear():
+    xs, ys = simplify.drop_collinear([0, 1, 2, 2, 3, 3, 2], [0, 1, 2, 2, 3, 4, 4])
+    assert list(xs) == [0, 3, 3, 2]
+    assert list(ys) == [0, 3, 4, 4]
+    # Turning back is not collinear for drawing purposes
+    xs, ys = simplify.drop_collinear([0, 5, 2], [0, 0, 0])
+    assert list(xs) == [0, 5, 2]
+
+
+def test_rdp_tolerance():
+    t = np.linspace(0, 20, 2000)
+    xs, ys = t * 10, 50 + 30 * np.sin(t)
+    sx, sy = simplify.rdp(xs, ys, 0.5)
+    assert len(sx) < len(xs) / 10
+    assert (sx[0], sx[-1]) == (xs[0], xs[-1])
+    assert _distance_to_path(xs, ys, sx, sy).max() <= 0.5
+
+
+def test_decimate_columns():
+    xs = np.repeat(np.arange(10), 50)
+    ys = np.random.RandomState(0).randint(0, 100, len(xs))
+    dx, dy = simplify.decimate_columns(xs, ys)
+    assert len(dx) <= 4 * 10
+    for column in range(10):
+        assert dy[dx == column].min() == ys[xs == column].min()
+        assert dy[dx == column].max() == ys[xs == column].max()
+    with pytest.raises(ValueError):
+        simplify.decimate_columns([0, 2, 1], [0, 0, 0])
+
+
+def test_polyline_tolerance():
+    x = np.linspace(0, 63, 5000)
+    points = np.column_stack([x, 24 + 20 * np.sin(x / 6)])
+    full, simple = RasterDevice(64, 48, timeout=0.05), RasterDevice(64, 48, timeout=0.05)
+    Display(full).gfx_polyline(points, 0xffff)
+    Display(simple).gfx_polyline(points, 0xffff, tolerance=0.5)
+    assert simple.bytes_received * 10 < full.bytes_received
+    # Every pixel of the simplified plot is within a pixel of the original
+    lit = np.argwhere(simple.framebuffer.pixels == 0xffff)
+    reference = np.argwhere(full.framebuffer.pixels == 0xffff)
+    distances = np.abs(lit[:, None, :] - reference[None, :, :]).max(axis=2).min(axis=1)
+    assert distances.max() <= 1
+
+
+def test_simplify_columns():
+    x = np.linspace(0, 99, 10000)
+    points = np.column_stack([x, np.sin(x) * 10 + 20])
+    result = simplify.simplify(points, method='columns')
+    assert result.dtype.kind == 'i'
+    assert len(result) <= 400
+    with pytest.raises(ValueError):
+        simplify.simplify(points, method='fft')
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import random
+
+import pytest
+
+from picaso_lcd.spatial import GridIndex
+
+
+def test_query_point():
+    index = GridIndex(cell_size=16)
+    index.insert('a', (0, 0, 9, 9))
+    index.insert('b', (5, 5, 40, 40))
+    index.insert('c', (50, 50, 30, 30))  # Corners in any order
+    assert index.query_point(0, 0) == {'a'}
+    assert index.query_point(9, 9) == {'a', 'b'}
+    assert index.query_point(35, 35) == {'b', 'c'}
+    assert index.query_point(100, 100) == set()
+    assert index.get('c') == (30, 30, 50, 50)
+    assert index.bounds() == (0, 0, 50, 50)
+
+
+def test_insert_remove():
+    index = GridIndex(cell_size=8)
+    index.insert('a', (0, 0, 20, 20))
+    index.insert('a', (100, 100, 110, 110))
+    assert index.query_point(10, 10) == set()
+    assert index.query_point(105, 105) == {'a'}
+    index.remove('a')
+    assert len(index) == 0
+    assert not index._cells
+    assert index.bounds() is None
+    with pytest.raises(KeyError):
+        index.remove('a')
+
+
+def test_matches_linear_search():
+    rng = random.Random(1)
+    index = GridIndex(cell_size=20)
+    rects = {}
+    for key in range(50):
+        x, y = rng.randrange(200), rng.randrange(200)
+        rects[key] = (x, y, x + rng.randrange(60), y + rng.randrange(60))
+        index.insert(key, rects[key])
+    for _ in range(200):
+        x, y = rng.randrange(260), rng.randrange(260)
+        expected = {k for k, r in rects.items() if r[0] <= x <= r[2] and r[1] <= y <= r[3]}
+        assert index.query_point(x, y) == expected
+        area = (x, y, x + 15, y + 15)
+        expected = {k for k, r in rects.items()
+                    if r[0] <= area[2] and area[0] <= r[2] and r[1] <= area[3] and area[1] <= r[3]}
+        assert index.query_rect(area) == expected
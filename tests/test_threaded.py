@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import threading
+
+import pytest
+
+from picaso_lcd.emulator import EmulatedDevice
+from picaso_lcd.exceptions import BatchError, PicasoError
+from picaso_lcd.threaded import ThreadedDisplay
+
+
+def test_concurrent_threads(threaded_disp, device):
+    results = []
+
+    def worker(i):
+        for j in range(50):
+            threaded_disp.gfx_rect(i, j, i + 10, j + 10, 0, filled=True)
+            threaded_disp.text.put_string('thread {0}'.format(i))
+        results.append(threaded_disp.touch.get_status(1))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [0] * 8
+    assert device.command_counts[0xffc4] == 400
+    assert device.command_counts[0x0018] == 400
+
+
+def test_errors_per_command(threaded_disp):
+    with pytest.raises(PicasoError):
+        threaded_disp.write_cmd([0x1234])
+    assert threaded_disp.text.set_fg_color(0x0001) == 0xffff
+
+
+def test_pipeline_and_batch(threaded_disp, device):
+    threaded_disp.set_pipeline(4)
+    futures = [threaded_disp.gfx_line(0, 0, i, i, 0) for i in range(10)]
+    threaded_disp.set_pipeline(0)
+    assert all(f.done() for f in futures)
+    with pytest.raises(BatchError) as excinfo:
+        with threaded_disp.batch():
+            threaded_disp.cls()
+            threaded_disp.write_cmd([0x1234])
+    assert excinfo.value.index == 1
+    assert threaded_disp.get_display_size() == (480, 272)
+
+
+def test_baudrate_rejected(threaded_disp):
+    with pytest.raises(PicasoError):
+        threaded_disp.set_baudrate(115200)
+    with pytest.raises(PicasoError):
+        threaded_disp.negotiate_baudrate()
+
+
+def test_text_state_per_batch():
+    class LoggingDevice(EmulatedDevice):
+        def _put_string(self, data):
+            log.append((data.decode('ascii'), self.text['fg_color']))
+            return super(LoggingDevice, self)._put_string(data)
+
+    log = []
+    disp = ThreadedDisplay(LoggingDevice(timeout=0.05))
+    a_has_set = threading.Event()
+    b_done = threading.Event()
+
+    def thread_a():
+        with disp.batch():
+            disp.text.set_fg_color(0xf800)
+            a_has_set.set()
+            b_done.wait(5)
+            disp.text.put_string('A')
+
+    def thread_b():
+        a_has_set.wait(5)
+        with disp.batch():
+            disp.text.set_fg_color(0xf800)
+            disp.text.put_string('B')
+        b_done.set()
+
+    threads = [threading.Thread(target=thread_a), threading.Thread(target=thread_b)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    disp.close()
+    assert log == [('B', 0xf800), ('A', 0xf800)]
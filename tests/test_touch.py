@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import pytest
+
+from picaso_lcd.touch import TouchPoller, PRESS, MOVE, RELEASE
+
+
+def test_poll(threaded_disp, device):
+    events = []
+    poller = TouchPoller(threaded_disp.touch, events.append)
+    assert poller.poll() is None
+    device.touch_press(10, 20)
+    poller.poll()
+    poller.poll()
+    device.touch_move(11, 21)
+    poller.poll()
+    device.touch_release()
+    poller.poll()
+    poller.poll()
+    assert [(e.kind, e.x, e.y) for e in events] == [
+        (PRESS, 10, 20), (MOVE, 11, 21), (RELEASE, 11, 21)]
+    # One batch (write) per poll
+    assert device.command_counts[0xff37] == 18
+
+
+def test_events(threaded_disp, device):
+    events = threaded_disp.touch.events(fast_interval=0.001, idle_interval=0.002)
+    device.touch_press(5, 6)
+    assert next(events)[:3] == (PRESS, 5, 6)
+    device.touch_release()
+    assert next(events)[:3] == (RELEASE, 5, 6)
+    events.close()
+
+
+def test_poll_errors(threaded_disp, monkeypatch):
+    from picaso_lcd.exceptions import CommunicationError
+
+    def fail(mode):
+        raise CommunicationError('Link fault')
+    monkeypatch.setattr(threaded_disp.touch, 'get_status', fail)
+
+    events = threaded_disp.touch.events(fast_interval=0.001, idle_interval=0.002)
+    with pytest.raises(CommunicationError):
+        next(events)
+
+    errors = []
+    poller = threaded_disp.touch.on_event(lambda event: None, on_error=errors.append,
+                                 fast_interval=0.001)
+    poller._thread.join(1)
+    assert not poller._thread.is_alive()
+    assert len(errors) == 1 and poller.error is errors[0]
+
+
+def test_adaptive_interval(threaded_disp, device):
+    poller = threaded_disp.touch.on_event(lambda event: None, fast_interval=0.001, idle_interval=0.05)
+    try:
+        import time
+        time.sleep(0.3)
+        idle_polls = device.command_counts[0xff37] // 3
+        device.touch_press(1, 1)
+        time.sleep(0.3)
+        touched_polls = device.command_counts[0xff37] // 3 - idle_polls
+    finally:
+        poller.stop()
+    assert idle_polls < 20
+    assert touched_polls > 2 * idle_polls
+
+
+def test_regions(threaded_disp, device):
+    from picaso_lcd.touch import TouchEvent
+    regions = threaded_disp.touch.regions
+    pressed = []
+    regions.add('ok', 10, 200, 90, 240, pressed.append)
+    regions.add('cancel', 100, 200, 180, 240)
+    regions.add('popup', 50, 180, 150, 220, pressed.append)
+    assert regions.hit(20, 230) == 'ok'
+    assert regions.hit(120, 230) == 'cancel'
+    assert regions.hit(80, 210) == 'popup'  # Added last, so it is on top
+    assert regions.hit(0, 0) is None
+
+    event = TouchEvent(PRESS, 60, 210, 0)
+    assert regions.dispatch(event) == 'popup'
+    assert regions.dispatch(TouchEvent(PRESS, 120, 230, 0)) == 'cancel'
+    assert pressed == [event]
+
+    regions.apply()
+    assert device.touch_region == (10, 180, 180, 240)
+    device.touch_press(5, 5)
+    assert threaded_disp.touch.get_status(0) == 0
+    device.touch_release()
+    regions.remove('popup')
+    assert regions.hit(120, 190) is None
+    regions.clear()
+    regions.apply()
+    assert device.touch_region is None
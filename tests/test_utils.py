@@ -27,6 +27,53 @@ def test_int_to_dbyte_validation(arg):
         utils.int_to_dbyte(arg)
 
 
+### pack_words ###
+
+@pytest.mark.parametrize(('arg', 'expected'), [
+    ([], b''),
+    ([0], b'\x00\x00'),
+    ([0xffc8, 1, 256], b'\xff\xc8\x00\x01\x01\x00'),
+    (list(range(100)), b''.join(bytes(bytearray(utils.int_to_dbyte(i))) for i in range(100))),
+])
+def test_pack_words(arg, expected):
+    """Test the ``pack_words`` function."""
+    assert utils.pack_words(arg) == expected
+
+
+@pytest.mark.parametrize('arg', [[1 << 16], [0, -1]])
+def test_pack_words_validation(arg):
+    with pytest.raises(ValueError):
+        utils.pack_words(arg)
+
+
+### pack_word_array / split_points ###
+
+def test_pack_word_array_numpy():
+    np = pytest.importorskip('numpy')
+    words = np.array([0xffc8, 1, 256])
+    assert utils.pack_word_array(words) == b'\xff\xc8\x00\x01\x01\x00'
+    assert utils.pack_word_array([0xffc8, 1, 256]) == b'\xff\xc8\x00\x01\x01\x00'
+    with pytest.raises(ValueError):
+        utils.pack_word_array(np.array([0, -1]))
+
+
+def test_split_points():
+    xs, ys = utils.split_points([(1, 2), (3.4, 4.6)])
+    assert list(xs) == [1, 3]
+    assert list(ys) == [2, 5]
+    xs, ys = utils.split_points([])
+    assert len(xs) == len(ys) == 0
+    with pytest.raises(ValueError):
+        utils.split_points([(1, 2, 3)])
+
+
+def test_rgb888_to_rgb565():
+    np = pytest.importorskip('numpy')
+    rgb = np.array([[[255, 0, 0], [0, 255, 0]], [[0, 0, 255], [255, 255, 255]]], dtype=np.uint8)
+    assert utils.rgb888_to_rgb565(rgb).tolist() == [[0xf800, 0x07e0], [0x001f, 0xffff]]
+    assert utils.rgb888_to_rgb565([8, 4, 8]) == utils.to_16bit_color(1, 1, 1)
+
+
 ### dbyte_to_int ###
 
 @pytest.mark.parametrize(('args', 'expected'), [
@@ -58,3 +105,33 @@ def test_dbyte_to_int_validation(low_byte, high_byte):
 ### to_16bit_color ###
 
 # TODO
+
+
+### transliterate / encode_string ###
+
+@pytest.mark.parametrize(('arg', 'expected'), [
+    ('abc', 'abc'),
+    ('café Ångström', 'cafe Angstrom'),
+    ('“quoted” – ±5µs', '"quoted" - +-5us'),
+    ('中', '?'),
+    ('a\x00b\tc\nd\x7f', 'a?b?c\nd?'),
+])
+def test_transliterate(arg, expected):
+    assert utils.transliterate(arg) == expected
+
+
+def test_encode_string():
+    assert utils.encode_string('ab') == b'ab\x00'
+    assert utils.encode_string('ß…') == b'ss...\x00'
+    assert utils.encode_string('a\x00b') == b'a?b\x00'
+
+
+@pytest.mark.parametrize(('arg', 'expected'), [
+    (b'ab', b'ab\x00'),
+    (b'a\tb', b'a?b\x00'),
+    (b'caf\xc3\xa9', b'cafe\x00'),  # UTF-8
+    (b'caf\xe9', b'cafe\x00'),  # Latin-1
+])
+def test_encode_byte_string(arg, expected):
+    # Native strings on Python 2
+    assert utils.encode_string(arg) == expected
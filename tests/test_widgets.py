@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from picaso_lcd.widgets import StripChart
+
+
+def test_constant_cost(raster_disp, raster_device):
+    chart = StripChart(raster_disp, 10, 10, 40, 20, y_min=0, y_max=19, color=0xffff, gap=3)
+    costs = []
+    for i in range(100):
+        before = raster_device.bytes_received, sum(raster_device.command_counts.values())
+        chart.add(i % 20)
+        costs.append((raster_device.bytes_received - before[0],
+                      sum(raster_device.command_counts.values()) - before[1]))
+    assert max(count for size, count in costs) <= 3
+    assert max(size for size, count in costs) <= 2 * 12 + 18
+    # Nothing is drawn outside of the chart
+    pixels = raster_device.framebuffer.pixels
+    assert not pixels[:10].any() and not pixels[30:].any()
+    assert not pixels[:, :10].any() and not pixels[:, 50:].any()
+
+
+def test_sweep(raster_disp, raster_device):
+    chart = StripChart(raster_disp, 0, 0, 64, 48, y_min=0, y_max=47, color=0xffff, step=2, gap=4)
+    assert chart.capacity == 32
+    chart.extend([10] * 32)
+    pixels = raster_device.framebuffer.pixels
+    assert (pixels[37, :63] == 0xffff).all()
+    chart.extend([20] * 5)
+    # The newest samples overwrote the oldest ones, with a clear gap after them
+    assert (pixels[27, 0:9] == 0xffff).all()
+    assert not pixels[:, 9:13].any()
+    assert (pixels[37, 13:63] == 0xffff).all()
+    assert not pixels[37, :9].any()
+    assert chart.values() == [10] * 27 + [20] * 5
+
+    expected = pixels.copy()
+    raster_disp.cls()
+    chart.redraw()
+    assert (pixels == expected).all()
+
+
+def test_clamp_and_clear(raster_disp, raster_device):
+    chart = StripChart(raster_disp, 0, 0, 10, 10, y_min=-1, y_max=1, color=0xffff)
+    chart.extend([-5, 5])
+    pixels = raster_device.framebuffer.pixels
+    assert pixels[9, 0] == pixels[0, 1] == 0xffff
+    chart.clear()
+    assert not pixels.any()
+    assert chart.values() == []